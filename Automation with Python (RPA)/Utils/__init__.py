@@ -1,8 +1,87 @@
-from .interact_jadlog import *
-from .helper_functions import *
-from .integrated_logger import IntegratedLogger
-from .functions_excel import *
-from .rpa_challenge import *
-from .interact_dataframe_correios import *
-from .api_brasil import *
-from .functions_email import *
+"""
+Funções e classes do robô. Os submódulos são carregados sob demanda (PEP 562): importar `Utils`
+não importa selenium, botcity, PIL ou openpyxl; cada módulo só é carregado no primeiro acesso a
+um dos seus nomes (ex: `from Utils import api_data_lookup` carrega apenas o cliente da BrasilAPI).
+"""
+import importlib
+
+# Nomes públicos do pacote e o submódulo que define cada um
+_SUBMODULE_EXPORTS = {
+    "interact_jadlog": (
+        "XPATH_COTACAO_JADLOG", "ler_cotacao_jadlog", "limpar_cotacao_jadlog",
+        "aguardar_nova_cotacao_jadlog", "obter_cotacoes_jadlog",
+    ),
+    "helper_functions": (
+        "CAMPO_DIMENSOES", "CORREIOS_DIMENSION_LIMITS", "check_variables_correios",
+        "are_package_dimensions_valid", "split_package_dimensions", "validate_package_rows",
+        "wait_until", "get_jadlog_value", "calc_finish_task",
+    ),
+    "integrated_logger": ("IntegratedLogger",),
+    "maestro_log_shipper": ("MaestroLogShipper", "create_maestro_log_shipper"),
+    "error_notifier": ("ErrorNotifier", "create_error_notifier"),
+    "mail_dispatcher": ("MailDispatcher", "build_email_bytes", "create_mail_dispatcher"),
+    "checkpoint_store": ("CheckpointStore", "input_fingerprint", "open_checkpoint"),
+    "stage_scheduler": ("Stage", "StageScheduler", "merge_stage_frames"),
+    "run_profiler": ("HISTOGRAM_BUCKETS", "PROFILER", "RunProfiler", "percentile", "latency_histogram", "profiled"),
+    "browser_pool": ("HEAP_SCRIPT", "BrowserPool", "create_browser_pool"),
+    "incremental_store": (
+        "INCREMENTAL_COLUMNS", "IncrementalStore", "row_hashes", "hashes_by_cnpj", "merge_with_previous",
+        "open_incremental_store",
+    ),
+    "functions_excel": (
+        "COLUNAS_COTACAO", "PREENCHIMENTO_MENOR_VALOR", "open_excel_file_to_dataframe",
+        "input_snapshot_path", "load_input_snapshot", "create_output_dataframe",
+        "cheapest_quotation_columns", "save_df_output_to_excel", "clean_df_if_null",
+        "write_if_null_output", "compare_quotation", "make_column_endereco",
+        "make_jadlog_correios_dataframes",
+    ),
+    "rpa_challenge": (
+        "FORM_FIELDS", "FAST_FILL_SCRIPT", "access_website", "start_challenge", "capture_form_xpaths",
+        "fill_form_data", "fill_form_data_fast",
+        "capture_execution_time", "take_success_screenshot", "initialize_browser",
+        "close_browser", "rpa_challenge",
+    ),
+    "interact_dataframe_correios": (
+        "preparar_consulta_correios", "processar_consultas_correios", "buscar_cotacoes_correios",
+    ),
+    "api_brasil": (
+        "BRASILAPI_HEADERS", "create_brasilapi_session", "create_brasilapi_cache", "query_brasilapi",
+        "query_brasilapi_concurrent", "create_companies_dataframe", "save_dataframe_to_csv",
+        "join_and_transform", "api_data_lookup",
+    ),
+    "functions_email": (
+        "PROCESS_NAME", "obter_mail_dispatcher", "encerrar_mail_dispatchers",
+        "obter_data_e_hora_formatadas", "ler_emails_da_planilha", "enviar_email_com_anexo",
+        "enviar_email_de_erro", "enviar_email_resumo_erros", "send_error_digest", "send_error_email",
+        "executar_envio_email", "executar_envio_email_erro",
+    ),
+    "money": (
+        "COLUNAS_COTACAO_POR_TRANSPORTADORA", "parse_brl_cents", "format_brl", "normalize_brl",
+        "quote_cents_frame", "cheapest_carrier", "compare_carrier_quotes",
+    ),
+}
+
+_ATTRIBUTE_MODULES = {
+    name: module
+    for module, names in _SUBMODULE_EXPORTS.items()
+    for name in names
+}
+
+__all__ = list(_ATTRIBUTE_MODULES)
+
+
+def __getattr__(name: str):
+    module = _ATTRIBUTE_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    submodule = importlib.import_module(f"{__name__}.{module}")
+    # Guarda os nomes do submódulo no pacote para que os próximos acessos não passem por __getattr__
+    # (isso também faz `rpa_challenge` voltar a ser a função, e não o submódulo de mesmo nome)
+    for exported in _SUBMODULE_EXPORTS[module]:
+        globals()[exported] = getattr(submodule, exported)
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,19 +1,77 @@
 import pandas as pd
 import requests
 import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from Utils.integrated_logger import IntegratedLogger
-from Utils.functions_excel import open_excel_file_to_dataframe
+from Utils.sqlite_cache import SQLiteTTLCache
+from Utils.result_accumulator import ResultAccumulator
+from Utils.run_profiler import profiled
 from config import vars_map
 from time import sleep
 
 
-def query_brasilapi(cnpj: str, logger: IntegratedLogger) -> tuple:
+BRASILAPI_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36 Edg/120.0.2210.91"
+    )
+}
+
+
+def create_brasilapi_session(pool_size: int) -> requests.Session:
+    """
+    Cria uma sessão HTTP compartilhada com pool de conexões (keep-alive) para consultas à BrasilAPI.
+
+    Parâmetros:
+        pool_size (int): Quantidade máxima de conexões mantidas abertas com o host da API.
+            Deve ser igual ou maior que o número de workers que utilizarão a sessão.
+
+    Retorna:
+        requests.Session: Sessão configurada com os cabeçalhos padrão e o pool de conexões.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(BRASILAPI_HEADERS)
+    return session
+
+
+def create_brasilapi_cache() -> SQLiteTTLCache:
+    """
+    Cria o cache persistente de respostas da BrasilAPI, indexado por CNPJ.
+
+    O arquivo, o TTL e o limite de entradas são obtidos de `vars_map`
+    ('DEFAULT_CACHE_PATH', 'BRASILAPI_CACHE_TTL_HOURS' e 'BRASILAPI_CACHE_MAX_ENTRIES').
+
+    Retorna:
+        SQLiteTTLCache: Cache pronto para ser utilizado por `query_brasilapi`.
+    """
+    return SQLiteTTLCache(
+        db_path=os.path.join(vars_map['DEFAULT_CACHE_PATH'], 'brasilapi_cache.sqlite3'),
+        table='brasilapi_cnpj',
+        ttl_seconds=vars_map['BRASILAPI_CACHE_TTL_HOURS'] * 3600,
+        max_entries=vars_map['BRASILAPI_CACHE_MAX_ENTRIES']
+    )
+
+
+@profiled("brasilapi_consulta", row=True)
+def query_brasilapi(cnpj: str, logger: IntegratedLogger, session: requests.Session = None,
+    cache: SQLiteTTLCache = None, force_refresh: bool = False) -> tuple:
     """
     Consulta a API BrasilAPI utilizando o CNPJ informado e retorna os dados da empresa.
 
     Parâmetros:
         cnpj (str): Número do CNPJ a ser consultado.
         logger (IntegratedLogger): Instância do logger para registrar logs da execução.
+        session (requests.Session, opcional): Sessão HTTP compartilhada (ver `create_brasilapi_session`).
+            Quando não informada, cada consulta abre uma nova conexão.
+        cache (SQLiteTTLCache, opcional): Cache consultado antes da requisição HTTP. Respostas
+            bem-sucedidas são gravadas no cache.
+        force_refresh (bool, opcional): Ignora o conteúdo do cache e consulta a API, atualizando a entrada.
 
     Retorna:
         tuple: (dict ou None, str)
@@ -29,21 +87,26 @@ def query_brasilapi(cnpj: str, logger: IntegratedLogger) -> tuple:
             logger.warning(f"CNPJ inválido informado: {cnpj}")
             return None, "inválido"
 
+        if cache is not None and not force_refresh:
+            cached_json = cache.get(cnpj)
+            if cached_json is not None:
+                logger.debug(f"CNPJ {cnpj} obtido do cache da BrasilAPI")
+                return json.loads(cached_json), "Sucesso"
+
         url = f"{vars_map['DEFAULT_BRASILAPI_URL']}{cnpj}"
-        headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36 Edg/120.0.2210.91"
-            )
-        }
 
         logger.info(f"Iniciando consulta à BrasilAPI com CNPJ: {cnpj}")
-        response = requests.get(url=url, headers=headers, timeout=10)
+        if session is not None:
+            response = session.get(url=url, timeout=10)
+        else:
+            response = requests.get(url=url, headers=BRASILAPI_HEADERS, timeout=10)
         response.raise_for_status()  # Lança erro se a resposta tiver status de falha HTTP
 
         logger.info(f"Consulta bem-sucedida para o CNPJ: {cnpj}")
-        return response.json(), "Sucesso"
+        company_data = response.json()
+        if cache is not None:
+            cache.set(cnpj, response.text)
+        return company_data, "Sucesso"
 
     except requests.exceptions.Timeout:
         logger.warning(f"Timeout ao consultar o CNPJ {cnpj}")
@@ -66,6 +129,37 @@ def query_brasilapi(cnpj: str, logger: IntegratedLogger) -> tuple:
         raise
 
 
+def query_brasilapi_concurrent(cnpj_list: list, logger: IntegratedLogger, max_workers: int,
+    cache: SQLiteTTLCache = None, force_refresh: bool = False) -> list:
+    """
+    Consulta uma lista de CNPJs na BrasilAPI em paralelo, com um pool limitado de workers
+    compartilhando uma única sessão HTTP (keep-alive).
+
+    Parâmetros:
+        cnpj_list (list): Lista de CNPJs (14 dígitos) a serem consultados.
+        logger (IntegratedLogger): Instância do logger para registrar logs da execução.
+        max_workers (int): Quantidade máxima de consultas simultâneas.
+        cache (SQLiteTTLCache, opcional): Cache compartilhado entre os workers.
+        force_refresh (bool, opcional): Ignora o conteúdo do cache nesta execução.
+
+    Retorna:
+        list: Lista de tuplas (dict ou None, str) na mesma ordem de `cnpj_list`,
+            com os mesmos status de `query_brasilapi` ("Sucesso", "falha" ou "inválido").
+
+    Raises:
+        Exception: Para qualquer erro inesperado ocorrido em uma das consultas.
+    """
+    logger.info(f"Consultando {len(cnpj_list)} CNPJs na BrasilAPI com {max_workers} workers.")
+
+    with create_brasilapi_session(max_workers) as session:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="brasilapi") as executor:
+            # executor.map preserva a ordem de entrada, independente da ordem de conclusão
+            return list(executor.map(
+                lambda cnpj: query_brasilapi(cnpj, logger, session, cache, force_refresh),
+                cnpj_list
+            ))
+
+
 def create_companies_dataframe(companies_data: list, logger: IntegratedLogger) -> pd.DataFrame:
     """
     Cria um DataFrame Pandas contendo os dados formatados das empresas consultadas na API.
@@ -235,13 +329,16 @@ def join_and_transform(excel_df: pd.DataFrame, api_df: pd.DataFrame, logger: Int
         raise
 
 
-def api_data_lookup(df_output: pd.DataFrame, logger: IntegratedLogger) -> tuple:
+@profiled()
+def api_data_lookup(df_output: pd.DataFrame, logger: IntegratedLogger, df_input: pd.DataFrame = None) -> tuple:
     """
     Função principal do programa que realiza a consulta de dados na BrasilAPI e atualiza o DataFrame de saída.
 
     Parâmetros:
         df_output (pd.DataFrame): DataFrame contendo os dados originais lidos do Excel.
         logger (IntegratedLogger): Instância do logger para registrar o progresso das operações.
+        df_input (pd.DataFrame, opcional): Dados de entrada já carregados (ver `load_input_snapshot`).
+            Quando não informado, a planilha de entrada é carregada novamente.
 
     Retorna:
         tuple: (companies_df, df_output)
@@ -254,12 +351,14 @@ def api_data_lookup(df_output: pd.DataFrame, logger: IntegratedLogger) -> tuple:
     try:
         logger.info("Iniciando busca de dados na BrasilAPI.")
 
-        # Define o caminho do arquivo Excel, utilizando a variável de configuração
-        excel_file_path = os.path.join(vars_map['DEFAULT_PROCESSAR_PATH'], 'Planilha de Entrada Grupos.xlsx')
-        logger.info(f"Arquivo Excel encontrado em: {excel_file_path}")
+        if df_input is None:
+            # Define o caminho do arquivo Excel, utilizando a variável de configuração
+            excel_file_path = os.path.join(vars_map['DEFAULT_PROCESSAR_PATH'], 'Planilha de Entrada Grupos.xlsx')
+            logger.info(f"Arquivo Excel encontrado em: {excel_file_path}")
 
-        # Lê o Excel e recebe um DataFrame com os dados de entrada
-        df_input = open_excel_file_to_dataframe(excel_file_path, logger)
+            # Lê o Excel e recebe um DataFrame com os dados de entrada
+            from Utils.functions_excel import load_input_snapshot
+            df_input = load_input_snapshot(excel_file_path, logger)
 
         # Extrai a coluna 'CNPJ' em formato de texto, garantindo 14 dígitos (zeros à esquerda se necessário)
         cnpj_list = df_input["CNPJ"].apply(lambda x: str(x).strip().zfill(14)).tolist()
@@ -268,9 +367,24 @@ def api_data_lookup(df_output: pd.DataFrame, logger: IntegratedLogger) -> tuple:
         companies_data = []
         missing_cnpjs = []
 
-        # Para cada CNPJ, realiza a consulta à API e armazena o retorno com o status correspondente
-        for cnpj in cnpj_list:
-            company_data, status = query_brasilapi(cnpj, logger)
+        # Para cada CNPJ, realiza a consulta à API (em paralelo, se configurado) e
+        # armazena o retorno com o status correspondente
+        max_workers = vars_map['BRASILAPI_MAX_WORKERS']
+        force_refresh = vars_map['BRASILAPI_CACHE_REFRESH']
+        if force_refresh:
+            logger.info("Atualização forçada: o cache da BrasilAPI será ignorado nesta execução.")
+
+        cache = create_brasilapi_cache()
+        try:
+            if max_workers > 1:
+                results = query_brasilapi_concurrent(cnpj_list, logger, max_workers, cache, force_refresh)
+            else:
+                results = [query_brasilapi(cnpj, logger, cache=cache, force_refresh=force_refresh) for cnpj in cnpj_list]
+            logger.info(f"Cache da BrasilAPI: {cache.hits} acertos, {cache.misses} faltas.")
+        finally:
+            cache.close()
+
+        for cnpj, (company_data, status) in zip(cnpj_list, results):
             companies_data.append({'data': company_data, 'status': status})
             # Se a consulta falhar, registra o CNPJ como ausente
             if status == 'falha':
@@ -281,8 +395,11 @@ def api_data_lookup(df_output: pd.DataFrame, logger: IntegratedLogger) -> tuple:
 
         if companies_df is not None:
             logger.info("Identificando CNPJs ausentes na resposta da API.")
-            # Identifica quais CNPJs não foram consultados com sucesso usando uma operação vetorizada
-            df_output.loc[df_output['CNPJ'].isin(missing_cnpjs), 'STATUS'] = 'Sem retorno da API'
+            # Sinaliza os CNPJs não consultados com sucesso, gravando todos de uma só vez
+            resultados = ResultAccumulator()
+            for cnpj in missing_cnpjs:
+                resultados.set(cnpj, 'STATUS', 'Sem retorno da API')
+            df_output = resultados.apply(df_output)
             logger.info(f"CNPJs sem retorno na API: {missing_cnpjs}")
 
             # Aqui poderíamos, se desejado, salvar o DataFrame de empresas em CSV de forma embutida
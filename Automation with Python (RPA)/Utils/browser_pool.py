@@ -0,0 +1,307 @@
+import time
+import threading
+from contextlib import contextmanager
+from Utils.run_profiler import PROFILER
+from config import vars_map
+
+# Uso de memória (heap JavaScript) da página atual, em bytes; disponível apenas no Chrome
+HEAP_SCRIPT = "return window.performance && performance.memory ? performance.memory.usedJSHeapSize : null;"
+
+
+class _PooledBrowser:
+    def __init__(self, bot):
+        self.bot = bot
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Conjunto de navegadores (WebBot) iniciados antecipadamente e compartilhados pelas etapas do robô.
+
+    Os navegadores são emprestados com `browser()` (gerenciador de contexto) ou `acquire`/`release`.
+    Na devolução, o estado é limpo (cookies, abas extras e página atual) e o navegador volta ao pool;
+    ele é descartado e substituído após `max_uses` usos, quando o heap da página passar de
+    `max_heap_mb` ou quando a etapa terminar com erro. Cada empréstimo conta como um uso, e as etapas
+    que mantêm o navegador durante várias consultas chamam `recycle_if_needed` a cada consulta, para
+    que os limites valham também no meio da etapa. Se nenhum navegador estiver livre, um novo é
+    criado; na devolução, o pool mantém no máximo `size` navegadores livres.
+
+    Parâmetros:
+        factory (callable): Função que cria um WebBot ainda não iniciado.
+        size (int): Quantidade de navegadores iniciados por `prewarm` e mantidos livres no pool.
+        max_uses (int, opcional): Usos por navegador antes de ser substituído. Padrão: 200.
+        max_heap_mb (float, opcional): Heap JavaScript máximo, em MB, para manter o navegador. Padrão: 512.
+        logger (IntegratedLogger, opcional): Logger usado para registrar inícios e descartes.
+    """
+
+    def __init__(self, factory, size: int, max_uses: int = 200, max_heap_mb: float = 512, logger=None):
+        self.factory = factory
+        self.size = max(0, size)
+        self.max_uses = max(1, max_uses)
+        self.max_heap_mb = max_heap_mb
+        self.logger = logger
+
+        self._idle = []
+        self._starting = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.started = 0
+        self.recycled = 0
+
+    def _log(self, message: str):
+        if self.logger:
+            self.logger.debug(message)
+
+    def _start_browser(self) -> _PooledBrowser:
+        with PROFILER.stage("chrome_inicializacao"):
+            bot = self.factory()
+            bot.start_browser()
+            try:
+                bot.driver.maximize_window()
+            except Exception:
+                pass
+        with self._condition:
+            self.started += 1
+        return _PooledBrowser(bot)
+
+    def _stop_browser(self, pooled: _PooledBrowser):
+        try:
+            pooled.bot.stop_browser()
+        except Exception:
+            pass
+
+    def prewarm(self, wait: bool = False):
+        """
+        Inicia, em segundo plano, os navegadores que faltam para o pool ter `size` navegadores livres.
+
+        Parâmetros:
+            wait (bool, opcional): Aguarda todos os navegadores ficarem prontos. Padrão: False.
+        """
+        with self._condition:
+            missing = self.size - len(self._idle) - self._starting
+            self._starting += max(0, missing)
+
+        threads = [
+            threading.Thread(target=self._prewarm_one, name=f"browser-pool-{number}", daemon=True)
+            for number in range(max(0, missing))
+        ]
+        for thread in threads:
+            thread.start()
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _prewarm_one(self):
+        pooled = None
+        try:
+            pooled = self._start_browser()
+        except Exception as erro:
+            self._log(f"Falha ao iniciar navegador do pool: {erro}")
+        with self._condition:
+            self._starting -= 1
+            if pooled is not None:
+                if self._closed:
+                    self._stop_browser(pooled)
+                else:
+                    self._idle.append(pooled)
+            self._condition.notify_all()
+
+    def acquire(self, timeout: float = None):
+        """
+        Empresta um navegador do pool. Aguarda um navegador que já esteja sendo iniciado ou, se não
+        houver nenhum, inicia um novo.
+
+        Retorna:
+            WebBot: Navegador iniciado, de uso exclusivo até `release`.
+
+        Raises:
+            RuntimeError: Se o pool já foi encerrado.
+            TimeoutError: Se nenhum navegador ficar pronto dentro de `timeout` segundos.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("O pool de navegadores já foi encerrado.")
+                if self._idle:
+                    pooled = self._idle.pop()
+                    break
+                if self._starting == 0:
+                    pooled = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("Nenhum navegador do pool ficou disponível a tempo.")
+                self._condition.wait(remaining)
+
+        if pooled is None:
+            pooled = self._start_browser()
+        pooled.uses += 1
+        pooled.bot._browser_pool_entry = pooled
+        return pooled.bot
+
+    def release(self, bot, discard: bool = False):
+        """
+        Devolve o navegador ao pool, limpando o seu estado, ou o encerra se precisar ser reciclado.
+
+        Parâmetros:
+            bot (WebBot): Navegador obtido com `acquire`.
+            discard (bool, opcional): Encerra o navegador em vez de devolvê-lo (ex: após um erro).
+        """
+        pooled = getattr(bot, "_browser_pool_entry", None) or _PooledBrowser(bot)
+        bot._browser_pool_entry = None
+
+        if discard:
+            reason = "erro na etapa"
+        else:
+            reason = self._recycle_reason(bot, pooled)
+            if reason is None and not self._reset(bot):
+                reason = "falha ao limpar o estado"
+        self._return(pooled, reason)
+
+    def recycle_if_needed(self, bot):
+        """
+        Registra mais um uso do navegador emprestado (ex: uma cotação). Se ele já atingiu `max_uses` ou
+        o heap passou de `max_heap_mb`, empresta outro navegador para esse uso e devolve este ao pool,
+        que o substitui.
+        Se não for possível obter outro navegador, continua com o atual.
+
+        Parâmetros:
+            bot (WebBot): Navegador obtido com `acquire`.
+
+        Retorna:
+            WebBot: O próprio `bot` ou, se ele foi reciclado, um navegador limpo (sem página aberta)
+            que deve ser usado e devolvido no lugar dele.
+        """
+        pooled = getattr(bot, "_browser_pool_entry", None)
+        if pooled is None:
+            return bot
+
+        reason = self._recycle_reason(bot, pooled)
+        if reason is None:
+            pooled.uses += 1
+            return bot
+
+        try:
+            replacement = self.acquire()
+        except Exception as erro:
+            self._log(f"Navegador do pool mantido após {reason}, sem substituto disponível: {erro}")
+            pooled.uses += 1
+            return bot
+
+        bot._browser_pool_entry = None
+        self._return(pooled, reason)
+        return replacement
+
+    def _recycle_reason(self, bot, pooled: _PooledBrowser):
+        """
+        Retorna o motivo para substituir o navegador (encerrado, usos ou heap), ou None se ele pode continuar.
+        """
+        if bot.driver is None:
+            return "navegador encerrado"
+        if pooled.uses >= self.max_uses:
+            return f"{pooled.uses} usos"
+        heap_mb = self._heap_mb(bot)
+        if heap_mb is not None and heap_mb > self.max_heap_mb:
+            return f"heap de {heap_mb:.0f} MB"
+        return None
+
+    def _return(self, pooled: _PooledBrowser, reason: str = None):
+        """
+        Devolve o navegador ao pool ou, se houver `reason` (ou o pool estiver cheio), o encerra.
+        """
+        with self._condition:
+            keep = reason is None and not self._closed and len(self._idle) < self.size
+            if keep:
+                self._idle.append(pooled)
+                self._condition.notify_all()
+            elif reason is not None:
+                self.recycled += 1
+
+        if not keep:
+            if reason is not None:
+                self._log(f"Navegador do pool reciclado ({reason}).")
+            self._stop_browser(pooled)
+            # Repõe o navegador descartado para o próximo empréstimo
+            if reason is not None and not self._closed:
+                self.prewarm()
+
+    @contextmanager
+    def browser(self, timeout: float = None):
+        """
+        Empresta um navegador durante o bloco `with`. Se o bloco terminar com erro, o navegador é descartado.
+        """
+        bot = self.acquire(timeout)
+        try:
+            yield bot
+        except BaseException:
+            self.release(bot, discard=True)
+            raise
+        else:
+            self.release(bot)
+
+    @staticmethod
+    def _heap_mb(bot):
+        try:
+            heap = bot.driver.execute_script(HEAP_SCRIPT)
+        except Exception:
+            return None
+        return heap / (1024 * 1024) if heap else None
+
+    @staticmethod
+    def _reset(bot) -> bool:
+        """
+        Limpa cookies e abas extras e deixa o navegador em uma página em branco.
+        """
+        try:
+            driver = bot.driver
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        """
+        Encerra todos os navegadores livres. Navegadores emprestados são encerrados na devolução.
+        """
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for pooled in idle:
+            self._stop_browser(pooled)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def create_browser_pool(logger=None):
+    """
+    Cria o pool de navegadores conforme 'BROWSER_POOL_ENABLED', 'BROWSER_POOL_SIZE',
+    'BROWSER_POOL_MAX_USES' e 'BROWSER_POOL_MAX_HEAP_MB' do `vars_map` e inicia os navegadores em
+    segundo plano (sem janela se 'BROWSER_HEADLESS').
+
+    Retorna:
+        BrowserPool ou None: Pool em aquecimento, ou None se desativado.
+    """
+    if not vars_map['BROWSER_POOL_ENABLED'] or vars_map['BROWSER_POOL_SIZE'] < 1:
+        return None
+
+    pool = BrowserPool(
+        factory=lambda: vars_map.create_webbot(),
+        size=vars_map['BROWSER_POOL_SIZE'],
+        max_uses=vars_map['BROWSER_POOL_MAX_USES'],
+        max_heap_mb=vars_map['BROWSER_POOL_MAX_HEAP_MB'],
+        logger=logger
+    )
+    pool.prewarm()
+    return pool
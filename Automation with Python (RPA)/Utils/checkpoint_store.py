@@ -0,0 +1,264 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import sqlite3
+import threading
+import pandas as pd
+from Utils.result_accumulator import ResultAccumulator
+
+
+def input_fingerprint(input_file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Calcula a impressão digital (SHA-256 do conteúdo) da planilha de entrada. A mesma planilha, mesmo
+    copiada ou salva novamente sem alterações, gera a mesma impressão digital.
+
+    Parâmetros:
+        input_file_path (str): Caminho da planilha de entrada.
+        chunk_size (int, opcional): Tamanho dos blocos lidos do arquivo, em bytes.
+
+    Retorna:
+        str: Impressão digital em hexadecimal.
+    """
+    digest = hashlib.sha256()
+    with open(input_file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """
+    Checkpoints de uma execução em SQLite, identificados pela impressão digital da planilha de entrada.
+
+    Guarda dois tipos de progresso:
+        - etapas concluídas (ex: "api"), opcionalmente com os DataFrames produzidos por elas;
+        - resultados por CNPJ de cada etapa (ex: "correios", "jadlog"), gravados à medida que são obtidos
+          (ver `result_recorder`), de forma que uma execução interrompida pode ser retomada sem
+          repetir as consultas já feitas.
+
+    A instância pode ser compartilhada entre threads.
+    """
+
+    def __init__(self, db_path: str, fingerprint: str):
+        self.db_path = db_path
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL reduz o custo de cada gravação por CNPJ
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_stages ("
+            "fingerprint TEXT NOT NULL, stage TEXT NOT NULL, payload BLOB, completed_at REAL NOT NULL, "
+            "PRIMARY KEY (fingerprint, stage))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoint_results ("
+            "fingerprint TEXT NOT NULL, stage TEXT NOT NULL, cnpj TEXT NOT NULL, payload TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (fingerprint, stage, cnpj))"
+        )
+        self._conn.commit()
+
+    def completed_stages(self) -> list[str]:
+        """
+        Retorna as etapas concluídas desta entrada, na ordem em que foram concluídas.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage FROM checkpoint_stages WHERE fingerprint = ? ORDER BY completed_at",
+                (self.fingerprint,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def is_stage_done(self, stage: str) -> bool:
+        return stage in self.completed_stages()
+
+    def mark_stage_done(self, stage: str, frames: dict = None):
+        """
+        Marca a etapa como concluída, guardando os DataFrames produzidos por ela.
+
+        Parâmetros:
+            stage (str): Nome da etapa.
+            frames (dict, opcional): DataFrames da etapa ({nome: DataFrame}), restaurados por `load_stage_frames`.
+        """
+        payload = pickle.dumps(frames) if frames is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoint_stages (fingerprint, stage, payload, completed_at) VALUES (?, ?, ?, ?)",
+                (self.fingerprint, stage, payload, time.time())
+            )
+            self._conn.commit()
+
+    def load_stage_frames(self, stage: str):
+        """
+        Retorna os DataFrames guardados por `mark_stage_done` ({nome: DataFrame}), ou None se a etapa
+        não foi concluída ou não guardou DataFrames.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM checkpoint_stages WHERE fingerprint = ? AND stage = ?",
+                (self.fingerprint, stage)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return pickle.loads(row[0])
+
+    def record_result(self, stage: str, cnpj, values: dict):
+        """
+        Grava (mesclando com o que já existe) os valores obtidos para um CNPJ em uma etapa.
+
+        Parâmetros:
+            stage (str): Nome da etapa.
+            cnpj: CNPJ da linha (mesmo valor/tipo da coluna 'CNPJ' do DataFrame de saída).
+            values (dict): Valores por coluna do DataFrame de saída.
+        """
+        key = json.dumps(cnpj, default=str)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM checkpoint_results WHERE fingerprint = ? AND stage = ? AND cnpj = ?",
+                (self.fingerprint, stage, key)
+            ).fetchone()
+            merged = json.loads(row[0]) if row else {}
+            merged.update(values)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoint_results (fingerprint, stage, cnpj, payload, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.fingerprint, stage, key, json.dumps(merged, ensure_ascii=False, default=str), time.time())
+            )
+            self._conn.commit()
+
+    def result_recorder(self, stage: str):
+        """
+        Retorna a função que grava cada resultado da etapa no checkpoint, para uso como `on_update`
+        do `ResultAccumulator`.
+        """
+        return lambda cnpj, values: self.record_result(stage, cnpj, values)
+
+    def load_results(self, stage: str) -> dict:
+        """
+        Retorna os resultados gravados da etapa ({cnpj: {coluna: valor}}).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT cnpj, payload FROM checkpoint_results WHERE fingerprint = ? AND stage = ?",
+                (self.fingerprint, stage)
+            ).fetchall()
+        return {json.loads(cnpj): json.loads(payload) for cnpj, payload in rows}
+
+    def completed_results(self, stage: str) -> dict:
+        """
+        Retorna apenas os resultados da etapa com algum valor obtido além do 'STATUS' ({cnpj: {coluna: valor}}).
+        CNPJs que só têm 'STATUS' gravado (falha na consulta ou na validação) não contam como concluídos.
+        """
+        return {
+            cnpj: values for cnpj, values in self.load_results(stage).items()
+            if any(column != "STATUS" and value not in (None, "") for column, value in values.items())
+        }
+
+    def resume_stage(self, stage: str, df_output: pd.DataFrame, df_filtered: pd.DataFrame):
+        """
+        Aplica ao DataFrame de saída os resultados já obtidos da etapa e remove do DataFrame filtrado
+        os CNPJs que não precisam ser processados novamente. CNPJs que falharam na execução anterior
+        (apenas 'STATUS' gravado, ver `completed_results`) são processados de novo.
+
+        Parâmetros:
+            stage (str): Nome da etapa.
+            df_output (pd.DataFrame): DataFrame de saída.
+            df_filtered (pd.DataFrame): Linhas que a etapa deveria processar (coluna 'CNPJ').
+
+        Retorna:
+            tuple[pd.DataFrame, pd.DataFrame, int]: DataFrame de saída atualizado, linhas ainda pendentes e
+            quantidade de CNPJs restaurados do checkpoint.
+        """
+        results = self.completed_results(stage)
+        if not results:
+            return df_output, df_filtered, 0
+
+        restored = ResultAccumulator()
+        for cnpj, values in results.items():
+            # O 'STATUS' de uma tentativa anterior com falha não vale para a cotação obtida depois
+            restored.update(cnpj, {column: value for column, value in values.items() if column != "STATUS"})
+        df_output = restored.apply(df_output)
+
+        pending = df_filtered.loc[~df_filtered["CNPJ"].isin(list(results))]
+        return df_output, pending, len(df_filtered) - len(pending)
+
+    def clear(self):
+        """
+        Remove todos os checkpoints desta entrada (ex: após uma execução concluída com sucesso).
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoint_stages WHERE fingerprint = ?", (self.fingerprint,))
+            self._conn.execute("DELETE FROM checkpoint_results WHERE fingerprint = ?", (self.fingerprint,))
+            self._conn.commit()
+
+    def purge_expired(self, max_age_seconds: float):
+        """
+        Remove os checkpoints de outras entradas sem atualização há mais de `max_age_seconds`.
+        """
+        limit = time.time() - max_age_seconds
+        with self._lock:
+            stale = [
+                row[0] for row in self._conn.execute(
+                    "SELECT fingerprint FROM ("
+                    "SELECT fingerprint, completed_at AS updated_at FROM checkpoint_stages "
+                    "UNION ALL SELECT fingerprint, updated_at FROM checkpoint_results) "
+                    "WHERE fingerprint != ? GROUP BY fingerprint HAVING MAX(updated_at) < ?",
+                    (self.fingerprint, limit)
+                ).fetchall()
+            ]
+            for fingerprint in stale:
+                self._conn.execute("DELETE FROM checkpoint_stages WHERE fingerprint = ?", (fingerprint,))
+                self._conn.execute("DELETE FROM checkpoint_results WHERE fingerprint = ?", (fingerprint,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_checkpoint(input_file_path: str, logger):
+    """
+    Abre o checkpoint da planilha de entrada conforme 'CHECKPOINT_ENABLED', 'CHECKPOINT_RESUME' e
+    'CHECKPOINT_MAX_AGE_HOURS' do `vars_map`. O banco fica em 'DEFAULT_CACHE_PATH/checkpoints.sqlite'.
+
+    Sem 'CHECKPOINT_RESUME', o progresso anterior da mesma planilha é descartado e a execução começa do zero
+    (mas continua gravando checkpoints).
+
+    Parâmetros:
+        input_file_path (str): Caminho da planilha de entrada.
+        logger (IntegratedLogger): Logger usado para informar a retomada.
+
+    Retorna:
+        CheckpointStore ou None: Checkpoint aberto, ou None se desativado ou se a planilha não existir.
+    """
+    from config import vars_map
+
+    if not vars_map['CHECKPOINT_ENABLED'] or not os.path.exists(input_file_path):
+        return None
+
+    store = CheckpointStore(
+        os.path.join(vars_map['DEFAULT_CACHE_PATH'], 'checkpoints.sqlite'),
+        input_fingerprint(input_file_path)
+    )
+    store.purge_expired(vars_map['CHECKPOINT_MAX_AGE_HOURS'] * 3600)
+
+    if not vars_map['CHECKPOINT_RESUME']:
+        store.clear()
+        return store
+
+    stages = store.completed_stages()
+    results = {stage: len(store.completed_results(stage)) for stage in ("correios", "jadlog")}
+    if stages or any(results.values()):
+        logger.info(
+            f"Retomando execução anterior da mesma planilha: etapas concluídas {stages or 'nenhuma'}, "
+            f"{results['correios']} CNPJs dos Correios e {results['jadlog']} da Jadlog já registrados."
+        )
+    return store
@@ -0,0 +1,257 @@
+import re
+import requests
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from Utils.integrated_logger import IntegratedLogger
+from Utils.quote_cache import QuoteCache, correios_quote_params
+from Utils.result_accumulator import ResultAccumulator
+from Utils.run_profiler import profiled
+from config import vars_map
+
+URL_CORREIOS = vars_map["DEFAULT_CORREIOS_URL"]
+
+# Códigos de formato de embalagem usados pelo simulador (equivalentes ao clique nas imagens do formulário)
+PACKAGE_FORMAT_CODES = {"caixa": "1", "rolo": "2", "envelope": "3"}
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    )
+}
+
+
+class CorreiosParseError(Exception):
+    """
+    Erro levantado quando o formulário ou a página de resultado dos Correios não
+    possuem a estrutura esperada pelo cliente HTTP.
+    """
+
+
+def create_correios_session() -> requests.Session:
+    """
+    Cria a sessão HTTP (keep-alive e cookies) usada pelo cliente do simulador dos Correios.
+
+    Retorna:
+        requests.Session: Sessão com os cabeçalhos padrão.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    return session
+
+
+def load_correios_form(session: requests.Session, url: str = URL_CORREIOS, timeout: float = 10) -> dict:
+    """
+    Baixa a página do simulador e extrai a estrutura do formulário de cotação.
+
+    Parâmetros:
+        session (requests.Session): Sessão HTTP do cliente.
+        url (str, opcional): Endereço do simulador. Valor padrão é carregado da configuração global.
+        timeout (float, opcional): Tempo limite da requisição, em segundos. Padrão: 10.
+
+    Retorna:
+        dict: Dicionário com as chaves:
+            - "action" (str): URL absoluta de envio do formulário.
+            - "method" (str): Método HTTP do formulário ("get" ou "post").
+            - "fields" (dict): Valores padrão de todos os campos do formulário.
+            - "selects" (dict): Para cada <select>, um dicionário {texto visível: valor}.
+
+    Raises:
+        CorreiosParseError: Se o formulário de cotação não for encontrado na página.
+        requests.exceptions.RequestException: Para falhas de comunicação com o site.
+    """
+    response = session.get(url, timeout=timeout)
+    response.raise_for_status()
+    soup = BeautifulSoup(response.content, "html.parser")
+
+    cep_input = soup.find("input", attrs={"name": "cepDestino"})
+    form = cep_input.find_parent("form") if cep_input else None
+    if form is None:
+        raise CorreiosParseError("Formulário de cotação dos Correios não encontrado.")
+
+    fields = {}
+    for field in form.find_all("input"):
+        name = field.get("name")
+        if not name or field.get("type", "").lower() in ("submit", "button", "image", "reset"):
+            continue
+        if field.get("type", "").lower() in ("radio", "checkbox") and not field.has_attr("checked"):
+            continue
+        fields[name] = field.get("value", "")
+
+    selects = {}
+    for select in form.find_all("select"):
+        name = select.get("name")
+        if not name:
+            continue
+        options = {
+            option.get_text(strip=True): option.get("value", option.get_text(strip=True))
+            for option in select.find_all("option")
+        }
+        selects[name] = options
+        selected = select.find("option", selected=True) or select.find("option")
+        fields[name] = selected.get("value", selected.get_text(strip=True)) if selected else ""
+
+    return {
+        "action": urljoin(response.url, form.get("action") or response.url),
+        "method": (form.get("method") or "get").lower(),
+        "fields": fields,
+        "selects": selects,
+    }
+
+
+def _select_value(form: dict, name: str, text: str, prefix_match: bool = False) -> str:
+    """
+    Converte o texto visível de uma opção de <select> no valor enviado pelo formulário.
+
+    Com `prefix_match`, reproduz o comportamento de digitar no campo (primeira opção cujo texto
+    começa com o valor informado), usado para o campo de peso.
+    """
+    options = form["selects"].get(name)
+    if options is None:
+        raise CorreiosParseError(f"Campo '{name}' não encontrado no formulário dos Correios.")
+
+    text = str(text).strip()
+    if text in options:
+        return options[text]
+    if text in options.values():
+        return text
+    if prefix_match:
+        for option_text, value in options.items():
+            if option_text.startswith(text):
+                return value
+    raise CorreiosParseError(f"Opção '{text}' não encontrada no campo '{name}'.")
+
+
+def parse_correios_result(html) -> tuple[str, str]:
+    """
+    Extrai prazo e valor das linhas `tr.destaque` da página de resultado do simulador.
+
+    Parâmetros:
+        html (str ou bytes): Conteúdo HTML da página de resultado.
+
+    Retorna:
+        tuple[str, str]: Prazo de entrega em dias úteis (ou "N/A") e valor total (ex: "R$ 23,90").
+
+    Raises:
+        CorreiosParseError: Se as linhas de prazo e valor não forem encontradas.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    values = {}
+    for row in soup.select("tr.destaque"):
+        header = row.find("th")
+        cell = row.find("td")
+        if header and cell:
+            values[header.get_text(" ", strip=True)] = " ".join(cell.get_text(" ", strip=True).split())
+
+    raw_time = values.get("Prazo de entrega")
+    raw_price = values.get("Valor total")
+    if raw_time is None or raw_price is None:
+        raise CorreiosParseError("Prazo ou valor não encontrados no resultado dos Correios.")
+
+    match = re.search(r"\+ (\d+)", raw_time)
+    deliver_time = match.group(1) if match else "N/A"
+
+    return deliver_time, raw_price
+
+
+@profiled("correios_http_consulta", row=True)
+def cotar_correios_http(session: requests.Session, form: dict, service_type: str, cep_destiny: str,
+    weight: str, dimensions: dict, cep_origin: str = vars_map["ORIGIN_CEP"],
+    shipping_date: str = None, package_format: str = "caixa",
+    package_type: str = "Outra Embalagem", timeout: float = 10, logger=None) -> tuple[str, str]:
+    """
+    Realiza uma cotação no simulador dos Correios enviando o formulário diretamente via HTTP,
+    sem navegador. Recebe os mesmos argumentos de `interact_correios`.
+
+    Parâmetros:
+        session (requests.Session): Sessão HTTP do cliente.
+        form (dict): Estrutura do formulário retornada por `load_correios_form`.
+        service_type (str): Tipo de serviço a ser simulado (ex: "PAC", "SEDEX").
+        cep_destiny (str): CEP de destino do envio.
+        weight (str): Peso estimado da encomenda em quilos.
+        dimensions (dict): Dicionário contendo altura, largura e comprimento da embalagem.
+        cep_origin (str, opcional): CEP de origem. Valor padrão é carregado da configuração global.
+        shipping_date (str, opcional): Data desejada de postagem (formato: ddmmaaaa).
+        package_format (str, opcional): Formato da embalagem ("caixa", "rolo" ou "envelope").
+        package_type (str, opcional): Tipo de embalagem ("Embalagem dos Correios" ou "Outra Embalagem").
+        timeout (float, opcional): Tempo limite da requisição, em segundos. Padrão: 10.
+        logger (IntegratedLogger, opcional): Aceito por compatibilidade com os argumentos de `interact_correios`.
+
+    Retorna:
+        tuple[str, str]: Prazo de entrega em dias úteis e valor total da cotação.
+
+    Raises:
+        CorreiosParseError: Se o formulário ou o resultado não tiverem a estrutura esperada.
+        requests.exceptions.RequestException: Para falhas de comunicação com o site.
+    """
+    data = dict(form["fields"])
+    data.update({
+        "cepOrigem": cep_origin,
+        "cepDestino": cep_destiny,
+        "servico": _select_value(form, "servico", service_type),
+        "embalagem1": _select_value(form, "embalagem1", package_type),
+        "peso": _select_value(form, "peso", weight, prefix_match=True),
+        "Altura": dimensions["height"],
+        "Largura": dimensions["width"],
+        "Comprimento": dimensions["length"],
+    })
+    if "formato" in data:
+        data["formato"] = PACKAGE_FORMAT_CODES.get(package_format, data["formato"])
+    if shipping_date:
+        data["data"] = shipping_date
+
+    if form["method"] == "post":
+        response = session.post(form["action"], data=data, timeout=timeout)
+    else:
+        response = session.get(form["action"], params=data, timeout=timeout)
+    response.raise_for_status()
+
+    return parse_correios_result(response.content)
+
+
+def buscar_cotacoes_correios_http(resultados: ResultAccumulator, consultas: list, logger: IntegratedLogger,
+    quote_cache: QuoteCache = None) -> list:
+    """
+    Tenta realizar as cotações dos Correios via HTTP, sem navegador, registrando os resultados por CNPJ.
+
+    As consultas cuja resposta não puder ser interpretada (ou que falharem na comunicação) são
+    devolvidas para que sejam processadas pelo fluxo com WebBot.
+
+    Parâmetros:
+        resultados (ResultAccumulator): Acumulador dos valores a gravar no DataFrame de saída.
+        consultas (list): Lista de tuplas (cnpj, kwargs de `interact_correios`) já validadas.
+        logger (IntegratedLogger): Logger personalizado para registrar o progresso e os erros da execução.
+        quote_cache (QuoteCache, opcional): Cache onde as cotações obtidas com sucesso são gravadas.
+
+    Retorna:
+        list: Consultas que precisam ser refeitas pelo navegador.
+    """
+    if not consultas:
+        return consultas
+
+    pendentes = []
+    with create_correios_session() as session:
+        try:
+            form = load_correios_form(session)
+        except Exception as err:
+            logger.debug(f"Cliente HTTP dos Correios indisponível, utilizando o navegador: {err}")
+            return consultas
+
+        for cnpj, consulta in consultas:
+            try:
+                prazo, preco = cotar_correios_http(session, form, **consulta)
+            except Exception as err:
+                logger.debug(f"Cotação HTTP dos Correios falhou para CNPJ {cnpj}, utilizando o navegador: {err}")
+                pendentes.append((cnpj, consulta))
+                continue
+
+            resultados.update(cnpj, {"PRAZO DE ENTREGA CORREIOS": prazo, "VALOR COTAÇÃO CORREIOS": preco})
+            if quote_cache is not None:
+                quote_cache.set("correios", correios_quote_params(consulta), {"prazo": prazo, "preco": preco})
+            logger.info(f"Consulta Correios (HTTP) finalizada com sucesso para CNPJ {cnpj}")
+
+    logger.info(f"Cotações dos Correios via HTTP: {len(consultas) - len(pendentes)} concluídas, "
+                f"{len(pendentes)} encaminhadas ao navegador.")
+    return pendentes
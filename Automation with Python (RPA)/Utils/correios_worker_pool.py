@@ -0,0 +1,175 @@
+import threading
+from queue import Queue
+from botcity.web import WebBot, Browser
+from Utils.interact_correios import interact_correios
+from Utils.integrated_logger import IntegratedLogger
+from Utils.browser_pool import BrowserPool
+from Utils.quote_cache import QuoteCache, correios_quote_params
+from Utils.result_accumulator import ResultAccumulator
+from Utils.run_profiler import profiled
+from config import vars_map
+
+
+@profiled("chrome_inicializacao")
+def create_headless_webbot() -> WebBot:
+    """
+    Cria e inicia uma instância independente do WebBot em modo headless, reaproveitando o
+    driver já resolvido na configuração padrão.
+
+    Retorna:
+        WebBot: Navegador pronto para uso exclusivo de um worker.
+    """
+    bot = WebBot()
+    bot.headless = True
+    bot.browser = Browser.CHROME
+    bot.driver_path = vars_map['CHROMEDRIVER_PATH']
+    bot.start_browser()
+    return bot
+
+
+def _stop_webbot(bot: WebBot) -> None:
+    """
+    Encerra o navegador do worker ignorando falhas (ex: navegador já finalizado após um crash).
+    """
+    if bot is None:
+        return
+    try:
+        bot.stop_browser()
+    except Exception:
+        pass
+
+
+def _correios_worker(worker_id: int, tasks: Queue, results: Queue,
+    logger: IntegratedLogger, max_restarts: int, browser_pool: BrowserPool = None) -> None:
+    """
+    Loop de um worker: consome linhas da fila compartilhada, consulta o site dos Correios com
+    o próprio navegador e devolve o resultado para a thread coordenadora.
+
+    Quando uma consulta falha, o navegador do worker é recriado e a linha é tentada mais uma vez
+    (até `max_restarts` reinícios por worker). Cada tarefa recebida gera exatamente um resultado.
+    Com um `browser_pool`, o navegador é emprestado do pool (já iniciado) e devolvido ao final; o
+    navegador com falha é descartado pelo pool e substituído por outro, assim como o que atingir os
+    limites de usos ou de memória do pool (verificados a cada consulta).
+
+    Parâmetros:
+        worker_id (int): Identificador do worker (usado nos logs).
+        tasks (Queue): Fila de tarefas (cnpj, kwargs de `interact_correios`); `None` encerra o worker.
+        results (Queue): Fila de resultados (cnpj, sucesso, (prazo, preço) ou mensagem de erro).
+        logger (IntegratedLogger): Logger personalizado para registrar o progresso e os erros.
+        max_restarts (int): Quantidade máxima de reinícios do navegador deste worker.
+        browser_pool (BrowserPool, opcional): Pool de onde os navegadores são emprestados.
+    """
+    def obter_navegador():
+        return browser_pool.acquire() if browser_pool is not None else create_headless_webbot()
+
+    def liberar_navegador(bot, falhou=False):
+        if bot is None:
+            return
+        if browser_pool is not None:
+            browser_pool.release(bot, discard=falhou)
+        else:
+            _stop_webbot(bot)
+
+    bot = None
+    restarts = 0
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        cnpj, consulta = task
+        for attempt in (1, 2):
+            try:
+                # Dentro do `try`: uma falha ao substituir o navegador também gera o resultado da tarefa
+                if bot is not None and browser_pool is not None:
+                    bot = browser_pool.recycle_if_needed(bot)
+                if bot is None or bot.driver is None:
+                    bot = obter_navegador()
+                prazo, preco = interact_correios(bot=bot, keep_browser_open=True, **consulta)
+                results.put((cnpj, True, (prazo, preco)))
+                break
+
+            except Exception as err:
+                if attempt == 1 and restarts < max_restarts:
+                    # Recuperação: descarta o navegador (possivelmente travado) e tenta novamente
+                    logger.debug(f"[worker {worker_id}] Falha no CNPJ {cnpj}, reiniciando navegador: {err}")
+                    liberar_navegador(bot, falhou=True)
+                    bot = None
+                    restarts += 1
+                    continue
+                results.put((cnpj, False, str(err)))
+                break
+
+    liberar_navegador(bot)
+
+
+def buscar_cotacoes_correios_paralelo(resultados: ResultAccumulator, consultas: list,
+    logger: IntegratedLogger, workers: int, max_restarts: int = 3, quote_cache: QuoteCache = None,
+    browser_pool: BrowserPool = None) -> ResultAccumulator:
+    """
+    Executa as consultas no site dos Correios com um pool de navegadores headless independentes.
+
+    As linhas são distribuídas por uma fila compartilhada entre `workers` threads, cada uma com
+    o seu próprio WebBot mantido aberto entre as cotações (modo sessão de `interact_correios`).
+    A thread coordenadora registra os resultados no acumulador com as mesmas colunas e
+    valores do processamento sequencial. Com um `browser_pool`, os workers usam navegadores do pool
+    em vez de iniciar os seus.
+
+    Parâmetros:
+        resultados (ResultAccumulator): Acumulador dos valores a gravar no DataFrame de saída.
+        consultas (list): Lista de tuplas (cnpj, kwargs de `interact_correios`) já validadas.
+        logger (IntegratedLogger): Logger personalizado para registrar o progresso e os erros da execução.
+        workers (int): Quantidade de navegadores simultâneos.
+        max_restarts (int, opcional): Reinícios de navegador permitidos por worker. Padrão: 3.
+        quote_cache (QuoteCache, opcional): Cache onde as cotações obtidas com sucesso são gravadas.
+        browser_pool (BrowserPool, opcional): Pool de navegadores já iniciados (ver `BrowserPool`).
+
+    Retorna:
+        ResultAccumulator: O acumulador com 'PRAZO DE ENTREGA CORREIOS', 'VALOR COTAÇÃO CORREIOS'
+        e 'STATUS' registrados para os CNPJs processados.
+    """
+    if not consultas:
+        return resultados
+
+    workers = min(workers, len(consultas))
+    logger.info(f"Iniciando {workers} navegadores para {len(consultas)} consultas nos Correios.")
+
+    tasks = Queue()
+    results = Queue()
+    parametros = {}
+    for cnpj, consulta in consultas:
+        tasks.put((cnpj, consulta))
+        parametros[cnpj] = consulta
+    for _ in range(workers):
+        tasks.put(None)
+
+    threads = [
+        threading.Thread(
+            target=_correios_worker,
+            args=(worker_id, tasks, results, logger, max_restarts, browser_pool),
+            name=f"correios-worker-{worker_id}",
+            daemon=True
+        )
+        for worker_id in range(1, workers + 1)
+    ]
+    for thread in threads:
+        thread.start()
+
+    for position in range(1, len(consultas) + 1):
+        cnpj, sucesso, resultado = results.get()
+
+        if sucesso:
+            prazo, preco = resultado
+            resultados.update(cnpj, {"PRAZO DE ENTREGA CORREIOS": prazo, "VALOR COTAÇÃO CORREIOS": preco})
+            if quote_cache is not None:
+                quote_cache.set("correios", correios_quote_params(parametros[cnpj]), {"prazo": prazo, "preco": preco})
+            logger.info(f"[{position}/{len(consultas)}] Consulta Correios finalizada com sucesso para CNPJ {cnpj}")
+        else:
+            logger.error(f"Erro ao consultar CNPJ {cnpj} nos Correios: {resultado}")
+            resultados.set(cnpj, "STATUS", resultado)
+
+    for thread in threads:
+        thread.join()
+
+    return resultados
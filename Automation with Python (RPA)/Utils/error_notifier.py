@@ -0,0 +1,237 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+
+def normalize_error_message(message: str, max_length: int = 300) -> str:
+    """
+    Normaliza a mensagem de erro para agrupar ocorrências equivalentes (números, endereços e
+    espaços variáveis são substituídos).
+
+    Parâmetros:
+        message (str): Mensagem original do erro.
+        max_length (int, opcional): Tamanho máximo da mensagem normalizada. Padrão: 300.
+
+    Retorna:
+        str: Mensagem normalizada.
+    """
+    message = re.sub(r"0x[0-9a-fA-F]+", "0x#", str(message))
+    message = re.sub(r"\d+", "#", message)
+    message = " ".join(message.split())
+    return message[:max_length]
+
+
+def error_fingerprint(exception_type: str, stage: str, message: str) -> str:
+    """
+    Gera a impressão digital de um erro a partir do tipo da exceção e da etapa e mensagem normalizadas
+    (a etapa também é normalizada porque costuma conter dados da linha, como o CNPJ).
+    """
+    payload = f"{exception_type}|{normalize_error_message(stage)}|{normalize_error_message(message)}"
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+class ErrorNotifier:
+    """
+    Agrupa avisos e erros e envia, em segundo plano, um único e-mail de resumo por janela de tempo.
+
+    Cada ocorrência é identificada por tipo da exceção, etapa e mensagem normalizada
+    (ver `error_fingerprint`). As capturas de tela são limitadas: no máximo uma por erro distinto e
+    `max_screenshots_per_window` por janela; a gravação da imagem e o envio do e-mail acontecem
+    fora da thread que registrou o erro.
+    """
+
+    def __init__(self, send_digest, window_seconds: float = 300, max_screenshots_per_window: int = 5,
+        grab_screenshot=None):
+        """
+        Parâmetros:
+            send_digest (callable): Função chamada com (resumo, screenshots) para enviar o e-mail de resumo.
+                `resumo` é uma lista de dicionários por erro distinto e `screenshots` a lista de imagens.
+            window_seconds (float, opcional): Duração da janela de agrupamento, em segundos. Padrão: 300.
+            max_screenshots_per_window (int, opcional): Capturas de tela permitidas por janela. Padrão: 5.
+            grab_screenshot (callable, opcional): Função sem argumentos que retorna a imagem da tela
+                (objeto com `save(caminho)`). Padrão: `PIL.ImageGrab.grab`.
+        """
+        if grab_screenshot is None:
+            from PIL import ImageGrab
+            grab_screenshot = ImageGrab.grab
+
+        self.send_digest = send_digest
+        self.window_seconds = window_seconds
+        self.max_screenshots_per_window = max_screenshots_per_window
+        self.grab_screenshot = grab_screenshot
+        self.digests_sent = 0
+
+        self._entries = {}
+        self._screenshots = []
+        self._seen = set()
+        self._saving = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._saver = ThreadPoolExecutor(max_workers=1, thread_name_prefix="error-screenshot")
+        self._thread = threading.Thread(target=self._run, name="error-notifier", daemon=True)
+        self._thread.start()
+
+    def report(self, level: str, stage: str, exception_type: str, message: str,
+        screenshot_path: str = None) -> tuple[str, bool]:
+        """
+        Registra uma ocorrência de aviso/erro. Não bloqueia à espera do e-mail nem da gravação da imagem
+        (ver `on_screenshot_saved`). Após `close`, apenas indica se o erro é novo: a ocorrência não entra em
+        nenhum resumo e não há captura de tela.
+
+        Parâmetros:
+            level (str): Nível da ocorrência ("WARNING" ou "ERROR").
+            stage (str): Etapa/processo em que a ocorrência aconteceu.
+            exception_type (str): Nome do tipo da exceção (ou "" se não houver exceção ativa).
+            message (str): Mensagem resumida da ocorrência.
+            screenshot_path (str, opcional): Caminho onde a captura de tela deve ser gravada, se permitida.
+
+        Retorna:
+            tuple[str, bool]: Caminho da captura de tela (ou None se não foi feita) e se é a primeira
+            ocorrência deste erro na execução.
+        """
+        fingerprint = error_fingerprint(exception_type, stage, message)
+        now = datetime.now()
+
+        with self._lock:
+            is_new = fingerprint not in self._seen
+            self._seen.add(fingerprint)
+            if self._stop.is_set():
+                return None, is_new
+
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                entry = self._entries[fingerprint] = {
+                    "fingerprint": fingerprint,
+                    "level": level,
+                    "stage": stage,
+                    "exception_type": exception_type,
+                    "message": message,
+                    "count": 0,
+                    "first_seen": now,
+                    "last_seen": now,
+                    "screenshot": None,
+                }
+            entry["count"] += 1
+            entry["last_seen"] = now
+
+            capture = (
+                screenshot_path is not None
+                and entry["screenshot"] is None
+                and len(self._screenshots) < self.max_screenshots_per_window
+            )
+            if capture:
+                entry["screenshot"] = screenshot_path
+                self._screenshots.append(screenshot_path)
+
+        if not capture:
+            return None, is_new
+
+        try:
+            image = self.grab_screenshot()
+        except Exception as e:
+            logging.getLogger("dev_logger").warning(f"Falha ao capturar screenshot: {e}")
+            with self._lock:
+                entry["screenshot"] = None
+                self._screenshots.remove(screenshot_path)
+            return None, is_new
+
+        # A codificação e gravação da imagem ficam fora da thread que registrou o erro
+        try:
+            future = self._saver.submit(image.save, screenshot_path)
+        except RuntimeError:
+            # Notificador encerrado entre o registro e a gravação
+            with self._lock:
+                entry["screenshot"] = None
+                if screenshot_path in self._screenshots:
+                    self._screenshots.remove(screenshot_path)
+            return None, is_new
+        with self._lock:
+            self._saving[screenshot_path] = future
+        return screenshot_path, is_new
+
+    def on_screenshot_saved(self, screenshot_path: str, callback):
+        """
+        Chama `callback` quando a gravação de uma captura de tela retornada por `report` terminar (ex: para
+        anexá-la a outro envio), sem bloquear a thread que registrou o erro. O `callback` roda na thread
+        de gravação, ou imediatamente se a imagem já foi gravada.
+
+        Parâmetros:
+            screenshot_path (str): Caminho retornado por `report`.
+            callback (callable): Função chamada com o caminho da imagem, ou None se a gravação falhou.
+        """
+        with self._lock:
+            future = self._saving.pop(screenshot_path, None)
+
+        def notify(saved: bool):
+            try:
+                callback(screenshot_path if saved else None)
+            except Exception as e:
+                logging.getLogger("dev_logger").warning(f"Falha ao notificar a captura de tela gravada: {e}")
+
+        if future is None:
+            # Já aguardada por `flush` (que espera todas as gravações da janela)
+            notify(os.path.exists(screenshot_path))
+        else:
+            future.add_done_callback(lambda done: notify(done.exception() is None))
+
+    def flush(self):
+        """
+        Envia imediatamente o resumo da janela atual, se houver ocorrências.
+        """
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), {}
+            screenshots, self._screenshots = self._screenshots, []
+            self._saving = {}
+
+        if not entries:
+            return
+
+        # Garante que as capturas da janela já foram gravadas antes de anexá-las
+        self._saver.submit(lambda: None).result()
+
+        entries.sort(key=lambda entry: entry["first_seen"])
+        try:
+            self.send_digest(entries, screenshots)
+            self.digests_sent += 1
+        except Exception as e:
+            logging.getLogger("dev_logger").warning(f"Falha ao enviar o resumo de erros por e-mail: {e}")
+
+    def close(self, timeout: float = None):
+        """
+        Envia o resumo pendente e encerra as threads do notificador.
+        """
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._saver.shutdown(wait=True)
+
+    def _run(self):
+        while not self._stop.wait(self.window_seconds):
+            self.flush()
+        self.flush()
+
+
+def create_error_notifier(processo: str) -> ErrorNotifier:
+    """
+    Cria o `ErrorNotifier` com as configurações de `vars_map` ('ERROR_DIGEST_WINDOW_SECONDS' e
+    'ERROR_SCREENSHOTS_PER_WINDOW'), enviando os resumos com `send_error_digest`.
+
+    Parâmetros:
+        processo (str): Nome do processo RPA exibido no e-mail de resumo.
+
+    Retorna:
+        ErrorNotifier: Notificador em execução.
+    """
+    from config import vars_map
+    from .functions_email import send_error_digest
+
+    return ErrorNotifier(
+        send_digest=lambda resumo, screenshots: send_error_digest(processo, resumo, screenshots),
+        window_seconds=vars_map['ERROR_DIGEST_WINDOW_SECONDS'],
+        max_screenshots_per_window=vars_map['ERROR_SCREENSHOTS_PER_WINDOW']
+    )
@@ -1,17 +1,61 @@
 import os
-import openpyxl
+import atexit
+import threading
 from typing import List
 import smtplib
-from email.message import EmailMessage
 from datetime import datetime
-from botcity.maestro import *
+from concurrent.futures import Future
 from config import vars_map
+from .mail_dispatcher import MailDispatcher, build_email_bytes, create_mail_dispatcher
 
 
-# Global settings
-EMAIL = vars_map['EMAIL_USERNAME']
+# Global settings (credenciais e planilha de destinatários são lidas de `vars_map` apenas no envio)
 PROCESS_NAME = "E-mail de finalização da execução"
-EXCEL_FILE_PATH = vars_map['DEFAULT_EMAILS_FILE']
+
+# Destinatários já lidos, por arquivo: {caminho absoluto: (mtime_ns, tamanho, e-mails)}
+_CACHE_DESTINATARIOS = {}
+
+# Dispatchers (conexões SMTP autenticadas) compartilhados durante a execução, por remetente
+_DISPATCHERS = {}
+_DISPATCHERS_LOCK = threading.Lock()
+
+
+def obter_mail_dispatcher(remetente: str, senha_app: str) -> MailDispatcher:
+    """
+    Retorna o `MailDispatcher` compartilhado do remetente, criando-o na primeira chamada.
+    A mesma conexão SMTP autenticada é reaproveitada por todos os envios da execução; se a senha
+    mudar, o dispatcher anterior é encerrado e substituído.
+
+    Parâmetros:
+        remetente (str): Endereço de e-mail que enviará as mensagens.
+        senha_app (str): Senha do aplicativo para autenticação do SMTP.
+
+    Retorna:
+        MailDispatcher: Dispatcher do remetente.
+    """
+    anterior = None
+    with _DISPATCHERS_LOCK:
+        dispatcher = _DISPATCHERS.get(remetente)
+        if dispatcher is None or dispatcher.password != senha_app:
+            anterior = dispatcher
+            dispatcher = _DISPATCHERS[remetente] = create_mail_dispatcher(remetente, senha_app)
+
+    # Fora do lock: aguarda os envios pendentes do dispatcher substituído e fecha a sua conexão
+    if anterior is not None:
+        anterior.close()
+    return dispatcher
+
+
+@atexit.register
+def encerrar_mail_dispatchers() -> None:
+    """
+    Aguarda os envios pendentes e encerra as conexões SMTP abertas pelos dispatchers compartilhados.
+    """
+    with _DISPATCHERS_LOCK:
+        dispatchers = list(_DISPATCHERS.values())
+        _DISPATCHERS.clear()
+    for dispatcher in dispatchers:
+        dispatcher.close()
 
 def obter_data_e_hora_formatadas() -> tuple[str, str]:
     """
@@ -43,6 +87,8 @@ def ler_emails_da_planilha(caminho_arquivo: str) -> List[str]:
 
     A função assume que os e-mails estão na primeira coluna da aba ativa e ignora células vazias.
     É possível utilizar qualquer planilha `.xlsx` desde que contenha os e-mails na primeira coluna.
+    A lista lida fica em cache e a planilha só é aberta novamente quando o arquivo for alterado
+    (data de modificação ou tamanho diferentes).
 
     Parâmetros:
         caminho_arquivo (str): Caminho absoluto ou relativo para o arquivo Excel contendo os e-mails.
@@ -59,18 +105,27 @@ def ler_emails_da_planilha(caminho_arquivo: str) -> List[str]:
         if not os.path.exists(caminho_arquivo):
             raise FileNotFoundError(f"Arquivo não encontrado: {caminho_arquivo}")
 
+        # Reaproveita a leitura anterior enquanto o arquivo não for alterado
+        caminho_absoluto = os.path.abspath(caminho_arquivo)
+        status = os.stat(caminho_absoluto)
+        em_cache = _CACHE_DESTINATARIOS.get(caminho_absoluto)
+        if em_cache and em_cache[:2] == (status.st_mtime_ns, status.st_size):
+            return list(em_cache[2])
+
         # Abre o arquivo Excel
-        workbook = openpyxl.load_workbook(caminho_arquivo, data_only=True)
+        import openpyxl
+        workbook = openpyxl.load_workbook(caminho_arquivo, read_only=True, data_only=True)
         sheet = workbook.active
 
         emails = []
 
         # Itera sobre a primeira coluna da aba ativa
-        for row in sheet.iter_rows(min_row=1, min_col=1, max_col=1):
-            for cell in row:
-                if cell.value:
-                    emails.append(str(cell.value).strip())
+        for (valor,) in sheet.iter_rows(min_row=1, min_col=1, max_col=1, values_only=True):
+            if valor:
+                emails.append(str(valor).strip())
+        workbook.close()
 
+        _CACHE_DESTINATARIOS[caminho_absoluto] = (status.st_mtime_ns, status.st_size, tuple(emails))
         return emails
 
     except FileNotFoundError as e:
@@ -82,10 +137,13 @@ def ler_emails_da_planilha(caminho_arquivo: str) -> List[str]:
 
 def enviar_email_com_anexo(caminho_arquivo_anexo: str, assunto: str, corpo: str,
     remetente: str, senha_app: str, destinatarios: list[str],
-    logger=None) -> None:
+    logger=None, assincrono: bool = False) -> Future | None:
     """
     Envia um e-mail com anexo do tipo Excel para uma lista de destinatários utilizando SMTP seguro (SSL).
 
+    A mensagem é montada uma única vez e enviada em lotes de destinatários pela conexão SMTP
+    compartilhada (ver `obter_mail_dispatcher`).
+
     Parâmetros:
         caminho_arquivo_anexo (str): Caminho do arquivo a ser anexado (.xlsx).
         assunto (str): Título do e-mail (campo "Subject").
@@ -94,9 +152,10 @@ def enviar_email_com_anexo(caminho_arquivo_anexo: str, assunto: str, corpo: str,
         senha_app (str): Senha do aplicativo para autenticação do SMTP.
         destinatarios (list[str]): Lista de e-mails que irão receber a mensagem.
         logger (opcional): Instância de logger para registrar eventos e falhas.
+        assincrono (bool, opcional): Se True, o envio é feito em segundo plano. Padrão: False.
 
     Retorna:
-        None
+        Future | None: Com `assincrono`, o Future do envio (destinatários recusados ou a exceção); senão None.
 
     Raises:
         FileNotFoundError: Se o arquivo de anexo não for localizado.
@@ -111,26 +170,18 @@ def enviar_email_com_anexo(caminho_arquivo_anexo: str, assunto: str, corpo: str,
         with open(caminho_arquivo_anexo, "rb") as arquivo:
             anexo_bytes = arquivo.read()
 
-        # Configura e envia e-mail para cada destinatário
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(remetente, senha_app)
-
-            for destinatario in destinatarios:
-                msg = EmailMessage()
-                msg["Subject"] = assunto
-                msg["From"] = remetente
-                msg["To"] = destinatario
-                msg.set_content(corpo)
-                msg.add_attachment(
-                    anexo_bytes,
-                    maintype="application",
-                    subtype="xlsx",
-                    filename=os.path.basename(caminho_arquivo_anexo)
-                )
-
-                smtp.send_message(msg)
-                if logger:
-                    logger.info(f"E-mail enviado com sucesso para: {destinatario}")
+        # Monta a mensagem uma única vez e envia para todos os destinatários
+        mensagem = build_email_bytes(
+            assunto, corpo, remetente,
+            anexos=[(anexo_bytes, "application", "xlsx", os.path.basename(caminho_arquivo_anexo))]
+        )
+        dispatcher = obter_mail_dispatcher(remetente, senha_app)
+        if assincrono:
+            return dispatcher.send_async(mensagem, remetente, destinatarios, logger=logger)
+
+        recusados = dispatcher.send(mensagem, remetente, destinatarios, logger=logger)
+        if recusados and logger:
+            logger.warning(f"Destinatários recusados pelo servidor SMTP: {', '.join(recusados)}")
 
     except FileNotFoundError as e:
         if logger:
@@ -155,7 +206,8 @@ def enviar_email_de_erro(remetente: str, senha_app: str, destinatarios: list[str
     Envia uma notificação por e-mail para informar que um erro ocorreu durante a execução do RPA.
 
     O corpo do e-mail contém o nome do processo afetado, a data, a hora e uma descrição resumida do erro.
-    Um screenshot pode ser anexado, caso o caminho da imagem seja fornecido.
+    Um screenshot pode ser anexado, caso o caminho da imagem seja fornecido. A mensagem é montada uma
+    única vez e enviada pela conexão SMTP compartilhada.
 
     Parâmetros:
         remetente (str): Endereço de e-mail que enviará a notificação.
@@ -182,29 +234,11 @@ def enviar_email_de_erro(remetente: str, senha_app: str, destinatarios: list[str
             f"Detalhes do erro:\n{mensagem_erro}"
         )
 
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-            smtp.login(remetente, senha_app)
-
-            for destinatario in destinatarios:
-                msg = EmailMessage()
-                msg['Subject'] = assunto
-                msg['From'] = remetente
-                msg['To'] = destinatario
-                msg.set_content(corpo)
-
-                # Anexa o screenshot, se houver
-                if caminho_screenshot and os.path.exists(caminho_screenshot):
-                    with open(caminho_screenshot, "rb") as img:
-                        msg.add_attachment(
-                            img.read(),
-                            maintype='image',
-                            subtype='png',
-                            filename=os.path.basename(caminho_screenshot)
-                        )
-
-                smtp.send_message(msg)
-                if logger:
-                    logger.info(f"Notificação de erro enviada para: {destinatario}")
+        # Anexa o screenshot, se houver
+        mensagem = build_email_bytes(assunto, corpo, remetente, anexos=[caminho_screenshot] if caminho_screenshot else None)
+        obter_mail_dispatcher(remetente, senha_app).send(mensagem, remetente, destinatarios)
+        if logger:
+            logger.info(f"Notificação de erro enviada para: {', '.join(destinatarios)}")
 
     except Exception as erro:
         if logger:
@@ -212,11 +246,101 @@ def enviar_email_de_erro(remetente: str, senha_app: str, destinatarios: list[str
         raise Exception(f"Erro ao enviar e-mail de notificação: {erro}")
 
 
+def enviar_email_resumo_erros(remetente: str, senha_app: str, destinatarios: list[str],
+    processo: str, resumo: list[dict], screenshots: list[str] = None,
+    logger=None) -> None:
+    """
+    Envia um único e-mail com o resumo dos avisos e erros agrupados em uma janela de tempo.
+
+    Cada erro distinto aparece uma vez, com a quantidade de ocorrências, a etapa e o horário da
+    primeira e da última ocorrência. As capturas de tela de amostra são anexadas.
+
+    Parâmetros:
+        remetente (str): Endereço de e-mail que enviará a notificação.
+        senha_app (str): Senha do aplicativo configurada para o envio via SMTP.
+        destinatarios (list[str]): Lista de e-mails que irão receber a notificação.
+        processo (str): Nome do processo RPA em que os erros ocorreram.
+        resumo (list[dict]): Erros agrupados (ver `ErrorNotifier`), com as chaves "level", "stage",
+            "exception_type", "message", "count", "first_seen" e "last_seen".
+        screenshots (list[str], opcional): Caminhos das capturas de tela de amostra. Padrão: None.
+        logger (opcional): Instância de logger para registrar eventos e erros.
+
+    Retorna:
+        None
+
+    Raises:
+        Exception: Caso ocorra falha ao enviar o e-mail.
+    """
+    try:
+        data = datetime.now().strftime("%d/%m/%Y")
+        hora = datetime.now().strftime("%H:%M")
+        total = sum(erro["count"] for erro in resumo)
+
+        assunto = f"Erro - RPA [{processo}] {data} ⏰ {hora} - {total} ocorrências"
+        linhas = [
+            f"O processo RPA '{processo}' registrou {total} ocorrências de {len(resumo)} erros distintos.\n"
+        ]
+        for erro in resumo:
+            linhas.append(
+                f"- [{erro['level']}] {erro['stage']} ({erro['count']}x, "
+                f"{erro['first_seen']:%H:%M:%S} a {erro['last_seen']:%H:%M:%S})\n"
+                f"  {erro['exception_type'] or 'Sem exceção'}: {erro['message']}"
+            )
+        corpo = "\n".join(linhas)
+
+        # Anexa as capturas de tela de amostra
+        mensagem = build_email_bytes(assunto, corpo, remetente, anexos=screenshots)
+        obter_mail_dispatcher(remetente, senha_app).send(mensagem, remetente, destinatarios, logger=logger)
+
+    except Exception as erro:
+        raise Exception(f"Erro ao enviar e-mail de resumo de erros: {erro}")
+
+
+def send_error_digest(processo: str, resumo: list[dict], screenshots: list[str] = None) -> None:
+    """
+    Envia o e-mail de resumo de erros com as credenciais e os destinatários definidos na configuração global.
+
+    Parâmetros:
+        processo (str): Nome do processo RPA em que os erros ocorreram.
+        resumo (list[dict]): Erros agrupados (ver `enviar_email_resumo_erros`).
+        screenshots (list[str], opcional): Caminhos das capturas de tela de amostra.
+    """
+    enviar_email_resumo_erros(
+        remetente=vars_map['EMAIL_USERNAME'],
+        senha_app=vars_map['EMAIL_PASSWORD'],
+        destinatarios=ler_emails_da_planilha(vars_map['DEFAULT_EMAILS_FILE']),
+        processo=processo,
+        resumo=resumo,
+        screenshots=screenshots
+    )
+
+
+def send_error_email(processo: str, mensagem_erro: str, caminho_screenshot: str = None) -> None:
+    """
+    Envia imediatamente o e-mail de erro de uma única ocorrência, com as credenciais e os
+    destinatários definidos na configuração global.
+
+    Parâmetros:
+        processo (str): Nome do processo/etapa em que o erro ocorreu.
+        mensagem_erro (str): Descrição resumida do erro.
+        caminho_screenshot (str, opcional): Caminho da captura de tela a ser anexada.
+    """
+    enviar_email_de_erro(
+        remetente=vars_map['EMAIL_USERNAME'],
+        senha_app=vars_map['EMAIL_PASSWORD'],
+        destinatarios=ler_emails_da_planilha(vars_map['DEFAULT_EMAILS_FILE']),
+        processo=processo,
+        mensagem_erro=mensagem_erro,
+        caminho_screenshot=caminho_screenshot
+    )
+
+
 def executar_envio_email(
     caminho_arquivo_anexo: str,
     nome_processo: str,
-    logger=None
-) -> None:
+    logger=None,
+    assincrono: bool = False
+) -> Future | None:
     """
     Função orquestradora que realiza o envio do e-mail de conclusão do RPA com planilha em anexo.
 
@@ -224,9 +348,10 @@ def executar_envio_email(
         caminho_arquivo_anexo (str): Caminho completo da planilha gerada pelo processo.
         nome_processo (str): Nome do processo RPA (para aparecer no assunto e corpo do e-mail).
         logger (opcional): Instância do logger integrado para registrar eventos.
+        assincrono (bool, opcional): Se True, o envio é feito em segundo plano. Padrão: False.
 
     Retorna:
-        None
+        Future | None: Com `assincrono`, o Future do envio; senão None.
     """
     try:
         from config import vars_map
@@ -249,14 +374,15 @@ def executar_envio_email(
 
         destinatarios = ler_emails_da_planilha(caminho_planilha_emails)
 
-        enviar_email_com_anexo(
+        return enviar_email_com_anexo(
             caminho_arquivo_anexo=caminho_arquivo_anexo,
             assunto=assunto,
             corpo=corpo,
             remetente=remetente,
             senha_app=senha_app,
             destinatarios=destinatarios,
-            logger=logger
+            logger=logger,
+            assincrono=assincrono
         )
 
     except Exception as erro:
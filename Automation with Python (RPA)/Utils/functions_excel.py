@@ -1,11 +1,23 @@
 import os
+import json
 import time
+import glob
+import hashlib
 
 import pandas as pd
-from openpyxl.styles import PatternFill
-from openpyxl import load_workbook
+from openpyxl.styles import PatternFill, Font
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 
-from Utils.integrated_logger import IntegratedLogger
+from Utils.result_accumulator import ResultAccumulator
+from Utils.helper_functions import validate_package_rows
+from Utils.money import quote_cents_frame, cheapest_carrier
+from Utils.run_profiler import profiled
+
+COLUNAS_COTACAO = ["VALOR COTAÇÃO CORREIOS", "VALOR COTAÇÃO JADLOG"]
+
+# Cor verde usada para destacar a cotação mais barata de cada linha
+PREENCHIMENTO_MENOR_VALOR = PatternFill(start_color="33CC33", end_color="33CC33", fill_type="solid")
 
 
 def open_excel_file_to_dataframe(input_file_path, logger):
@@ -44,6 +56,117 @@ def open_excel_file_to_dataframe(input_file_path, logger):
         raise
 
 
+def input_snapshot_path(input_file_path, cache_path):
+    """
+    Monta o caminho do arquivo Parquet (sidecar) que guarda a leitura já processada da planilha de entrada.
+
+    O nome do arquivo combina um hash do caminho absoluto da planilha com a data de modificação
+    (mtime) e o tamanho do arquivo, de forma que qualquer alteração na planilha gera um novo snapshot.
+
+    Parâmetros:
+        input_file_path (str): Caminho da planilha de entrada.
+        cache_path (str): Pasta onde os snapshots são armazenados.
+
+    Retorna:
+        str: Caminho completo do arquivo Parquet correspondente ao estado atual da planilha.
+    """
+    stat = os.stat(input_file_path)
+    path_hash = hashlib.sha1(os.path.abspath(input_file_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_path, "input_snapshots", f"{path_hash}_{stat.st_mtime_ns}_{stat.st_size}.parquet")
+
+
+def _snapshot_cell(value) -> str:
+    # Tipos do numpy (ex: numpy.int64) são gravados como o tipo Python equivalente
+    if hasattr(value, "item"):
+        value = value.item()
+    return json.dumps(value, ensure_ascii=False)
+
+
+def encode_input_snapshot(df_input: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte cada célula da planilha de entrada em texto JSON, preservando o tipo original (int, float,
+    texto ou vazio). Sem isso, o Parquet converteria colunas com inteiros e decimais em float
+    (ex: 100 -> 100.0) e falharia em colunas com textos e números misturados.
+
+    Raises:
+        TypeError: Se alguma célula tiver um tipo sem representação em JSON (ex: datas).
+    """
+    return df_input.apply(lambda column: column.map(_snapshot_cell)).astype(str)
+
+
+def decode_input_snapshot(df_snapshot: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reconstrói os dados da planilha de entrada gravados por `encode_input_snapshot`, com os mesmos
+    valores e tipos da leitura do Excel (`open_excel_file_to_dataframe`).
+    """
+    # Monta cada coluna já como object: `Series.map` converteria colunas com int e float em float
+    columns = {
+        column: pd.Series([json.loads(value) for value in df_snapshot[column]], index=df_snapshot.index, dtype=object)
+        for column in df_snapshot.columns
+    }
+    return pd.DataFrame(columns, index=df_snapshot.index)
+
+
+@profiled()
+def load_input_snapshot(input_file_path, logger, cache_path=None):
+    """
+    Carrega a planilha de entrada uma única vez por execução, reaproveitando um snapshot Parquet
+    quando a planilha não foi alterada desde a última leitura.
+
+    Quando não existe snapshot válido, a planilha é lida com `open_excel_file_to_dataframe` e o
+    resultado é gravado em Parquet para as próximas execuções. As células são gravadas como texto
+    JSON (ver `encode_input_snapshot`), de forma que o snapshot devolve exatamente os mesmos valores
+    e tipos da leitura do Excel. Falhas ao ler ou gravar o snapshot (ex: `pyarrow` não instalado)
+    são registradas como aviso e não interrompem o processo.
+
+    Parâmetros:
+        input_file_path (str): Caminho da planilha de entrada.
+        logger (IntegratedLogger): Logger usado para gerar arquivos de log.
+        cache_path (str, opcional): Pasta dos snapshots. Padrão: 'DEFAULT_CACHE_PATH' do `vars_map`.
+
+    Retorna:
+        pd.DataFrame: DataFrame com os dados da planilha, no mesmo formato de `open_excel_file_to_dataframe`.
+
+    Raises:
+        FileNotFoundError: Se o arquivo não for encontrado no caminho especificado.
+        Exception: Para qualquer outro erro que ocorra durante a leitura da planilha.
+    """
+    if cache_path is None:
+        from config import vars_map
+        cache_path = vars_map['DEFAULT_CACHE_PATH']
+
+    if not os.path.exists(input_file_path):
+        return open_excel_file_to_dataframe(input_file_path, logger)
+
+    snapshot_path = input_snapshot_path(input_file_path, cache_path)
+
+    if os.path.exists(snapshot_path):
+        try:
+            df_input = decode_input_snapshot(pd.read_parquet(snapshot_path))
+            logger.info("Planilha de entrada sem alterações: dados carregados do snapshot local.")
+            logger.debug(f"Snapshot utilizado: {snapshot_path}")
+            return df_input
+        except Exception:
+            logger.warning(f"Snapshot da planilha de entrada ignorado ({snapshot_path})")
+
+    df_input = open_excel_file_to_dataframe(input_file_path, logger)
+
+    try:
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        df_snapshot = encode_input_snapshot(df_input)
+        # Remove snapshots antigos da mesma planilha antes de gravar o atual
+        prefix = os.path.basename(snapshot_path).split("_")[0]
+        for old_snapshot in glob.glob(os.path.join(os.path.dirname(snapshot_path), f"{prefix}_*.parquet")):
+            os.remove(old_snapshot)
+        df_snapshot.to_parquet(snapshot_path, index=False)
+        logger.debug(f"Snapshot da planilha de entrada gravado em: {snapshot_path}")
+    except Exception:
+        logger.warning("Não foi possível gravar o snapshot da planilha de entrada")
+
+    return df_input
+
+
+@profiled()
 def create_output_dataframe(df_input, logger):
     """
     Cria um DataFrame vazio com colunas predefinidas.
@@ -85,14 +208,37 @@ def create_output_dataframe(df_input, logger):
         raise
 
 
-def save_df_output_to_excel(output_path, df_output, logger):
+def cheapest_quotation_columns(df_output: pd.DataFrame) -> pd.Series:
+    """
+    Identifica, para cada linha, a coluna de cotação (Correios ou Jadlog) com o menor valor.
+
+    Parâmetros:
+        df_output (pd.DataFrame): DataFrame contendo as colunas de cotação dos Correios e da Jadlog.
+
+    Retorna:
+        pd.Series: Nome da coluna com o menor valor por linha, ou None quando nenhuma cotação é numérica.
+
+    Raises:
+        ValueError: Se as colunas esperadas de cotação não existirem no DataFrame.
+    """
+    # Converte os valores ("R$ 1.234,56", "R$ 23.90", ...) em centavos para comparação
+    centavos = quote_cents_frame(df_output, {coluna: coluna for coluna in COLUNAS_COTACAO})
+    return cheapest_carrier(centavos)
+
+
+@profiled()
+def save_df_output_to_excel(output_path, df_output, logger, highlight_cheapest=True):
     """
     Salva o DataFrame em um arquivo Excel no caminho especificado.
+
+    A planilha é gravada em uma única passada, no modo de escrita em fluxo (write-only) do openpyxl,
+    sem reabrir o arquivo. Com `highlight_cheapest`, a célula da cotação mais barata de cada linha
+    (Correios ou Jadlog) recebe o preenchimento verde durante a própria escrita.
     
     Parâmetros:
         output_path (str): Caminho onde o arquivo Excel será salvo.
-        cnpj (str): CNPJ que será usado no nome do arquivo.
         df_output (pd.DataFrame): DataFrame a ser salvo.
+        highlight_cheapest (bool, opcional): Destaca a menor cotação de cada linha. Padrão: True.
     
     Retorna:
         str: Caminho do arquivo Excel gerado.
@@ -108,10 +254,44 @@ def save_df_output_to_excel(output_path, df_output, logger):
         file_name = f"cnpj_{current_date}.xlsx"
         logger.debug(f"Nome do arquivo criado: {file_name}")
 
-        # Salvando DataFrame como arquivo Excel
+        # Posição (0-indexed) da coluna com a menor cotação em cada linha, ou -1 quando não há destaque
+        posicoes_destaque = [-1] * len(df_output)
+        if highlight_cheapest and all(coluna in df_output.columns for coluna in COLUNAS_COTACAO):
+            menores = cheapest_quotation_columns(df_output)
+            posicoes_destaque = [
+                df_output.columns.get_loc(coluna) if coluna is not None else -1
+                for coluna in menores
+            ]
+
+        workbook = Workbook(write_only=True)
+        worksheet = workbook.create_sheet("Sheet1")  # mesmo nome de aba usado pelo to_excel
+
+        # Cabeçalho em negrito, como no to_excel do pandas
+        cabecalho = []
+        for coluna in df_output.columns:
+            celula = WriteOnlyCell(worksheet, value=str(coluna))
+            celula.font = Font(bold=True)
+            cabecalho.append(celula)
+        worksheet.append(cabecalho)
+
+        # Escreve as linhas em fluxo, substituindo valores ausentes por células vazias
+        valores = df_output.astype(object).where(df_output.notna(), None)
+        destacadas = 0
+        for linha, posicao in zip(valores.itertuples(index=False, name=None), posicoes_destaque):
+            if posicao >= 0 and linha[posicao] is not None:
+                linha = list(linha)
+                celula = WriteOnlyCell(worksheet, value=linha[posicao])
+                celula.fill = PREENCHIMENTO_MENOR_VALOR
+                linha[posicao] = celula
+                destacadas += 1
+            worksheet.append(linha)
+
+        # Salvando a planilha como arquivo Excel
         output_file_path = f"{output_path}/{file_name}"
-        df_output.to_excel(output_file_path, index=False)
+        workbook.save(output_file_path)
         logger.info(f"Sucesso, arquivo criado: {file_name}")
+        if highlight_cheapest:
+            logger.info(f"Menor cotação destacada em {destacadas} linhas.")
         logger.debug(f"Arquivo Excel criado com sucesso em: {output_path}")
 
         return output_file_path
@@ -142,24 +322,23 @@ def clean_df_if_null(df_to_clean, na_not_allowed_columns, logger):
         # Cria uma lista para receber os CNPJs com alguma célula vazia
         empty_cells = []
 
-        # Verifica se há células em branco em cada linha
-        rows_to_drop = []        
-        for _, row in df_to_clean.iterrows():
-            empty_rows = row[row.isnull()].index.tolist()
+        # Verifica, de uma só vez, as células em branco de todas as linhas
+        null_mask = df_to_clean.isnull()
+        rows_with_null = null_mask.any(axis=1)
+        if rows_with_null.any():
+            # Concatena os nomes das colunas vazias de cada linha e separa em listas
+            separator = "\x1f"
+            empty_columns = (
+                null_mask.loc[rows_with_null]
+                .dot(df_to_clean.columns.astype(str) + separator)
+                .str.rstrip(separator)
+                .str.split(separator)
+            )
             # Registra as linhas vazias na lista como um dicionário
-            if empty_rows:
-                empty_cells.append({
-                    "CNPJ": row["CNPJ"],
-                    "NA": empty_rows
-                    })
-            # Verifica se há colunas com células vazias que estão na lista de colunas onde valores nulos não são permitidos
-                if any(
-                    column in na_not_allowed_columns
-                    # Para cada coluna com célula vazia na linha atual, 
-                    # verifica se a coluna está na lista de colunas que não permitem valores nulos
-                    for column in empty_rows
-                    ):
-                    rows_to_drop.append(row.name)
+            empty_cells = [
+                {"CNPJ": cnpj, "NA": columns}
+                for cnpj, columns in zip(df_to_clean.loc[rows_with_null, "CNPJ"], empty_columns)
+            ]
 
         # Registra os CNPJs com células vazias
         if empty_cells:
@@ -193,18 +372,13 @@ def write_if_null_output(df_output, empty_cells, logger):
     try:
         logger.info("Iniciando o processo de registro de células vazias")
 
-        # Itera sobre a lista de células vazias para preencher a coluna 'Status'
+        # Acumula o 'Status' de cada CNPJ com células vazias e grava tudo de uma só vez
+        resultados = ResultAccumulator()
         for empty in empty_cells:
-            # Verifica se, na linha, o índice CNPJ é igual
-            value = empty['CNPJ']
-            index = df_output[df_output["CNPJ"] == value].index
-            # Verifica se a linha com o CNPJ existe no df_output e preenche
-            if not index.empty:
-                # Atualiza a coluna 'Status' na linha correspondente
-                df_output.at[index, "STATUS"] = f"Campos vazios: {empty['NA']}"
-                logger.info(f"Coluna 'Status' atualizada para o CNPJ {empty['CNPJ']}: {empty['NA']}")
+            resultados.set(empty['CNPJ'], "STATUS", f"Campos vazios: {empty['NA']}")
+            logger.info(f"Coluna 'Status' atualizada para o CNPJ {empty['CNPJ']}: {empty['NA']}")
 
-        return df_output
+        return resultados.apply(df_output)
 
 
     except Exception as erro:
@@ -217,9 +391,9 @@ def compare_quotation(df_output: pd.DataFrame, output_file_path: str, logger) ->
     """
     Compara os valores de cotação entre Correios e Jadlog e destaca no Excel o menor valor com uma cor visual.
 
-    A função cria uma coluna auxiliar para identificar o menor valor entre as cotações de cada linha
-    e aplica preenchimento verde à célula correspondente no arquivo Excel. Em seguida, remove a
-    coluna temporária e salva o arquivo.
+    Reabre um arquivo já salvo e aplica o preenchimento verde à célula com a menor cotação de cada linha.
+    Mantida para planilhas geradas sem destaque; o fluxo principal já destaca o menor valor na
+    escrita (ver `save_df_output_to_excel`), sem reabrir o arquivo.
 
     Parâmetros:
         df_output (pd.DataFrame): DataFrame contendo as colunas de cotação dos Correios e da Jadlog.
@@ -236,60 +410,35 @@ def compare_quotation(df_output: pd.DataFrame, output_file_path: str, logger) ->
     try:
         logger.info("Iniciando o processo de comparação de cotações: Correios vs Jadlog")
 
-        # Verifica se as colunas esperadas existem no DataFrame
-        colunas_esperadas = ["VALOR COTAÇÃO CORREIOS", "VALOR COTAÇÃO JADLOG"]
-        for coluna in colunas_esperadas:
-            if coluna not in df_output.columns:
-                logger.error(f"Coluna ausente: {coluna}")
-                raise ValueError(f"A coluna '{coluna}' não está presente no DataFrame.")
-
-        # Cria cópia para transformar os valores em float para comparação
-        df_formatado = df_output.copy()
-        for col in colunas_esperadas:
-            df_formatado[col] = (
-                df_formatado[col]
-                .astype(str)
-                .str.replace("R$", "", regex=False)
-                .str.replace(",", ".", regex=False)
-                .astype(float)
-            )
-
         # Identifica o nome da coluna com o menor valor para cada linha
-        coluna_tmp = "__MENOR_VALOR_TMP__"
-        df_output[coluna_tmp] = df_formatado[colunas_esperadas].idxmin(axis=1)
-        logger.info(f"Coluna auxiliar '{coluna_tmp}' criada para identificar o menor valor por linha.")
+        menores = cheapest_quotation_columns(df_output)
 
         # Carrega o arquivo Excel existente
         workbook = load_workbook(output_file_path)
         worksheet = workbook.active
         logger.info("Arquivo Excel carregado com sucesso.")
 
-        # Define cor verde para preenchimento da célula
-        preenchimento_verde = PatternFill(start_color="33CC33", end_color="33CC33", fill_type="solid")
-
-        for index, row in df_output.iterrows():
-            coluna_menor = row[coluna_tmp]
+        for posicao, coluna_menor in enumerate(menores):
+            if coluna_menor is None:
+                continue
             coluna_excel = df_output.columns.get_loc(coluna_menor) + 1  # +1 porque Excel é 1-indexed
-            linha_excel = index + 2  # +2 porque a primeira linha é o cabeçalho
+            linha_excel = posicao + 2  # +2 porque a primeira linha é o cabeçalho
 
             celula = worksheet.cell(row=linha_excel, column=coluna_excel)
             if celula.value is not None:
-                celula.fill = preenchimento_verde
+                celula.fill = PREENCHIMENTO_MENOR_VALOR
                 logger.debug(f"Célula com menor valor preenchida na linha {linha_excel}, coluna {coluna_excel}.")
 
-        # Remove a coluna temporária usada apenas internamente
-        df_output.drop(columns=coluna_tmp, inplace=True)
-        logger.debug(f"Coluna auxiliar '{coluna_tmp}' removida do DataFrame.")
-
         # Salva o Excel com as alterações
         workbook.save(output_file_path)
         logger.info(f"Arquivo Excel atualizado com destaques salvos em: {output_file_path}")
 
     except Exception as erro:
-        logger.error("Erro na execução da função 'compare_quotation'", exc_info=True)
+        logger.error("Erro na execução da função 'compare_quotation'")
         raise
 
 
+@profiled()
 def make_column_endereco(df, logger):
     """
     Combina as colunas de logradouro, número e município em uma única coluna de endereço.
@@ -322,10 +471,15 @@ def make_column_endereco(df, logger):
         raise   
 
 
+@profiled()
 def make_jadlog_correios_dataframes(df_output, api_data, logger):
     """
     Pega as informações do Dataframe original, junta com as informações dadas pela API 
     e divide em três dataframes que serão usados no fluxo principal.
+
+    As linhas de cada transportadora são validadas com `validate_package_rows` (campos vazios,
+    CEP, formato das dimensões e, para os Correios, limites de dimensão); as rejeitadas ficam
+    fora do DataFrame da transportadora e têm o motivo registrado no 'STATUS'.
     
     Args:
         df_output (pd.DataFrame): Dataframe onde ocorrem as edições.
@@ -353,19 +507,28 @@ def make_jadlog_correios_dataframes(df_output, api_data, logger):
         df_output.update(api_data)
         df_output = df_output.reset_index()
         
+        # Valida de uma só vez as linhas de cada transportadora (campos vazios, CEP e dimensões)
+        correios_validas, correios_motivos = validate_package_rows(
+            df_output[correios_columns], correios_columns, check_correios_limits=True
+        )
+        jadlog_validas, jadlog_motivos = validate_package_rows(df_output[jadlog_columns], jadlog_columns)
+
         # Limpa e prepara DataFrame para Correios
-        df_correios, empty_cells = clean_df_if_null(df_output[correios_columns], correios_columns, logger)
-        df_output = write_if_null_output(df_output, empty_cells, logger)
-        
+        df_correios = df_output.loc[correios_validas, correios_columns]
+
         # Limpa e prepara DataFrame para JadLog
-        df_jadlog, empty_cells = clean_df_if_null(df_output[jadlog_columns], jadlog_columns, logger)
-        df_jadlog = df_jadlog.astype(str)
-        df_jadlog['VALOR DO PEDIDO'] = df_jadlog['VALOR DO PEDIDO'].apply(lambda x: x.replace('.', ','))
-        
-        # Registra as células vazias no DataFrame de saída
-        df_output = write_if_null_output(df_output, empty_cells, logger)
-        
-        return df_output, df_correios, df_jadlog
+        df_jadlog = df_output.loc[jadlog_validas, jadlog_columns].astype(str)
+        df_jadlog['VALOR DO PEDIDO'] = df_jadlog['VALOR DO PEDIDO'].str.replace('.', ',', regex=False)
+
+        # Registra no 'STATUS' o motivo das linhas rejeitadas (o da Jadlog prevalece, como antes)
+        resultados = ResultAccumulator()
+        for validas, motivos in ((correios_validas, correios_motivos), (jadlog_validas, jadlog_motivos)):
+            for cnpj, motivo in zip(df_output.loc[~validas, 'CNPJ'], motivos[~validas]):
+                resultados.set(cnpj, "STATUS", motivo)
+        logger.info(f"Linhas válidas para cotação: {int(correios_validas.sum())}/{len(df_output)} Correios, "
+                    f"{int(jadlog_validas.sum())}/{len(df_output)} Jadlog.")
+
+        return resultados.apply(df_output), df_correios, df_jadlog
 
     except Exception as erro:
         logger.error('Execução make_jadlog_correios_dataframes')
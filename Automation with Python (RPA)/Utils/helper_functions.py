@@ -1,6 +1,18 @@
+import time
+import numpy as np
 import pandas as pd
 from pandas import Series
 
+CAMPO_DIMENSOES = "DIMENSÕES CAIXA (altura x largura x comprimento cm)"
+
+# Limites (mínimo, máximo) em cm aceitos pelos Correios para cada dimensão e para a soma das três
+CORREIOS_DIMENSION_LIMITS = {
+    "height": (0.4, 100),
+    "width": (8, 100),
+    "length": (13, 100),
+    "total": (21.4, 200),
+}
+
 def check_variables_correios(row: Series) -> tuple[dict, str, str, str]:
     """
     Valida e extrai as variáveis necessárias para simulação de envio nos Correios.
@@ -89,11 +101,12 @@ def are_package_dimensions_valid(height: str, width: str, length: str) -> bool:
         soma_total = altura + largura + comprimento
 
         # Lista de restrições estabelecidas pelos Correios
+        limites = CORREIOS_DIMENSION_LIMITS
         restricoes = [
-            0.4 <= altura <= 100,
-            8 <= largura <= 100,
-            13 <= comprimento <= 100,
-            21.4 <= soma_total <= 200
+            limites["height"][0] <= altura <= limites["height"][1],
+            limites["width"][0] <= largura <= limites["width"][1],
+            limites["length"][0] <= comprimento <= limites["length"][1],
+            limites["total"][0] <= soma_total <= limites["total"][1]
         ]
 
         return all(restricoes)
@@ -104,6 +117,106 @@ def are_package_dimensions_valid(height: str, width: str, length: str) -> bool:
 
 
 
+def split_package_dimensions(dimensions: Series) -> pd.DataFrame:
+    """
+    Separa, de forma vetorizada, a coluna de dimensões ("altura x largura x comprimento") em valores numéricos.
+
+    Parâmetros:
+        dimensions (Series): Coluna de dimensões da planilha (ex: "10 x 15 x 30").
+
+    Retorna:
+        pd.DataFrame: DataFrame com o mesmo índice e as colunas 'height', 'width' e 'length' (float).
+        Valores ausentes, não numéricos ou fora do formato esperado resultam em NaN.
+    """
+    partes = dimensions.astype("string").str.strip().str.split(" x ", expand=True)
+    # Garante exatamente três colunas; textos com mais partes são considerados inválidos
+    partes = partes.reindex(columns=range(4))
+    partes.loc[partes[3].notna(), [0, 1, 2]] = None
+
+    numeros = partes[[0, 1, 2]].apply(pd.to_numeric, errors="coerce")
+    numeros.columns = ["height", "width", "length"]
+    return numeros
+
+
+def validate_package_rows(df: pd.DataFrame, required_columns: list,
+    check_correios_limits: bool = False) -> tuple[Series, Series]:
+    """
+    Valida, em uma única passada vetorizada, as linhas de pacote usadas nas cotações dos Correios e da Jadlog.
+
+    As verificações são, em ordem de prioridade (o motivo registrado é o da primeira falha):
+        - Campos obrigatórios vazios;
+        - CEP de destino não numérico;
+        - Dimensões fora do formato "altura x largura x comprimento" numérico;
+        - Dimensões fora dos limites dos Correios (`CORREIOS_DIMENSION_LIMITS`), se `check_correios_limits`.
+
+    Parâmetros:
+        df (pd.DataFrame): DataFrame com as colunas de entrada (incluindo 'CEP' e a coluna de dimensões).
+        required_columns (list): Colunas que não podem estar em branco.
+        check_correios_limits (bool, opcional): Aplica os limites de dimensão dos Correios. Padrão: False.
+
+    Retorna:
+        tuple[Series, Series]: Uma tupla contendo:
+            - máscara booleana com True para as linhas válidas;
+            - motivo da rejeição por linha (string vazia para as linhas válidas).
+    """
+    nulos = df[required_columns].isnull()
+    tem_nulos = nulos.any(axis=1)
+
+    # Lista das colunas vazias por linha, no mesmo formato usado no STATUS ("Campos vazios: [...]")
+    colunas_vazias = Series("", index=df.index, dtype=object)
+    if tem_nulos.any():
+        separador = "\x1f"
+        nomes = nulos.loc[tem_nulos].dot(pd.Index(required_columns) + separador).str.rstrip(separador)
+        colunas_vazias.loc[tem_nulos] = "Campos vazios: " + nomes.str.split(separador).astype(str)
+
+    cep_invalido = ~df["CEP"].astype("string").str.strip().str.isdigit().fillna(False).astype(bool)
+
+    dimensoes = split_package_dimensions(df[CAMPO_DIMENSOES])
+    formato_invalido = dimensoes.isnull().any(axis=1)
+
+    fora_dos_limites = Series(False, index=df.index)
+    if check_correios_limits:
+        medidas = dimensoes.assign(total=dimensoes.sum(axis=1, min_count=3))
+        for coluna, (minimo, maximo) in CORREIOS_DIMENSION_LIMITS.items():
+            fora_dos_limites |= ~medidas[coluna].between(minimo, maximo)
+
+    condicoes = [c.to_numpy(dtype=bool) for c in (tem_nulos, cep_invalido, formato_invalido, fora_dos_limites)]
+    motivos = [
+        colunas_vazias.to_numpy(),
+        "Falha ao validar linha da planilha: CEP de destino inválido.",
+        "Falha ao validar linha da planilha: Formato inválido nas dimensões da embalagem.",
+        "Falha ao validar linha da planilha: Dimensões da embalagem fora dos critérios dos Correios.",
+    ]
+    motivo = Series(np.select(condicoes, motivos, default=""), index=df.index)
+
+    return motivo == "", motivo
+
+
+def wait_until(condition, timeout: int, interval: float = 0.1) -> bool:
+    """
+    Aguarda até que uma condição seja verdadeira ou até o tempo limite ser atingido.
+
+    Parâmetros:
+        condition (callable): Função sem argumentos que retorna um valor verdadeiro quando a condição é atendida.
+        timeout (int): Tempo limite em milissegundos.
+        interval (float, opcional): Intervalo entre as verificações, em segundos. Padrão: 0.1.
+
+    Retorna:
+        bool: True se a condição foi atendida dentro do tempo limite, False caso contrário.
+    """
+    deadline = time.monotonic() + timeout / 1000
+    while True:
+        try:
+            if condition():
+                return True
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+
+
+
 def get_jadlog_value(jadlog_service: str) -> str:
     """
     Retorna o código correspondente ao tipo de serviço Jadlog informado.
@@ -0,0 +1,226 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+import pandas as pd
+
+# Colunas da planilha de entrada que definem se uma linha mudou desde a execução anterior. O CEP de
+# destino não está na planilha (vem da BrasilAPI, consultada só para as linhas alteradas): a mudança
+# de endereço de um CNPJ é percebida quando o resultado expira ('INCREMENTAL_MAX_AGE_HOURS').
+INCREMENTAL_COLUMNS = (
+    "CNPJ", "DIMENSÕES CAIXA (altura x largura x comprimento cm)", "PESO DO PRODUTO",
+    "TIPO DE SERVIÇO JADLOG", "TIPO DE SERVIÇO CORREIOS", "VALOR DO PEDIDO",
+)
+
+
+def _cell_text(value) -> str:
+    """
+    Texto normalizado de uma célula: vazio para None/NaN e números inteiros sem casas decimais
+    (1.0 -> "1"), para que a mesma planilha lida como int ou float gere o mesmo hash.
+    """
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return ""
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def row_hashes(df_input: pd.DataFrame, columns: tuple = INCREMENTAL_COLUMNS) -> pd.Series:
+    """
+    Calcula o hash (SHA-256) de cada linha da planilha de entrada, considerando apenas `columns`
+    (as ausentes na planilha são ignoradas). Células vazias, espaços nas pontas e a leitura de um número
+    inteiro como float (1.0) não alteram o hash.
+
+    Parâmetros:
+        df_input (pd.DataFrame): Dados da planilha de entrada.
+        columns (tuple[str], opcional): Colunas consideradas. Padrão: `INCREMENTAL_COLUMNS`.
+
+    Retorna:
+        pd.Series: Hash em hexadecimal de cada linha, com o mesmo índice de `df_input`.
+    """
+    present = [column for column in columns if column in df_input.columns]
+    return pd.Series(
+        [
+            hashlib.sha256("\x1f".join(_cell_text(value) for value in values).encode("utf-8")).hexdigest()
+            for values in df_input[present].itertuples(index=False, name=None)
+        ],
+        index=df_input.index,
+        dtype=object
+    )
+
+
+def _cnpj_key(cnpj) -> str:
+    return json.dumps(_cell_text(cnpj))
+
+
+class IncrementalStore:
+    """
+    Hashes e resultados da última execução concluída, por CNPJ, em SQLite.
+
+    Permite processar apenas as linhas novas ou alteradas da planilha de entrada (`split_changed`) e
+    completar o relatório com os resultados anteriores das demais (`merge_with_previous`). Cada
+    planilha de entrada (`source`) tem os seus próprios registros.
+    """
+
+    def __init__(self, db_path: str, source: str):
+        self.db_path = db_path
+        self.source = source
+        self._lock = threading.Lock()
+        # Data de gravação original dos resultados reaproveitados por `split_changed` (mantida em `save`)
+        self._reused_at = {}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS incremental_rows ("
+            "source TEXT NOT NULL, cnpj TEXT NOT NULL, row_hash TEXT NOT NULL, payload TEXT NOT NULL, "
+            "updated_at REAL NOT NULL, PRIMARY KEY (source, cnpj))"
+        )
+        self._conn.commit()
+
+    def load(self) -> dict:
+        """
+        Retorna os registros da última execução ({cnpj: (hash, linha de saída, gravado em)}).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT cnpj, row_hash, payload, updated_at FROM incremental_rows WHERE source = ?",
+                (self.source,)
+            ).fetchall()
+        return {cnpj: (row_hash, json.loads(payload), updated_at) for cnpj, row_hash, payload, updated_at in rows}
+
+    def split_changed(self, df_input: pd.DataFrame, hashes: pd.Series, max_age_seconds: float = None):
+        """
+        Separa as linhas da planilha de entrada que precisam ser processadas das que podem reaproveitar
+        o resultado da última execução.
+
+        Uma linha é reaproveitada quando o hash é igual ao gravado, o resultado anterior não tem 'STATUS'
+        (sem falha ou rejeição) e não é mais antigo que `max_age_seconds`.
+
+        Parâmetros:
+            df_input (pd.DataFrame): Dados da planilha de entrada.
+            hashes (pd.Series): Hash de cada linha (ver `row_hashes`).
+            max_age_seconds (float, opcional): Idade máxima de um resultado reaproveitado.
+
+        Retorna:
+            tuple[pd.DataFrame, pd.DataFrame]: Linhas de entrada a processar e linhas de saída
+            reaproveitadas (na ordem da planilha).
+        """
+        stored = self.load()
+        limit = time.time() - max_age_seconds if max_age_seconds else None
+
+        reused = []
+        for position, (cnpj, row_hash) in enumerate(zip(df_input["CNPJ"], hashes)):
+            previous = stored.get(_cnpj_key(cnpj))
+            if previous is None:
+                continue
+            previous_hash, payload, updated_at = previous
+            if previous_hash != row_hash or _cell_text(payload.get("STATUS")):
+                continue
+            if limit is not None and updated_at < limit:
+                continue
+            # Mantém o CNPJ no mesmo formato da planilha de entrada
+            reused.append((position, {**payload, "CNPJ": cnpj}))
+            self._reused_at[_cnpj_key(cnpj)] = updated_at
+
+        positions = {position for position, _ in reused}
+        pending = df_input.iloc[[position for position in range(len(df_input)) if position not in positions]]
+        df_previous = pd.DataFrame([payload for _, payload in reused])
+        return pending, df_previous
+
+    def save(self, df_output: pd.DataFrame, hashes: dict):
+        """
+        Substitui os registros desta planilha pelos da execução atual. Os resultados reaproveitados
+        mantêm a data de gravação original, para que expirem conforme `max_age_seconds`.
+
+        Parâmetros:
+            df_output (pd.DataFrame): DataFrame de saída final (todas as linhas da planilha).
+            hashes (dict): Hash de cada linha de entrada por CNPJ ({cnpj: hash}).
+        """
+        now = time.time()
+        records = []
+        for row in df_output.to_dict("records"):
+            row_hash = hashes.get(_cnpj_key(row.get("CNPJ")))
+            if row_hash is None:
+                continue
+            payload = {column: (None if _cell_text(value) == "" else value) for column, value in row.items()}
+            key = _cnpj_key(row["CNPJ"])
+            records.append((
+                self.source, key, row_hash,
+                json.dumps(payload, ensure_ascii=False, default=str), self._reused_at.get(key, now)
+            ))
+
+        with self._lock:
+            self._conn.execute("DELETE FROM incremental_rows WHERE source = ?", (self.source,))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO incremental_rows (source, cnpj, row_hash, payload, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                records
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def hashes_by_cnpj(df_input: pd.DataFrame, hashes: pd.Series) -> dict:
+    """
+    Indexa os hashes das linhas de entrada pelo CNPJ ({cnpj: hash}), no formato usado por `IncrementalStore.save`.
+    """
+    return {_cnpj_key(cnpj): row_hash for cnpj, row_hash in zip(df_input["CNPJ"], hashes)}
+
+
+def merge_with_previous(df_output: pd.DataFrame, df_previous: pd.DataFrame, cnpj_order: list) -> pd.DataFrame:
+    """
+    Junta as linhas processadas nesta execução com as reaproveitadas da execução anterior, na ordem
+    da planilha de entrada.
+
+    Parâmetros:
+        df_output (pd.DataFrame): Linhas de saída processadas nesta execução.
+        df_previous (pd.DataFrame): Linhas de saída reaproveitadas (ver `IncrementalStore.split_changed`).
+        cnpj_order (list): CNPJs na ordem da planilha de entrada.
+
+    Retorna:
+        pd.DataFrame: DataFrame de saída com todas as linhas (colunas de `df_output` primeiro).
+    """
+    if df_previous is None or df_previous.empty:
+        return df_output
+
+    columns = list(df_output.columns) + [column for column in df_previous.columns if column not in df_output.columns]
+    df_previous = df_previous.reindex(columns=columns).astype(object)
+    df_merged = pd.concat([df_output.reindex(columns=columns), df_previous], ignore_index=True)
+
+    # Ordena pela posição do CNPJ na planilha de entrada
+    positions = {_cnpj_key(cnpj): position for position, cnpj in enumerate(cnpj_order)}
+    order = df_merged["CNPJ"].map(lambda cnpj: positions.get(_cnpj_key(cnpj), len(positions)))
+    return df_merged.iloc[order.argsort(kind="stable")].reset_index(drop=True)
+
+
+def open_incremental_store(input_file_path: str):
+    """
+    Abre os registros do modo incremental da planilha de entrada, se 'INCREMENTAL_ENABLED' no `vars_map`.
+    O banco fica em 'DEFAULT_CACHE_PATH/incremental.sqlite'.
+
+    Parâmetros:
+        input_file_path (str): Caminho da planilha de entrada.
+
+    Retorna:
+        IncrementalStore ou None: Registros abertos, ou None se desativado ou se a planilha não existir.
+    """
+    from config import vars_map
+
+    if not vars_map['INCREMENTAL_ENABLED'] or not os.path.exists(input_file_path):
+        return None
+
+    return IncrementalStore(
+        os.path.join(vars_map['DEFAULT_CACHE_PATH'], 'incremental.sqlite'),
+        os.path.basename(input_file_path)
+    )
@@ -1,12 +1,95 @@
 import os
+import re
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import threading
 import traceback
 from datetime import datetime
-from PIL import ImageGrab
-from botcity import maestro
-from botcity.web import WebBot  # Opcional, dependendo do seu uso externo
-from .functions_email import send_error_email
+from typing import TYPE_CHECKING
+from .maestro_log_shipper import MaestroLogShipper
+from .error_notifier import ErrorNotifier
+
+if TYPE_CHECKING:
+    # Apenas para as anotações: botcity, PIL e o envio de e-mail são importados sob demanda
+    from botcity import maestro
+
+OVERFLOW_POLICIES = ("block", "drop")
+
+
+class _MaestroLogHandler(logging.Handler):
+    """
+    Envia cada registro como uma entrada de log da atividade no BotCity Maestro,
+    diretamente ou por meio de um `MaestroLogShipper` (envio em lotes).
+    """
+
+    def __init__(self, maestro: "maestro.BotMaestroSDK", activity_label: str, datetime_format: str,
+        shipper: MaestroLogShipper = None):
+        super().__init__()
+        self.maestro = maestro
+        self.activity_label = activity_label
+        self.datetime_format = datetime_format
+        self.shipper = shipper
+
+    def emit(self, record: logging.LogRecord):
+        values = {
+            "Datetime": datetime.fromtimestamp(record.created).strftime(self.datetime_format),
+            "Level": record.levelname,
+            "Message": record.getMessage()
+        }
+        try:
+            if self.shipper is not None:
+                self.shipper.submit(values)
+            else:
+                self.maestro.new_log_entry(activity_label=self.activity_label, values=values)
+        except Exception:
+            self.handleError(record)
+
+
+class _BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler com fila limitada e política de estouro definida:
+        - "block": aguarda espaço na fila (nenhum registro é perdido);
+        - "drop": descarta o registro novo e contabiliza o descarte.
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow_policy: str):
+        super().__init__(log_queue)
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.overflow_policy == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+class _RoutingHandler(logging.Handler):
+    """
+    Encaminha, na thread do QueueListener, cada registro aos handlers do logger de origem.
+    """
+
+    def __init__(self, routes: dict):
+        super().__init__()
+        self.routes = routes
+
+    def handle(self, record: logging.LogRecord):
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+    def emit(self, record: logging.LogRecord):
+        self.handle(record)
+
 
 class IntegratedLogger:
     """
@@ -15,17 +98,39 @@ class IntegratedLogger:
 
     Gera logs diários com separação entre informações relevantes para clientes e dados técnicos,
     além de capturar prints de tela e enviar alertas em casos de erro.
+
+    No modo assíncrono (`async_mode`), as chamadas de log apenas colocam os registros em uma fila
+    limitada; uma thread em segundo plano (QueueListener) grava os arquivos, o terminal e as
+    entradas do Maestro. A fila é esvaziada ao chamar `close`, o que também acontece
+    automaticamente no encerramento do processo.
+
+    Com um `log_shipper`, as entradas do Maestro são enviadas em lotes (ver `MaestroLogShipper`).
+    Com um `error_notifier`, avisos e erros repetidos são agrupados em um e-mail de resumo por
+    janela de tempo, com capturas de tela limitadas (ver `ErrorNotifier`).
     """
 
-    def __init__(self, maestro: maestro.BotMaestroSDK, filepath: os.PathLike, activity_label: str):
+    def __init__(self, maestro: "maestro.BotMaestroSDK", filepath: os.PathLike, activity_label: str,
+        async_mode: bool = False, queue_size: int = 10000, overflow_policy: str = "block",
+        log_shipper: MaestroLogShipper = None, error_notifier: ErrorNotifier = None):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Política de estouro inválida: {overflow_policy}. Use uma de {OVERFLOW_POLICIES}.")
+
         self.maestro = maestro
         self.filepath = filepath
         self.image_filepath = filepath
         self.activity_label = activity_label
         self.dev_logger = logging.getLogger("dev_logger")
         self.client_logger = logging.getLogger("client_logger")
+        self.maestro_logger = logging.getLogger("maestro_logger")
         self.datetime_format = "%d-%m-%Y %H:%M:%S"
         self.datetime_file_format = "%d-%m-%Y_%H-%M-%S"
+        self.async_mode = async_mode
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.log_shipper = log_shipper
+        self.error_notifier = error_notifier
+        self._queue_handlers = []
+        self._listener = None
         self.__initial_configs()
 
     def __initial_configs(self):
@@ -46,12 +151,10 @@ class IntegratedLogger:
             mode="a", encoding="utf-8"
         )
         handler_dev.setFormatter(logging.Formatter(fmt="%(asctime)s - %(levelname)s - %(message)s", datefmt=self.datetime_format))
-        self.dev_logger.addHandler(handler_dev)
 
         # Adiciona saída no terminal (útil para debug local)
         stream_dev = logging.StreamHandler()
         stream_dev.setFormatter(logging.Formatter(fmt="%(asctime)s - %(levelname)s - %(message)s", datefmt=self.datetime_format))
-        self.dev_logger.addHandler(stream_dev)
 
         # Configura logger de cliente
         self.client_logger.setLevel(logging.INFO)
@@ -60,7 +163,40 @@ class IntegratedLogger:
             mode="a", encoding="utf-8"
         )
         handler_client.setFormatter(logging.Formatter(fmt="%(asctime)s - %(levelname)s - %(message)s", datefmt=self.datetime_format))
-        self.client_logger.addHandler(handler_client)
+
+        # Configura o envio das entradas de log ao Maestro
+        self.maestro_logger.setLevel(logging.DEBUG)
+        self.maestro_logger.propagate = False
+        handlers_maestro = []
+        if self.maestro:
+            handlers_maestro.append(
+                _MaestroLogHandler(self.maestro, self.activity_label, self.datetime_format, self.log_shipper)
+            )
+
+        routes = {
+            self.dev_logger.name: [handler_dev, stream_dev],
+            self.client_logger.name: [handler_client],
+            self.maestro_logger.name: handlers_maestro,
+        }
+
+        if self.async_mode:
+            # Os loggers apenas enfileiram; a thread do listener faz toda a E/S
+            log_queue = queue.Queue(maxsize=self.queue_size)
+            for logger_name in routes:
+                queue_handler = _BoundedQueueHandler(log_queue, self.overflow_policy)
+                logging.getLogger(logger_name).addHandler(queue_handler)
+                self._queue_handlers.append((logger_name, queue_handler))
+            self._listener = logging.handlers.QueueListener(log_queue, _RoutingHandler(routes))
+            self._listener.start()
+        else:
+            for logger_name, handlers in routes.items():
+                for handler in handlers:
+                    logging.getLogger(logger_name).addHandler(handler)
+
+        if self.async_mode or self.log_shipper is not None or self.error_notifier is not None:
+            atexit.register(self.close)
+
+        self._routes = routes
 
         self.dev_logger.info(f"Logs salvos em: {self.filepath}")
         self.dev_logger.info(f"Capturas de erro em: {self.image_filepath}")
@@ -77,14 +213,7 @@ class IntegratedLogger:
             self.client_logger.info(line)
 
         if self.maestro:
-            self.maestro.new_log_entry(
-                activity_label=self.activity_label,
-                values={
-                    "Datetime": datetime.now().strftime(self.datetime_format),
-                    "Level": "INFO",
-                    "Message": msg.splitlines()[-1]
-                }
-            )
+            self.maestro_logger.info(msg.splitlines()[-1])
 
     def debug(self, msg: str):
         """
@@ -97,14 +226,7 @@ class IntegratedLogger:
             self.dev_logger.debug(line)
 
         if self.maestro:
-            self.maestro.new_log_entry(
-                activity_label=self.activity_label,
-                values={
-                    "Datetime": datetime.now().strftime(self.datetime_format),
-                    "Level": "DEBUG",
-                    "Message": msg.splitlines()[-1]
-                }
-            )
+            self.maestro_logger.debug(msg.splitlines()[-1])
 
     def warning(self, process_name: str):
         """
@@ -113,81 +235,127 @@ class IntegratedLogger:
         Parâmetros:
             process_name (str): Nome da etapa/processo em que o aviso ocorreu.
         """
+        self.__log_with_notification(logging.WARNING, process_name)
+
+    def error(self, process_name: str):
+        """
+        Registra um erro no log com captura de tela e envio de notificação por e-mail.
+
+        Parâmetros:
+            process_name (str): Nome da etapa/processo em que o erro ocorreu.
+        """
+        self.__log_with_notification(logging.ERROR, process_name)
+
+    def __log_with_notification(self, level: int, process_name: str):
+        """
+        Registra o aviso/erro nos logs e notifica (captura de tela, e-mail e Maestro).
+
+        Com um `error_notifier`, a notificação é agrupada e enviada em segundo plano
+        (ver `ErrorNotifier`): ocorrências repetidas não geram novas capturas nem e-mails, e o
+        erro é reportado ao Maestro apenas na primeira ocorrência.
+        """
+        level_name = logging.getLevelName(level)
         msg_list = traceback.format_exc().splitlines()
         etype, value, _ = sys.exc_info()
         msg_reduced = "".join(traceback.format_exception_only(etype, value)).strip()
 
         for msg in msg_list:
-            self.dev_logger.warning(msg)
-        self.client_logger.warning(msg_reduced)
+            self.dev_logger.log(level, msg)
+        self.client_logger.log(level, msg_reduced)
 
+        file_label = re.sub(r"[^\w-]+", "_", process_name)[:60]
         screenshot_path = os.path.join(
             self.image_filepath,
-            f"{datetime.now().strftime(self.datetime_file_format)}_RPA_{process_name}.jpg"
+            f"{datetime.now().strftime(self.datetime_file_format)}_RPA_{file_label}.jpg"
         )
 
-        try:
-            ImageGrab.grab().save(screenshot_path)
-        except Exception as e:
-            screenshot_path = None
-            self.dev_logger.warning(f"Falha ao capturar screenshot: {e}")
+        if self.error_notifier is not None:
+            screenshot_path, is_new = self.error_notifier.report(
+                level=level_name,
+                stage=process_name,
+                exception_type=etype.__name__ if etype else "",
+                message=msg_reduced if etype else process_name,
+                screenshot_path=screenshot_path
+            )
+        else:
+            from PIL import ImageGrab
+            from .functions_email import send_error_email
 
-        send_error_email(process_name, msg_reduced, screenshot_path)
+            is_new = True
+            try:
+                ImageGrab.grab().save(screenshot_path)
+            except Exception as e:
+                screenshot_path = None
+                self.dev_logger.warning(f"Falha ao capturar screenshot: {e}")
+
+            send_error_email(process_name, msg_reduced, screenshot_path)
 
         if self.maestro:
-            self.maestro.new_log_entry(
-                activity_label=self.activity_label,
-                values={
-                    "Datetime": datetime.now().strftime(self.datetime_format),
-                    "Level": "WARNING",
-                    "Message": msg_reduced
-                }
-            )
-            self.maestro.error(
-                task_id=self.maestro.get_execution().task_id,
-                exception=Exception(msg_reduced),
-                screenshot=screenshot_path
-            )
+            self.maestro_logger.log(level, msg_reduced)
+            if is_new and self.error_notifier is not None and screenshot_path is not None:
+                # A captura é gravada em segundo plano: o erro vai ao Maestro quando ela estiver gravada
+                self.error_notifier.on_screenshot_saved(
+                    screenshot_path, lambda path: self._send_maestro_error(msg_reduced, path)
+                )
+            elif is_new:
+                self._send_maestro_error(msg_reduced, screenshot_path)
 
-    def error(self, process_name: str):
+    def _send_maestro_error(self, message: str, screenshot_path: str = None):
         """
-        Registra um erro no log com captura de tela e envio de notificação por e-mail.
+        Reporta o erro ao Maestro, com a captura de tela se houver.
+        """
+        self.maestro.error(
+            task_id=self.maestro.get_execution().task_id,
+            exception=Exception(message),
+            screenshot=screenshot_path
+        )
 
-        Parâmetros:
-            process_name (str): Nome da etapa/processo em que o erro ocorreu.
+    def close(self):
         """
-        msg_list = traceback.format_exc().splitlines()
-        etype, value, _ = sys.exc_info()
-        msg_reduced = "".join(traceback.format_exception_only(etype, value)).strip()
+        Encerra o modo assíncrono: aguarda a gravação de todos os registros pendentes na fila,
+        remove os handlers da fila e descarrega os arquivos de log. Em seguida, envia o resumo
+        pendente do `error_notifier` e as entradas pendentes do `log_shipper` ao Maestro.
+        Chamado automaticamente ao final do processo.
+        """
+        if self.error_notifier is not None:
+            self.error_notifier.close(timeout=60)
 
-        for msg in msg_list:
-            self.dev_logger.error(msg)
-        self.client_logger.error(msg_reduced)
+        if self._listener is None:
+            self._close_shipper()
+            return
 
-        screenshot_path = os.path.join(
-            self.image_filepath,
-            f"{datetime.now().strftime(self.datetime_file_format)}_RPA_{process_name}.jpg"
-        )
+        listener, self._listener = self._listener, None
+        listener.stop()  # Processa os registros restantes e finaliza a thread
 
-        try:
-            ImageGrab.grab().save(screenshot_path)
-        except Exception as e:
-            screenshot_path = None
-            self.dev_logger.warning(f"Falha ao capturar screenshot: {e}")
+        dropped = 0
+        for logger_name, queue_handler in self._queue_handlers:
+            logging.getLogger(logger_name).removeHandler(queue_handler)
+            dropped += queue_handler.dropped
+        self._queue_handlers = []
 
-        send_error_email(process_name, msg_reduced, screenshot_path)
+        # Reanexa os handlers diretamente, para que chamadas após o encerramento continuem registradas
+        for logger_name, handlers in self._routes.items():
+            for handler in handlers:
+                logging.getLogger(logger_name).addHandler(handler)
 
-        if self.maestro:
-            self.maestro.new_log_entry(
-                activity_label=self.activity_label,
-                values={
-                    "Datetime": datetime.now().strftime(self.datetime_format),
-                    "Level": "ERROR",
-                    "Message": msg_reduced
-                }
-            )
-            self.maestro.error(
-                task_id=self.maestro.get_execution().task_id,
-                exception=Exception(msg_reduced),
-                screenshot=screenshot_path
+        if dropped:
+            self.dev_logger.warning(f"{dropped} registros de log descartados por fila cheia (LOG_QUEUE_SIZE={self.queue_size}).")
+
+        for handler in self._routes[self.dev_logger.name] + self._routes[self.client_logger.name]:
+            handler.flush()
+
+        self._close_shipper()
+
+    def _close_shipper(self):
+        """
+        Envia as entradas pendentes do `log_shipper` (ou as grava no spool local) e encerra a thread de envio.
+        """
+        if self.log_shipper is None:
+            return
+        self.log_shipper.close(timeout=60)
+        pending = self.log_shipper.pending_spool_entries()
+        if pending:
+            self.dev_logger.warning(
+                f"{pending} entradas de log do Maestro gravadas em "
+                f"{self.log_shipper.spool_path} para reenvio."
             )
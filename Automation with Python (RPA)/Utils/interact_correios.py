@@ -1,20 +1,46 @@
 import re
 import time
 from botcity.web import WebBot, By, element_as_select
+from Utils.helper_functions import wait_until
+from Utils.run_profiler import PROFILER, profiled
 from config import vars_map
 
 URL_CORREIOS = vars_map["DEFAULT_CORREIOS_URL"]
 
+XPATH_CEP_DESTINO = "//input[@name='cepDestino']"
+XPATH_PRAZO = "//tr[@class='destaque']/th[text()='Prazo de entrega ']/following-sibling::td"
+XPATH_VALOR = "//tr[@class='destaque']/th[text()='Valor total ']/following-sibling::td"
+
+
+def reset_correios_form(bot: WebBot) -> None:
+    """
+    Prepara o navegador para uma nova cotação sem reiniciá-lo: fecha as abas de resultado
+    abertas pela consulta anterior e retorna para a aba do formulário.
+
+    Parâmetros:
+        bot (WebBot): Instância da automação Web com o navegador já aberto.
+    """
+    tabs = bot.get_tabs()
+    while len(tabs) > 1:
+        bot.activate_tab(tabs[-1])
+        bot.close_page()
+        tabs = bot.get_tabs()
+    bot.activate_tab(tabs[0])
+
+
+@profiled("correios_consulta", row=True)
 def interact_correios(bot: WebBot, service_type: str, cep_destiny: str,
     weight: str, dimensions: dict, cep_origin: str = vars_map["ORIGIN_CEP"],
     shipping_date: str = None, package_format: str = "caixa",
-    package_type: str = "Outra Embalagem",
+    package_type: str = "Outra Embalagem", keep_browser_open: bool = False,
+    timeout: int = vars_map["CORREIOS_TIMEOUT_MS"], logger=None,
 ) -> tuple[str, str]:
-    """ 
+    """
     Acessa o site dos Correios, realiza o preenchimento do formulário de cotação e retorna os dados de entrega.
 
-    Utiliza um navegador controlado pelo BotCity WebBot para simular o envio de uma encomenda. 
+    Utiliza um navegador controlado pelo BotCity WebBot para simular o envio de uma encomenda.
     Inclui uma camada de retry para garantir a abertura do site, caso falhe nas primeiras tentativas.
+    As esperas são feitas por condição (presença do formulário e do resultado), limitadas por `timeout`.
 
     Parâmetros:
         bot (WebBot): Instância da automação Web.
@@ -26,6 +52,11 @@ def interact_correios(bot: WebBot, service_type: str, cep_destiny: str,
         shipping_date (str, opcional): Data desejada de postagem (formato: ddmmaaaa). Valor padrão: data atual.
         package_format (str, opcional): Formato da embalagem. Valores possíveis: "caixa", "rolo" ou "envelope".
         package_type (str, opcional): Tipo de embalagem a ser selecionada no formulário ("Embalagem dos Correios" ou "Outra Embalagem").
+        keep_browser_open (bool, opcional): Modo sessão. Mantém o navegador aberto ao final da cotação e
+            reaproveita-o na próxima chamada, limpando o formulário. Padrão: False (fecha o navegador).
+        timeout (int, opcional): Tempo limite, em milissegundos, para cada espera por elemento. Valor padrão é
+            carregado da configuração global.
+        logger (IntegratedLogger, opcional): Logger usado para registrar a latência de cada cotação.
 
     Retorna:
         tuple[str, str]: Uma tupla contendo:
@@ -34,15 +65,24 @@ def interact_correios(bot: WebBot, service_type: str, cep_destiny: str,
 
     Raises:
         RuntimeError: Caso o site dos Correios não carregue após múltiplas tentativas.
+        TimeoutError: Caso o resultado da cotação não seja exibido dentro do tempo limite.
         Exception: Para qualquer outro erro que ocorra durante o preenchimento ou extração dos dados.
     """
+    started_at = time.perf_counter()
+
+    if bot.driver is None:
+        with PROFILER.stage("chrome_inicializacao"):
+            bot.start_browser()
+    elif keep_browser_open:
+        reset_correios_form(bot)
 
     max_attempts = 3
     for attempt in range(1, max_attempts + 1):
         try:
             bot.browse(URL_CORREIOS)
-            bot.wait(5000)  # Aguarda carregamento inicial (5 segundos)
-            bot.find_element("//input[@name='cepDestino']", By.XPATH)
+            # Aguarda o formulário ficar disponível, em vez de uma espera fixa
+            if bot.find_element(XPATH_CEP_DESTINO, By.XPATH, waiting_time=timeout) is None:
+                raise TimeoutError(f"Formulário não carregou em {timeout} ms.")
             break  # Página carregou, sai do loop
         except Exception as erro:
             if attempt < max_attempts:
@@ -60,7 +100,7 @@ def interact_correios(bot: WebBot, service_type: str, cep_destiny: str,
     bot.find_element("//input[@name='cepOrigem']", By.XPATH).click()
     bot.paste(cep_origin)
 
-    bot.find_element("//input[@name='cepDestino']", By.XPATH).click()
+    bot.find_element(XPATH_CEP_DESTINO, By.XPATH).click()
     bot.paste(cep_destiny)
 
     element_as_select(
@@ -83,22 +123,30 @@ def interact_correios(bot: WebBot, service_type: str, cep_destiny: str,
     bot.find_element("//select[@name='peso']", By.XPATH).send_keys(weight)
     bot.find_element("input.btn2", By.CSS_SELECTOR).click()
 
+    # O resultado pode abrir em uma nova aba: aguarda a aba ou o próprio resultado aparecer
+    wait_until(
+        lambda: len(bot.get_tabs()) > 1 or bot.driver.find_elements(By.XPATH, XPATH_PRAZO),
+        timeout
+    )
     tabs = bot.get_tabs()
     if len(tabs) > 1:
         bot.activate_tab(tabs[-1])
 
-    raw_time = bot.find_element(
-        "//tr[@class='destaque']/th[text()='Prazo de entrega ']/following-sibling::td",
-        By.XPATH,
-    ).text
-    raw_price = bot.find_element(
-        "//tr[@class='destaque']/th[text()='Valor total ']/following-sibling::td",
-        By.XPATH,
-    ).text
+    time_element = bot.find_element(XPATH_PRAZO, By.XPATH, waiting_time=timeout)
+    price_element = bot.find_element(XPATH_VALOR, By.XPATH, waiting_time=timeout)
+    if time_element is None or price_element is None:
+        raise TimeoutError(f"Resultado da cotação dos Correios não exibido em {timeout} ms.")
+
+    raw_time = time_element.text
+    raw_price = price_element.text
 
-    bot.stop_browser()
+    if not keep_browser_open:
+        bot.stop_browser()
 
     match = re.search(r"\+ (\d+)", raw_time)
     deliver_time = match.group(1) if match else "N/A"
 
+    if logger:
+        logger.debug(f"Cotação Correios para o CEP {cep_destiny} concluída em {time.perf_counter() - started_at:.2f} s")
+
     return deliver_time, raw_price
@@ -1,28 +1,167 @@
-from pandas import DataFrame
+from pandas import DataFrame, Series
 from botcity.web import WebBot
-from Utils.helper_functions import check_variables
+from Utils.helper_functions import check_variables_correios
 from Utils.interact_correios import interact_correios
 from Utils.integrated_logger import IntegratedLogger
+from Utils.quote_cache import QuoteCache, create_quote_cache, correios_quote_params
+from Utils.result_accumulator import ResultAccumulator
+from Utils.checkpoint_store import CheckpointStore
+from Utils.browser_pool import BrowserPool
+from Utils.run_profiler import profiled
+from config import vars_map
 
+
+def preparar_consulta_correios(row: Series, resultados: ResultAccumulator, logger: IntegratedLogger):
+    """
+    Valida uma linha do DataFrame filtrado e monta os argumentos da consulta aos Correios.
+
+    Parâmetros:
+        row (Series): Linha do DataFrame filtrado.
+        resultados (ResultAccumulator): Acumulador onde o STATUS é registrado em caso de erro de validação.
+        logger (IntegratedLogger): Logger personalizado para registrar o progresso e os erros da execução.
+
+    Retorna:
+        dict ou None: Argumentos para `interact_correios` (sem o `bot`), ou None se a linha for inválida.
+    """
+    cnpj = row.get("CNPJ", "")
+
+    try:
+        # Valida e extrai as variáveis obrigatórias para consulta no site dos Correios.
+        # A função check_variables_correios retorna: dimensões, peso, tipo de serviço e CEP de destino.
+        dimensions, weight, service, cep_destiny = check_variables_correios(row)
+        logger.debug(f"Variáveis validadas para CNPJ {cnpj}")
+
+    except Exception as err:
+        # Caso as variáveis estejam incompletas ou com formato incorreto, marca como erro no STATUS.
+        logger.warning(f"Erro nas variáveis do CNPJ {cnpj}: {err}")
+        resultados.set(cnpj, "STATUS", str(err))
+        return None
+
+    return {
+        "service_type": service,
+        "cep_destiny": cep_destiny,
+        "weight": weight,
+        "dimensions": dimensions,
+        "logger": logger,
+    }
+
+
+def processar_consultas_correios(resultados: ResultAccumulator, consultas: list, bot: WebBot,
+    logger: IntegratedLogger, quote_cache: QuoteCache = None, browser_pool: BrowserPool = None) -> ResultAccumulator:
+    """
+    Executa as consultas já validadas nos Correios (via HTTP e/ou navegador) e registra os resultados por CNPJ.
+    Com um `browser_pool`, o navegador é emprestado do pool e mantido aberto entre as cotações; a cada
+    cotação o pool pode substituí-lo (ver `BrowserPool.recycle_if_needed`).
+
+    Parâmetros:
+        resultados (ResultAccumulator): Acumulador dos valores a gravar no DataFrame de saída.
+        consultas (list): Lista de tuplas (cnpj, kwargs de `interact_correios`).
+        bot (WebBot): Navegador utilizado no processamento sequencial.
+        logger (IntegratedLogger): Logger personalizado para registrar o progresso e os erros da execução.
+        quote_cache (QuoteCache, opcional): Cache onde as cotações obtidas com sucesso são gravadas.
+        browser_pool (BrowserPool, opcional): Pool de navegadores já iniciados (substitui o `bot`).
+
+    Retorna:
+        ResultAccumulator: O acumulador com os resultados das consultas.
+    """
+    workers = vars_map['CORREIOS_WORKERS']
+    keep_browser_open = vars_map['CORREIOS_KEEP_BROWSER_OPEN']
+
+    if vars_map['CORREIOS_HTTP_ENABLED']:
+        from Utils.correios_http import buscar_cotacoes_correios_http
+
+        # Retorna apenas as consultas que precisam do navegador
+        consultas = buscar_cotacoes_correios_http(resultados, consultas, logger, quote_cache)
+        if not consultas:
+            return resultados
+
+    if workers > 1:
+        from Utils.correios_worker_pool import buscar_cotacoes_correios_paralelo
+
+        return buscar_cotacoes_correios_paralelo(
+            resultados, consultas, logger, workers, quote_cache=quote_cache, browser_pool=browser_pool
+        )
+
+    if browser_pool is not None:
+        # Navegador do pool: já iniciado, fica aberto entre as cotações e é devolvido ao final
+        bot = browser_pool.acquire()
+        keep_browser_open = True
+
+    falhou = True
+    try:
+        for posicao, (cnpj, consulta) in enumerate(consultas):
+            if browser_pool is not None and posicao > 0:
+                # Substitui o navegador se ele atingiu o limite de usos ou de memória do pool
+                # (o empréstimo já contou como o uso da primeira cotação)
+                bot = browser_pool.recycle_if_needed(bot)
+
+            try:
+                # Realiza a automação no site dos Correios utilizando os dados validados.
+                # A função interact_correios retorna prazo estimado e valor da entrega.
+                prazo, preco = interact_correios(bot=bot, keep_browser_open=keep_browser_open, **consulta)
+
+                # Registra os resultados para o DataFrame de saída.
+                resultados.update(cnpj, {"PRAZO DE ENTREGA CORREIOS": prazo, "VALOR COTAÇÃO CORREIOS": preco})
+                if quote_cache is not None:
+                    quote_cache.set("correios", correios_quote_params(consulta), {"prazo": prazo, "preco": preco})
+
+                logger.info(f"Consulta Correios finalizada com sucesso para CNPJ {cnpj}")
+
+            except Exception as err:
+                # Em caso de falha durante a automação (como erro de carregamento da página), registra no STATUS.
+                logger.error(f"Erro ao consultar CNPJ {cnpj} nos Correios: {err}")
+                resultados.set(cnpj, "STATUS", str(err))
+                continue  # Continua para o próximo registro
+
+        falhou = False
+    finally:
+        if browser_pool is not None:
+            browser_pool.release(bot, discard=falhou)
+
+    if keep_browser_open and browser_pool is None:
+        bot.stop_browser()
+
+    return resultados
+
+
+@profiled()
 def buscar_cotacoes_correios(df_output: DataFrame, df_filtered: DataFrame,
-    bot: WebBot, logger: IntegratedLogger) -> DataFrame:
-    """ 
+    bot: WebBot, logger: IntegratedLogger, checkpoint: CheckpointStore = None,
+    browser_pool: BrowserPool = None) -> DataFrame:
+    """
     Realiza a iteração sobre um DataFrame filtrado, executa consultas no site dos Correios
     e preenche o DataFrame de saída com o prazo e o valor da cotação.
 
     Essa função combina automação web com manipulação de dados em larga escala. Para cada
-    linha do DataFrame filtrado, valida as variáveis com `check_variables` e utiliza o 
+    linha do DataFrame filtrado, valida as variáveis com `check_variables_correios` e utiliza o
     `interact_correios` para extrair informações do site. Em caso de erro, o status
-    é atualizado para facilitar o rastreamento posterior.
+    é atualizado para facilitar o rastreamento posterior. Os resultados são acumulados por CNPJ
+    (ver `ResultAccumulator`) e gravados no DataFrame de saída de uma só vez ao final da etapa.
+
+    Antes de qualquer acesso ao site, as cotações são procuradas no cache persistente de
+    cotações (ver `QuoteCache`); apenas as ausentes ou expiradas são consultadas.
+    Com 'CORREIOS_HTTP_ENABLED' ativo, as cotações são feitas primeiro via HTTP, sem navegador
+    (ver `buscar_cotacoes_correios_http`); apenas as que falharem seguem para o WebBot.
+    Com 'CORREIOS_KEEP_BROWSER_OPEN' ativo, o mesmo navegador é reaproveitado em todas as
+    cotações do lote e fechado apenas ao final.
+
+    Quando 'CORREIOS_WORKERS' for maior que 1, as consultas são distribuídas entre navegadores
+    headless independentes (ver `buscar_cotacoes_correios_paralelo`) e o `bot` informado não é utilizado.
+    Com um `browser_pool`, os navegadores (sequencial ou paralelo) são emprestados do pool, já iniciados.
+
+    Com um `checkpoint`, cada resultado é gravado assim que obtido (etapa "correios") e os CNPJs já
+    registrados em uma execução anterior interrompida são restaurados sem nova consulta.
 
     Parâmetros:
         df_output (DataFrame): DataFrame completo com todos os registros (inclusive os que não serão processados).
         df_filtered (DataFrame): Subconjunto contendo apenas os CNPJs válidos para consulta.
         bot (WebBot): Instância do navegador controlado pela BotCity Web para automação no site dos Correios.
         logger (IntegratedLogger): Logger personalizado para registrar o progresso e os erros da execução.
+        checkpoint (CheckpointStore, opcional): Checkpoint da execução, para gravar e retomar os resultados.
+        browser_pool (BrowserPool, opcional): Pool de navegadores já iniciados (ver `BrowserPool`).
 
     Retorna:
-        DataFrame: DataFrame atualizado com as colunas 'PRAZO DE ENTREGA CORREIOS', 
+        DataFrame: DataFrame atualizado com as colunas 'PRAZO DE ENTREGA CORREIOS',
         'VALOR COTAÇÃO CORREIOS' e 'STATUS' preenchidas para os CNPJs processados.
 
     Raises:
@@ -30,44 +169,42 @@ def buscar_cotacoes_correios(df_output: DataFrame, df_filtered: DataFrame,
     """
 
     total = len(df_filtered)
+    registrar_checkpoint = None
 
+    if checkpoint is not None:
+        df_output, df_filtered, restaurados = checkpoint.resume_stage("correios", df_output, df_filtered)
+        if restaurados:
+            logger.info(f"Correios: {restaurados} de {total} CNPJs restaurados do checkpoint.")
+        registrar_checkpoint = checkpoint.result_recorder("correios")
+
+    resultados = ResultAccumulator(on_update=registrar_checkpoint)
+
+    consultas = []
     for index, row in df_filtered.iterrows():
         cnpj = row.get("CNPJ", "")
         logger.info(f"[{index + 1}/{total}] Iniciando processamento para CNPJ {cnpj}")
 
-        try:
-            # Valida e extrai as variáveis obrigatórias para consulta no site dos Correios.
-            # A função check_variables retorna: dimensões, peso, tipo de serviço e CEP de destino.
-            dimensions, weight, service, cep_destiny = check_variables(row)
-            logger.debug(f"Variáveis validadas para CNPJ {cnpj}")
-        
-        except Exception as err:
-            # Caso as variáveis estejam incompletas ou com formato incorreto, marca como erro no STATUS.
-            logger.warning(f"Erro nas variáveis do CNPJ {cnpj}: {err}")
-            df_output.loc[df_output["CNPJ"] == cnpj, "STATUS"] = str(err)
-            continue  # Segue para o próximo CNPJ
-
-        try:
-            # Realiza a automação no site dos Correios utilizando os dados validados.
-            # A função interact_correios retorna prazo estimado e valor da entrega.
-            prazo, preco = interact_correios(
-                bot=bot,
-                service_type=service,
-                cep_destiny=cep_destiny,
-                weight=weight,
-                dimensions=dimensions,
-            )
-
-            # Preenche os resultados no DataFrame de saída.
-            df_output.loc[df_output["CNPJ"] == cnpj, "PRAZO DE ENTREGA CORREIOS"] = prazo
-            df_output.loc[df_output["CNPJ"] == cnpj, "VALOR COTAÇÃO CORREIOS"] = preco
-
-            logger.info(f"Consulta Correios finalizada com sucesso para CNPJ {cnpj}")
-
-        except Exception as err:
-            # Em caso de falha durante a automação (como erro de carregamento da página), registra no STATUS.
-            logger.error(f"Erro ao consultar CNPJ {cnpj} nos Correios: {err}")
-            df_output.loc[df_output["CNPJ"] == cnpj, "STATUS"] = str(err)
-            continue  # Continua para o próximo registro
-
-    return df_output
\ No newline at end of file
+        consulta = preparar_consulta_correios(row, resultados, logger)
+        if consulta is not None:
+            consultas.append((cnpj, consulta))
+
+    quote_cache = create_quote_cache()
+    try:
+        # Aplica as cotações já conhecidas e mantém apenas as que precisam ser consultadas
+        pendentes = []
+        for cnpj, consulta in consultas:
+            cotacao = quote_cache.get("correios", correios_quote_params(consulta))
+            if cotacao is None:
+                pendentes.append((cnpj, consulta))
+                continue
+            resultados.update(cnpj, {"PRAZO DE ENTREGA CORREIOS": cotacao["prazo"], "VALOR COTAÇÃO CORREIOS": cotacao["preco"]})
+        logger.info(f"Cache de cotações dos Correios: {quote_cache.hits} acertos, {quote_cache.misses} faltas.")
+
+        if pendentes:
+            processar_consultas_correios(resultados, pendentes, bot, logger, quote_cache, browser_pool)
+    finally:
+        quote_cache.close()
+        # Grava no DataFrame de saída tudo o que foi obtido, inclusive em caso de interrupção
+        resultados.apply(df_output)
+
+    return df_output
@@ -1,17 +1,94 @@
 from dotenv import load_dotenv
-import os
 from botcity.web import WebBot, By, element_as_select
 from botcity.maestro import BotMaestroSDK
 import pandas as pd
 from .helper_functions import *
 from .integrated_logger import *
+from .quote_cache import create_quote_cache, jadlog_quote_params
+from .result_accumulator import ResultAccumulator
+from .money import normalize_brl
+from .checkpoint_store import CheckpointStore
+from .run_profiler import PROFILER, profiled
+from .browser_pool import BrowserPool
 from config import vars_map
 
 
 load_dotenv(override=True)
 
+XPATH_COTACAO_JADLOG = '//span[contains(text(),"R$")]'
+
+
+def ler_cotacao_jadlog(bot: WebBot):
+    """
+    Lê, sem espera, o texto atual do elemento de cotação da Jadlog.
+
+    Parâmetros:
+        bot (WebBot): Instância do navegador automatizado da BotCity.
+
+    Retorna:
+        str ou None: Texto do elemento (ex: "R$ 23.90") ou None se ainda não houver cotação na página.
+    """
+    elementos = bot.driver.find_elements(By.XPATH, XPATH_COTACAO_JADLOG)
+    if not elementos:
+        return None
+    return elementos[0].get_attribute('innerText').strip() or None
+
+
+def limpar_cotacao_jadlog(bot: WebBot) -> bool:
+    """
+    Apaga o texto da cotação exibida antes de uma nova simulação, para que uma cotação nova
+    com o mesmo valor da anterior também seja detectada como mudança.
+
+    Parâmetros:
+        bot (WebBot): Instância do navegador automatizado da BotCity.
+
+    Retorna:
+        bool: True se havia uma cotação na página e ela foi apagada.
+    """
+    try:
+        elementos = bot.driver.find_elements(By.XPATH, XPATH_COTACAO_JADLOG)
+        for elemento in elementos:
+            bot.driver.execute_script("arguments[0].innerText = '';", elemento)
+        return bool(elementos)
+    except Exception:
+        return False
+
+
+def aguardar_nova_cotacao_jadlog(bot: WebBot, ultimo_valor, timeout: int) -> str:
+    """
+    Aguarda até que o elemento de cotação exiba um valor diferente do último valor capturado.
+
+    Parâmetros:
+        bot (WebBot): Instância do navegador automatizado da BotCity.
+        ultimo_valor (str ou None): Último valor lido antes de clicar em "Simular".
+        timeout (int): Prazo máximo de espera, em milissegundos.
+
+    Retorna:
+        str: Novo texto da cotação.
+
+    Raises:
+        TimeoutError: Se o valor não mudar dentro do prazo (leitura obsoleta ou site sem resposta).
+    """
+    resultado = {}
+
+    def cotacao_mudou():
+        valor = ler_cotacao_jadlog(bot)
+        if valor and valor != ultimo_valor:
+            resultado['valor'] = valor
+            return True
+        return False
+
+    if not wait_until(cotacao_mudou, timeout):
+        raise TimeoutError(
+            f"Cotação Jadlog não foi atualizada em {timeout} ms (leitura obsoleta: {ultimo_valor})."
+        )
+    return resultado['valor']
+
+
+@profiled()
 def obter_cotacoes_jadlog(bot: WebBot, maestro: BotMaestroSDK, df_filtered: pd.DataFrame,
-    df_output: pd.DataFrame, logger: IntegratedLogger) -> pd.DataFrame:
+    df_output: pd.DataFrame, logger: IntegratedLogger, checkpoint: CheckpointStore = None,
+    browser_pool: BrowserPool = None) -> pd.DataFrame:
     """
     Realiza automação no site da Jadlog para simular entregas com base nos dados fornecidos e preenche o DataFrame de saída.
 
@@ -19,12 +96,24 @@ def obter_cotacoes_jadlog(bot: WebBot, maestro: BotMaestroSDK, df_filtered: pd.D
     obrigatórios com os dados de entrada e extrai o valor da cotação. Em caso de falha por CNPJ, atualiza o
     campo STATUS e continua o processamento.
 
+    Os resultados são acumulados por CNPJ (ver `ResultAccumulator`) e gravados no DataFrame
+    de saída de uma só vez ao final da etapa.
+    Cotações presentes no cache persistente (ver `QuoteCache`) são aplicadas sem acessar o site;
+    se todas estiverem em cache, o navegador nem é aberto.
+    Com um `checkpoint`, cada resultado é gravado assim que obtido (etapa "jadlog") e os CNPJs já
+    registrados em uma execução anterior interrompida são restaurados sem nova consulta.
+    Com um `browser_pool`, o navegador é emprestado do pool (já iniciado) e devolvido ao final, em vez
+    de usar e encerrar o `bot`; se o pool substituir o navegador no meio da etapa (limite de usos ou
+    de memória), o site é aberto novamente no navegador novo.
+
     Parâmetros:
         bot (WebBot): Instância do navegador automatizado da BotCity.
         maestro (BotMaestroSDK): Instância do maestro para possível gerenciamento remoto (não usado diretamente aqui).
         df_filtered (pd.DataFrame): DataFrame contendo apenas os dados prontos para simulação.
         df_output (pd.DataFrame): DataFrame de saída que será atualizado com os resultados de cotação.
         logger (IntegratedLogger): Instância de logger para rastrear eventos e falhas.
+        checkpoint (CheckpointStore, opcional): Checkpoint da execução, para gravar e retomar os resultados.
+        browser_pool (BrowserPool, opcional): Pool de navegadores já iniciados (ver `BrowserPool`).
 
     Retorna:
         pd.DataFrame: O mesmo DataFrame de saída fornecido, agora com a coluna 'VALOR COTAÇÃO JADLOG'
@@ -33,22 +122,28 @@ def obter_cotacoes_jadlog(bot: WebBot, maestro: BotMaestroSDK, df_filtered: pd.D
     Raises:
         Exception: Qualquer exceção geral que ocorra fora do escopo do loop principal (ex: falha de carregamento do site).
     """
+    quote_cache = None
+    registrar_checkpoint = None
+    bot_pool = None
+    falha_geral = False
+
+    if checkpoint is not None:
+        total_jadlog = len(df_filtered)
+        df_output, df_filtered, restaurados = checkpoint.resume_stage("jadlog", df_output, df_filtered)
+        if restaurados:
+            logger.info(f"Jadlog: {restaurados} de {total_jadlog} CNPJs restaurados do checkpoint.")
+        registrar_checkpoint = checkpoint.result_recorder("jadlog")
+
+    resultados = ResultAccumulator(on_update=registrar_checkpoint)
     try:
         # Constantes de configuração
         DEFAULT_URL_JADLOG = vars_map['DEFAULT_URL_JADLOG']
         PICKUP_VALUE = vars_map['PICKUP_VALUE']
         ORIGIN_CEP = vars_map['ORIGIN_CEP']
+        TIMEOUT_COTACAO = vars_map['JADLOG_TIMEOUT_MS']
 
         logger.info(" Início - obter_cotacoes_jadlog ")
 
-        # Acessa o site de simulação da Jadlog
-        logger.info("Abrindo o site da Jadlog para simulação")
-        bot.browse(DEFAULT_URL_JADLOG)
-
-        # Verifica se o campo de origem está disponível (validação mínima)
-        if not bot.find_element('#origem'):
-            raise Exception("O site da Jadlog não carregou corretamente.")
-
         # Mantém apenas as colunas relevantes para evitar erros em colunas ausentes
         colunas_necessarias = [
             "CNPJ",
@@ -62,69 +157,119 @@ def obter_cotacoes_jadlog(bot: WebBot, maestro: BotMaestroSDK, df_filtered: pd.D
 
         total = len(df_filtered)
 
+        # Aplica as cotações já conhecidas e mantém apenas as linhas que precisam do site
+        quote_cache = create_quote_cache()
+        pendentes = []
         for index, row in df_filtered.iterrows():
+            cotacao = quote_cache.get("jadlog", jadlog_quote_params(row))
+            if cotacao is None:
+                pendentes.append(index)
+                continue
+            resultados.set(row["CNPJ"], "VALOR COTAÇÃO JADLOG", cotacao["preco"])
+        logger.info(f"Cache de cotações da Jadlog: {quote_cache.hits} acertos, {quote_cache.misses} faltas.")
+
+        df_filtered = df_filtered.loc[pendentes]
+        if df_filtered.empty:
+            return df_output
+
+        if browser_pool is not None:
+            bot = bot_pool = browser_pool.acquire()
+
+        def abrir_site_jadlog(navegador):
+            # Acessa o site de simulação da Jadlog
+            logger.info("Abrindo o site da Jadlog para simulação")
+            with PROFILER.stage("jadlog_abertura_site"):
+                navegador.browse(DEFAULT_URL_JADLOG)
+
+            # Verifica se o campo de origem está disponível (validação mínima)
+            if not navegador.find_element('#origem'):
+                raise Exception("O site da Jadlog não carregou corretamente.")
+
+        abrir_site_jadlog(bot)
+
+        for posicao, (index, row) in enumerate(df_filtered.iterrows()):
             cnpj = row["CNPJ"]
+            if bot_pool is not None and posicao > 0:
+                # Substitui o navegador se ele atingiu o limite de usos ou de memória do pool
+                novo_bot = browser_pool.recycle_if_needed(bot_pool)
+                if novo_bot is not bot_pool:
+                    bot = bot_pool = novo_bot
+                    abrir_site_jadlog(bot)
             logger.info(f"[{index + 1}/{total}] Processando cotação para CNPJ {cnpj}")
 
             try:
-                # Define o tipo de serviço (ex: '030' para EXPRES)
-                jadlog_service_select = element_as_select(bot.find_element('#modalidade'))
-                service_value = get_jadlog_value(row['TIPO DE SERVIÇO JADLOG'])
-                jadlog_service_select.select_by_value(service_value)
+                with PROFILER.row("jadlog_consulta"):
+                    # Define o tipo de serviço (ex: '030' para EXPRES)
+                    jadlog_service_select = element_as_select(bot.find_element('#modalidade'))
+                    service_value = get_jadlog_value(row['TIPO DE SERVIÇO JADLOG'])
+                    jadlog_service_select.select_by_value(service_value)
 
-                # Separa as dimensões (altura x largura x comprimento)
-                height, width, length = row['DIMENSÕES CAIXA (altura x largura x comprimento cm)'].split(" x ")
+                    # Separa as dimensões (altura x largura x comprimento)
+                    height, width, length = row['DIMENSÕES CAIXA (altura x largura x comprimento cm)'].split(" x ")
 
-                # Preenche as dimensões
-                bot.find_element('#valLargura').clear()
-                bot.find_element('#valLargura').send_keys(width)
+                    # Preenche as dimensões
+                    bot.find_element('#valLargura').clear()
+                    bot.find_element('#valLargura').send_keys(width)
 
-                bot.find_element('#valAltura').clear()
-                bot.find_element('#valAltura').send_keys(height)
+                    bot.find_element('#valAltura').clear()
+                    bot.find_element('#valAltura').send_keys(height)
 
-                bot.find_element('#valComprimento').clear()
-                bot.find_element('#valComprimento').send_keys(length)
+                    bot.find_element('#valComprimento').clear()
+                    bot.find_element('#valComprimento').send_keys(length)
 
-                # Preenche o peso
-                bot.find_element('#peso').clear()
-                bot.find_element('#peso').send_keys(row['PESO DO PRODUTO'])
+                    # Preenche o peso
+                    bot.find_element('#peso').clear()
+                    bot.find_element('#peso').send_keys(row['PESO DO PRODUTO'])
 
-                # Preenche os CEPs de origem e destino
-                bot.find_element('#destino').clear()
-                bot.find_element('#destino').send_keys(row['CEP'])
+                    # Preenche os CEPs de origem e destino
+                    bot.find_element('#destino').clear()
+                    bot.find_element('#destino').send_keys(row['CEP'])
 
-                bot.find_element('#origem').clear()
-                bot.find_element('#origem').send_keys(ORIGIN_CEP)
+                    bot.find_element('#origem').clear()
+                    bot.find_element('#origem').send_keys(ORIGIN_CEP)
 
-                # Preenche valor de coleta e valor do pedido
-                bot.find_element('#valor_coleta').clear()
-                bot.find_element('#valor_coleta').send_keys(PICKUP_VALUE)
+                    # Preenche valor de coleta e valor do pedido
+                    bot.find_element('#valor_coleta').clear()
+                    bot.find_element('#valor_coleta').send_keys(PICKUP_VALUE)
 
-                bot.find_element('#valor_mercadoria').clear()
-                bot.find_element('#valor_mercadoria').send_keys(row['VALOR DO PEDIDO'])
+                    bot.find_element('#valor_mercadoria').clear()
+                    bot.find_element('#valor_mercadoria').send_keys(row['VALOR DO PEDIDO'])
 
-                # Clica no botão "Simular"
-                bot.find_element('//input[@value="Simular"]', By.XPATH).click()
+                    # Guarda a cotação anterior e limpa o elemento (evita pegar valor anterior)
+                    ultimo_valor = ler_cotacao_jadlog(bot)
+                    if limpar_cotacao_jadlog(bot):
+                        ultimo_valor = None
 
-                # Aguarda o carregamento do valor da nova cotação (evita pegar valor anterior)
-                bot.wait(1000)
+                    # Clica no botão "Simular"
+                    bot.find_element('//input[@value="Simular"]', By.XPATH).click()
 
-                # Captura o valor da cotação
-                raw_quote = bot.find_element('//span[contains(text(),"R$")]', By.XPATH).get_attribute('innerText')
-                formatted_quote = raw_quote.replace("R$ ", "").replace(".", ",")
+                    # Aguarda o valor da nova cotação ser exibido e captura o valor
+                    raw_quote = aguardar_nova_cotacao_jadlog(bot, ultimo_valor, TIMEOUT_COTACAO)
 
-                # Atualiza o DataFrame de saída
-                df_output.loc[df_output["CNPJ"] == cnpj, "VALOR COTAÇÃO JADLOG"] = f"R$ {formatted_quote}"
-                logger.info(f"Cotação Jadlog registrada com sucesso para CNPJ {cnpj}")
+                    # Atualiza o DataFrame de saída e o cache de cotações (o formato é padronizado ao final)
+                    resultados.set(cnpj, "VALOR COTAÇÃO JADLOG", raw_quote)
+                    quote_cache.set("jadlog", jadlog_quote_params(row), {"preco": raw_quote})
+                    logger.info(f"Cotação Jadlog registrada com sucesso para CNPJ {cnpj}")
 
             except Exception as err:
                 logger.error(f"Erro ao processar cotação para CNPJ {cnpj}: {err}")
-                df_output.loc[df_output["CNPJ"] == cnpj, "STATUS"] = "Falha cotação Jadlog"
+                resultados.set(cnpj, "STATUS", "Falha cotação Jadlog")
                 continue
 
-        bot.stop_browser()
+        if bot_pool is None:
+            bot.stop_browser()
 
     except Exception as erro_geral:
         logger.error(f"Erro geral na execução de obter_cotacoes_jadlog: {erro_geral}")
+        falha_geral = True
     finally:
+        if bot_pool is not None:
+            # Devolve o navegador ao pool (descartado se a etapa falhou por completo)
+            browser_pool.release(bot_pool, discard=falha_geral)
+        if quote_cache is not None:
+            quote_cache.close()
+        df_output = resultados.apply(df_output)
+        # Padroniza as cotações ("R$ 23.90" exibido pelo site) no formato brasileiro, de uma só vez
+        if "VALOR COTAÇÃO JADLOG" in df_output.columns:
+            df_output["VALOR COTAÇÃO JADLOG"] = normalize_brl(df_output["VALOR COTAÇÃO JADLOG"])
         return df_output
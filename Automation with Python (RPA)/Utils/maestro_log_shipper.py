@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import threading
+
+
+class MaestroLogShipper:
+    """
+    Envia as entradas de log ao BotCity Maestro em lotes, a partir de uma thread em segundo plano.
+
+    As entradas recebidas por `submit` são agrupadas até atingir `batch_size` ou até passar
+    `flush_interval` segundos. Em cada lote, mensagens repetidas são agrupadas ("(xN)") e as
+    entradas de um mesmo nível são enviadas em uma única requisição, com uma mensagem por linha
+    (o SDK do Maestro não possui envio em lote). As requisições respeitam o limite `max_requests_per_second`.
+
+    Quando o Maestro está lento ou indisponível, as entradas são gravadas em um arquivo JSONL
+    local (`spool_path`) e reenviadas assim que o envio voltar a funcionar, inclusive em execuções seguintes.
+    """
+
+    def __init__(self, maestro, activity_label: str, spool_path: str,
+        batch_size: int = 50, flush_interval: float = 2.0, max_requests_per_second: float = 2.0,
+        slow_request_seconds: float = 10.0, retry_interval: float = 30.0):
+        self.maestro = maestro
+        self.activity_label = activity_label
+        self.spool_path = spool_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.min_request_interval = 1 / max_requests_per_second if max_requests_per_second > 0 else 0
+        self.slow_request_seconds = slow_request_seconds
+        self.retry_interval = retry_interval
+
+        self.sent_requests = 0
+        self.sent_entries = 0
+        self.spooled_entries = 0
+
+        self._pending = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._last_request_at = 0.0
+        self._offline_until = 0.0
+
+        if os.path.dirname(self.spool_path):
+            os.makedirs(os.path.dirname(self.spool_path), exist_ok=True)
+
+        self._thread = threading.Thread(target=self._run, name="maestro-log-shipper", daemon=True)
+        self._thread.start()
+
+    def submit(self, values: dict):
+        """
+        Agenda uma entrada de log para envio. Não bloqueia à espera do Maestro.
+
+        Parâmetros:
+            values (dict): Valores da entrada ("Datetime", "Level" e "Message").
+        """
+        with self._condition:
+            if self._closed:
+                self._spool([values])
+                return
+            self._pending.append(values)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify()
+
+    def close(self, timeout: float = None):
+        """
+        Envia as entradas pendentes (ou as grava no spool, se o envio falhar) e encerra a thread.
+
+        Parâmetros:
+            timeout (float, opcional): Tempo máximo de espera pelo encerramento, em segundos.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        # Reenvia o que ficou no spool em execuções anteriores
+        self._replay_spool()
+
+        while True:
+            with self._condition:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._condition.wait(self.flush_interval)
+                batch, self._pending = self._pending, []
+                closed = self._closed
+
+            if batch:
+                self._ship(batch)
+            elif time.monotonic() >= self._offline_until:
+                self._replay_spool()
+
+            if closed:
+                with self._condition:
+                    remaining, self._pending = self._pending, []
+                if remaining:
+                    self._ship(remaining)
+                return
+
+    def _ship(self, batch: list):
+        """
+        Envia um lote (ou o grava no spool enquanto o Maestro estiver indisponível).
+        """
+        if time.monotonic() < self._offline_until:
+            self._spool(batch)
+            return
+
+        if not self._replay_spool():
+            self._spool(batch)
+            return
+
+        entries = coalesce_log_entries(batch)
+        for position, entry in enumerate(entries):
+            if not self._send(self.activity_label, entry):
+                # Mantém a ordem: o restante do lote vai para o spool
+                self._spool(entries[position:])
+                return
+        self.sent_entries += len(batch)
+
+    def _send(self, activity_label: str, values: dict) -> bool:
+        """
+        Envia uma entrada ao Maestro respeitando o limite de requisições por segundo.
+
+        Retorna:
+            bool: True se o envio foi concluído; False se falhou (o Maestro é considerado
+            indisponível por `retry_interval` segundos).
+        """
+        wait = self._last_request_at + self.min_request_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        started_at = time.monotonic()
+        self._last_request_at = started_at
+        try:
+            self.maestro.new_log_entry(activity_label=activity_label, values=values)
+        except Exception:
+            self._offline_until = time.monotonic() + self.retry_interval
+            return False
+
+        self.sent_requests += 1
+        if time.monotonic() - started_at > self.slow_request_seconds:
+            # Maestro lento: os próximos lotes vão para o spool até a próxima tentativa
+            self._offline_until = time.monotonic() + self.retry_interval
+        return True
+
+    def _spool(self, entries: list):
+        """
+        Acrescenta as entradas ao arquivo JSONL local para reenvio posterior.
+        """
+        with open(self.spool_path, "a", encoding="utf-8") as spool:
+            for values in entries:
+                spool.write(json.dumps({"activity_label": self.activity_label, "values": values}, ensure_ascii=False) + "\n")
+        self.spooled_entries += len(entries)
+
+    def _replay_spool(self) -> bool:
+        """
+        Reenvia as entradas do spool, na ordem em que foram gravadas.
+
+        Retorna:
+            bool: True se o spool estiver vazio ao final; False se o Maestro continuar indisponível.
+        """
+        if not os.path.exists(self.spool_path) or time.monotonic() < self._offline_until:
+            return not os.path.exists(self.spool_path)
+
+        with open(self.spool_path, encoding="utf-8") as spool:
+            lines = [line for line in spool.read().splitlines() if line.strip()]
+
+        pending = [json.loads(line) for line in lines]
+        delivered = set()
+        start = 0
+        while start < len(pending):
+            # Reenvia em lotes de até `batch_size` linhas consecutivas da mesma atividade
+            activity_label = pending[start]["activity_label"]
+            chunk_end = start
+            while (chunk_end < len(pending) and chunk_end - start < self.batch_size
+                   and pending[chunk_end]["activity_label"] == activity_label):
+                chunk_end += 1
+
+            # Uma requisição por nível; as linhas de cada requisição concluída saem do spool,
+            # mesmo que uma requisição seguinte do lote falhe (evita reenvios duplicados)
+            by_level = {}
+            for position in range(start, chunk_end):
+                by_level.setdefault(pending[position]["values"].get("Level", "INFO"), []).append(position)
+
+            failed = False
+            for positions in by_level.values():
+                entry = coalesce_log_entries([pending[position]["values"] for position in positions])[0]
+                if not self._send(activity_label, entry):
+                    failed = True
+                    break
+                delivered.update(positions)
+                self.sent_entries += len(positions)
+                self.spooled_entries = max(0, self.spooled_entries - len(positions))
+            if failed:
+                break
+            start = chunk_end
+
+        if len(delivered) == len(pending):
+            os.remove(self.spool_path)
+            return True
+
+        # Mantém no spool apenas o que não foi reenviado
+        with open(self.spool_path, "w", encoding="utf-8") as spool:
+            spool.write("".join(line + "\n" for position, line in enumerate(lines) if position not in delivered))
+        return False
+
+    def pending_spool_entries(self) -> int:
+        """
+        Retorna a quantidade de entradas que continuam no spool aguardando reenvio.
+        """
+        if not os.path.exists(self.spool_path):
+            return 0
+        with open(self.spool_path, encoding="utf-8") as spool:
+            return sum(1 for line in spool if line.strip())
+
+
+def coalesce_log_entries(batch: list) -> list:
+    """
+    Agrupa um lote de entradas de log: mensagens repetidas viram uma única linha com "(xN)"
+    e as entradas de um mesmo nível são unidas em uma só, com uma mensagem por linha.
+
+    Parâmetros:
+        batch (list): Entradas de log ({"Datetime", "Level", "Message"}), na ordem em que foram geradas.
+
+    Retorna:
+        list: Uma entrada por nível, ordenadas pelo horário da primeira mensagem de cada nível.
+    """
+    by_level = {}
+    for values in batch:
+        level = values.get("Level", "INFO")
+        group = by_level.setdefault(level, {"Datetime": values.get("Datetime"), "messages": {}})
+        message = values.get("Message", "")
+        group["messages"][message] = group["messages"].get(message, 0) + 1
+
+    entries = []
+    for level, group in by_level.items():
+        lines = [
+            message if count == 1 else f"{message} (x{count})"
+            for message, count in group["messages"].items()
+        ]
+        entries.append({"Datetime": group["Datetime"], "Level": level, "Message": "\n".join(lines)})
+    return entries
+
+
+def create_maestro_log_shipper(maestro, activity_label: str) -> MaestroLogShipper:
+    """
+    Cria o `MaestroLogShipper` com as configurações de `vars_map` ('MAESTRO_LOG_BATCH_SIZE',
+    'MAESTRO_LOG_FLUSH_SECONDS', 'MAESTRO_LOG_MAX_RPS' e 'DEFAULT_CACHE_PATH').
+
+    Parâmetros:
+        maestro (BotMaestroSDK): Instância conectada do Maestro.
+        activity_label (str): Label da atividade cujos logs serão enviados.
+
+    Retorna:
+        MaestroLogShipper: Shipper em execução.
+    """
+    from config import vars_map
+
+    return MaestroLogShipper(
+        maestro=maestro,
+        activity_label=activity_label,
+        spool_path=os.path.join(vars_map['DEFAULT_CACHE_PATH'], 'maestro_log_spool.jsonl'),
+        batch_size=vars_map['MAESTRO_LOG_BATCH_SIZE'],
+        flush_interval=vars_map['MAESTRO_LOG_FLUSH_SECONDS'],
+        max_requests_per_second=vars_map['MAESTRO_LOG_MAX_RPS']
+    )
@@ -0,0 +1,199 @@
+import os
+import time
+import smtplib
+import mimetypes
+import threading
+from email.message import EmailMessage
+from concurrent.futures import ThreadPoolExecutor, Future
+
+
+def build_email_bytes(assunto: str, corpo: str, remetente: str, anexos: list = None) -> bytes:
+    """
+    Monta uma única vez a mensagem MIME (com os anexos) para ser enviada a todos os destinatários.
+
+    Os destinatários não aparecem no cabeçalho ("undisclosed-recipients"): eles são informados apenas
+    no envelope SMTP, como no envio individual anterior, em que cada um via apenas o próprio endereço.
+
+    Parâmetros:
+        assunto (str): Título do e-mail (campo "Subject").
+        corpo (str): Conteúdo em texto do e-mail.
+        remetente (str): Endereço de e-mail do remetente.
+        anexos (list, opcional): Lista de caminhos de arquivos ou de tuplas
+            (bytes, maintype, subtype, nome do arquivo). Caminhos inexistentes são ignorados.
+
+    Retorna:
+        bytes: Mensagem pronta para `smtplib.SMTP.sendmail`.
+    """
+    msg = EmailMessage()
+    msg["Subject"] = assunto
+    msg["From"] = remetente
+    msg["To"] = "undisclosed-recipients:;"
+    msg.set_content(corpo)
+
+    for anexo in anexos or []:
+        if isinstance(anexo, (str, os.PathLike)):
+            if not os.path.exists(anexo):
+                continue
+            tipo, _ = mimetypes.guess_type(str(anexo))
+            maintype, subtype = (tipo or "application/octet-stream").split("/")
+            with open(anexo, "rb") as arquivo:
+                anexo = (arquivo.read(), maintype, subtype, os.path.basename(anexo))
+
+        conteudo, maintype, subtype, nome_arquivo = anexo
+        msg.add_attachment(conteudo, maintype=maintype, subtype=subtype, filename=nome_arquivo)
+
+    return msg.as_bytes()
+
+
+class MailDispatcher:
+    """
+    Envia e-mails reaproveitando uma única conexão SMTP autenticada.
+
+    A mensagem é montada uma vez (ver `build_email_bytes`) e enviada aos destinatários em lotes de
+    `batch_size` endereços por comando SMTP. Cada lote é reenviado até `max_retries` vezes, com
+    reconexão em caso de queda. Os envios podem ser feitos em segundo plano com `send_async`,
+    em uma thread dedicada que mantém a ordem dos envios.
+    """
+
+    def __init__(self, host: str, port: int, username: str = None, password: str = None,
+        use_ssl: bool = True, batch_size: int = 50, max_retries: int = 3,
+        retry_backoff: float = 2.0, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.batch_size = max(1, batch_size)
+        self.max_retries = max(1, max_retries)
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+
+        self._smtp = None
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _connect(self):
+        """
+        Abre (ou reaproveita) a conexão SMTP autenticada.
+        """
+        if self._smtp is not None:
+            return self._smtp
+
+        if self.use_ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            smtp.ehlo()
+            if smtp.has_extn("starttls"):
+                smtp.starttls()
+                smtp.ehlo()
+
+        if self.username and self.password:
+            smtp.login(self.username, self.password)
+
+        self._smtp = smtp
+        return smtp
+
+    def _disconnect(self):
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            try:
+                self._smtp.close()
+            except Exception:
+                pass
+        self._smtp = None
+
+    def send(self, message: bytes, remetente: str, destinatarios: list[str], logger=None) -> dict:
+        """
+        Envia a mensagem já montada a todos os destinatários, em lotes, pela conexão persistente.
+
+        Parâmetros:
+            message (bytes): Mensagem MIME (ver `build_email_bytes`).
+            remetente (str): Endereço do remetente (envelope SMTP).
+            destinatarios (list[str]): Endereços dos destinatários.
+            logger (opcional): Instância de logger para registrar cada lote enviado.
+
+        Retorna:
+            dict: Destinatários recusados pelo servidor ({endereço: (código, resposta)}).
+
+        Raises:
+            smtplib.SMTPException: Se algum lote falhar após todas as tentativas.
+        """
+        recusados = {}
+        with self._lock:
+            for inicio in range(0, len(destinatarios), self.batch_size):
+                lote = destinatarios[inicio:inicio + self.batch_size]
+                recusados.update(self._send_batch(message, remetente, lote))
+                if logger:
+                    enviados = [destinatario for destinatario in lote if destinatario not in recusados]
+                    logger.info(f"E-mail enviado com sucesso para: {', '.join(enviados)}")
+        return recusados
+
+    def _send_batch(self, message: bytes, remetente: str, lote: list[str]) -> dict:
+        for tentativa in range(1, self.max_retries + 1):
+            try:
+                return self._connect().sendmail(remetente, lote, message)
+            except smtplib.SMTPRecipientsRefused as erro:
+                # Nenhum destinatário do lote foi aceito: não adianta reenviar
+                return erro.recipients
+            except (smtplib.SMTPException, OSError):
+                self._disconnect()
+                if tentativa == self.max_retries:
+                    raise
+                time.sleep(self.retry_backoff * tentativa)
+
+    def send_async(self, message: bytes, remetente: str, destinatarios: list[str], logger=None) -> Future:
+        """
+        Agenda o envio em segundo plano. Os envios agendados são feitos em ordem, pela mesma conexão.
+
+        Retorna:
+            Future: Resultado de `send` (destinatários recusados) ou a exceção do envio.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mail-dispatcher")
+        return self._executor.submit(self.send, message, remetente, destinatarios, logger)
+
+    def close(self):
+        """
+        Aguarda os envios agendados e encerra a conexão SMTP.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            self._disconnect()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def create_mail_dispatcher(remetente: str, senha_app: str) -> MailDispatcher:
+    """
+    Cria o `MailDispatcher` com as configurações de `vars_map` ('SMTP_HOST', 'SMTP_PORT', 'SMTP_USE_SSL',
+    'SMTP_BATCH_SIZE', 'SMTP_MAX_RETRIES' e 'SMTP_TIMEOUT').
+
+    Parâmetros:
+        remetente (str): Usuário usado na autenticação SMTP.
+        senha_app (str): Senha do aplicativo usada na autenticação SMTP.
+
+    Retorna:
+        MailDispatcher: Dispatcher pronto para uso (a conexão é aberta no primeiro envio).
+    """
+    from config import vars_map
+
+    return MailDispatcher(
+        host=vars_map['SMTP_HOST'],
+        port=vars_map['SMTP_PORT'],
+        username=remetente,
+        password=senha_app,
+        use_ssl=vars_map['SMTP_USE_SSL'],
+        batch_size=vars_map['SMTP_BATCH_SIZE'],
+        max_retries=vars_map['SMTP_MAX_RETRIES'],
+        timeout=vars_map['SMTP_TIMEOUT']
+    )
@@ -0,0 +1,167 @@
+import pandas as pd
+
+# Colunas de cotação de cada transportadora no DataFrame de saída
+COLUNAS_COTACAO_POR_TRANSPORTADORA = {
+    "CORREIOS": "VALOR COTAÇÃO CORREIOS",
+    "JADLOG": "VALOR COTAÇÃO JADLOG",
+}
+
+# Sinal, parte inteira (com ou sem separador de milhar) e até duas casas decimais após "," ou "."
+_PADRAO_VALOR = r"^(?P<sinal>-?)(?P<inteiro>[\d.,]*?)(?:[.,](?P<decimal>\d{1,2}))?$"
+_PADRAO_INTEIRO = r"^(?:\d+|\d{1,3}(?:\.\d{3})+|\d{1,3}(?:,\d{3})+)$"
+
+
+def parse_brl_cents(values: pd.Series) -> pd.Series:
+    """
+    Converte, de forma vetorizada, valores monetários em texto para centavos inteiros.
+
+    Aceita o formato brasileiro ("R$ 1.234,56"), o formato com ponto decimal exibido pela Jadlog
+    ("R$ 23.90") e números já convertidos (23.9). Valores ausentes, "N/A" ou em formato
+    irreconhecível resultam em <NA>.
+
+    Parâmetros:
+        values (pd.Series): Coluna com os valores monetários.
+
+    Retorna:
+        pd.Series: Valores em centavos (dtype "Int64"), com o mesmo índice da entrada.
+    """
+    texto = (
+        values.astype("string")
+        .str.replace(r"R\$|\s", "", regex=True)
+    )
+    partes = texto.str.extract(_PADRAO_VALOR)
+
+    inteiro_valido = partes["inteiro"].str.match(_PADRAO_INTEIRO).fillna(False).astype(bool)
+    reais = pd.to_numeric(partes["inteiro"].where(inteiro_valido).str.replace(r"[.,]", "", regex=True), errors="coerce")
+    centavos = pd.to_numeric(partes["decimal"].fillna("0").str.ljust(2, "0"), errors="coerce")
+
+    total = (reais * 100 + centavos).where(partes["sinal"] != "-", -(reais * 100 + centavos))
+    return total.round().astype("Int64")
+
+
+def format_brl(cents: pd.Series) -> pd.Series:
+    """
+    Formata, de forma vetorizada, valores em centavos no padrão brasileiro ("R$ 1.234,56").
+
+    Parâmetros:
+        cents (pd.Series): Valores em centavos (numéricos, podendo conter <NA>/NaN).
+
+    Retorna:
+        pd.Series: Valores formatados; <NA> permanece como <NA>.
+    """
+    cents = cents.astype("float64").round().astype("Int64")
+    absoluto = cents.abs()
+    reais = (absoluto // 100).astype("string").str.replace(r"\B(?=(\d{3})+(?!\d))", ".", regex=True)
+    centavos = (absoluto % 100).astype("string").str.zfill(2)
+    sinal = pd.Series("", index=cents.index, dtype="string").mask(cents < 0, "-")
+    return sinal + "R$ " + reais + "," + centavos
+
+
+def normalize_brl(values: pd.Series) -> pd.Series:
+    """
+    Reescreve os valores monetários reconhecidos no padrão brasileiro, mantendo os demais como estão.
+
+    Parâmetros:
+        values (pd.Series): Coluna com os valores monetários em texto.
+
+    Retorna:
+        pd.Series: Coluna com os valores normalizados (dtype object).
+    """
+    formatados = format_brl(parse_brl_cents(values)).astype(object)
+    return formatados.where(formatados.notna(), values.astype(object))
+
+
+def _report_column(values: pd.Series) -> pd.Series:
+    """
+    Converte uma coluna formatada para o DataFrame de saída (dtype object, com None nos valores ausentes).
+    """
+    values = values.astype(object)
+    return values.where(values.notna(), None)
+
+
+def quote_cents_frame(df_output: pd.DataFrame, carriers: dict = None) -> pd.DataFrame:
+    """
+    Converte as colunas de cotação do DataFrame de saída em centavos, uma coluna por transportadora.
+
+    Parâmetros:
+        df_output (pd.DataFrame): DataFrame de saída com as colunas de cotação.
+        carriers (dict, opcional): Mapeamento {transportadora: coluna}. Padrão: `COLUNAS_COTACAO_POR_TRANSPORTADORA`.
+
+    Retorna:
+        pd.DataFrame: Centavos ("Int64") indexados como `df_output`, com as transportadoras como colunas.
+
+    Raises:
+        ValueError: Se alguma coluna de cotação não existir no DataFrame.
+    """
+    carriers = carriers or COLUNAS_COTACAO_POR_TRANSPORTADORA
+    for coluna in carriers.values():
+        if coluna not in df_output.columns:
+            raise ValueError(f"A coluna '{coluna}' não está presente no DataFrame.")
+
+    return pd.DataFrame(
+        {transportadora: parse_brl_cents(df_output[coluna]) for transportadora, coluna in carriers.items()},
+        index=df_output.index
+    )
+
+
+def cheapest_carrier(cents: pd.DataFrame) -> pd.Series:
+    """
+    Identifica, para cada linha, a transportadora com a menor cotação.
+
+    Parâmetros:
+        cents (pd.DataFrame): Centavos por transportadora (ver `quote_cents_frame`).
+
+    Retorna:
+        pd.Series: Nome da transportadora mais barata, ou None quando a linha não tem cotação.
+            Em caso de empate, prevalece a primeira transportadora da lista.
+    """
+    valores = cents.astype("float64")
+    com_valor = valores.notna().any(axis=1)
+    menores = pd.Series([None] * len(cents), index=cents.index, dtype=object)
+    if com_valor.any():
+        menores.loc[com_valor] = valores.loc[com_valor].idxmin(axis=1)
+    return menores
+
+
+def compare_carrier_quotes(df_output: pd.DataFrame, logger, carriers: dict = None) -> pd.DataFrame:
+    """
+    Compara as cotações das transportadoras e adiciona ao DataFrame de saída as colunas de comparação,
+    calculadas de forma vetorizada para todas as linhas (as colunas de cotação também são padronizadas
+    com `normalize_brl`):
+        - 'TRANSPORTADORA MAIS BARATA': transportadora com a menor cotação;
+        - 'ECONOMIA': diferença entre a maior e a menor cotação (com ao menos duas cotações);
+        - 'DIFERENÇA <TRANSPORTADORA>': quanto cada transportadora custa a mais que a mais barata.
+
+    Parâmetros:
+        df_output (pd.DataFrame): DataFrame de saída com as colunas de cotação.
+        logger (IntegratedLogger): Logger usado para registrar o resumo da comparação.
+        carriers (dict, opcional): Mapeamento {transportadora: coluna}. Padrão: `COLUNAS_COTACAO_POR_TRANSPORTADORA`.
+
+    Retorna:
+        pd.DataFrame: O mesmo DataFrame, com as colunas de comparação preenchidas (valores em "R$ 0,00").
+
+    Raises:
+        ValueError: Se alguma coluna de cotação não existir no DataFrame.
+    """
+    carriers = carriers or COLUNAS_COTACAO_POR_TRANSPORTADORA
+    cents = quote_cents_frame(df_output, carriers)
+
+    # Padroniza as cotações no formato brasileiro ("R$ 1.234,56")
+    for coluna in carriers.values():
+        df_output[coluna] = normalize_brl(df_output[coluna])
+
+    menor = cents.min(axis=1, skipna=True)
+    maior = cents.max(axis=1, skipna=True)
+    quantidade = cents.notna().sum(axis=1)
+
+    df_output["TRANSPORTADORA MAIS BARATA"] = cheapest_carrier(cents)
+    df_output["ECONOMIA"] = _report_column(format_brl((maior - menor).where(quantidade > 1)))
+    for transportadora in cents.columns:
+        df_output[f"DIFERENÇA {transportadora}"] = _report_column(format_brl(cents[transportadora] - menor))
+
+    resumo = ", ".join(
+        f"{transportadora} mais barata em {quantidade_linhas} linhas"
+        for transportadora, quantidade_linhas in df_output["TRANSPORTADORA MAIS BARATA"].value_counts().items()
+    )
+    logger.info(f"Comparação de cotações: {resumo or 'nenhuma cotação disponível'}")
+    return df_output
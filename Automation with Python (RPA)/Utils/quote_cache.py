@@ -0,0 +1,137 @@
+import os
+import json
+import hashlib
+from Utils.sqlite_cache import SQLiteTTLCache
+from config import vars_map
+
+# Nome do metadado que guarda o contexto das cotações armazenadas (fora da tabela de cotações)
+CONTEXT_KEY = "context"
+
+
+class QuoteCache:
+    """
+    Cache persistente de cotações de frete, compartilhado entre execuções.
+
+    Cada cotação é identificada pela transportadora e pelos parâmetros que influenciam o preço
+    (CEPs, serviço, peso, dimensões e valor declarado). O tempo de vida é definido por
+    transportadora e todo o cache é invalidado quando o contexto da execução
+    ('ORIGIN_CEP' e 'PICKUP_VALUE') muda.
+    """
+
+    def __init__(self, db_path: str, ttl_hours_by_carrier: dict, max_entries: int, context: dict):
+        self.ttl_hours_by_carrier = ttl_hours_by_carrier
+        self._cache = SQLiteTTLCache(
+            db_path=db_path,
+            table="freight_quotes",
+            ttl_seconds=max(ttl_hours_by_carrier.values(), default=0) * 3600,
+            max_entries=max_entries
+        )
+        self._ensure_context(context)
+
+    @property
+    def hits(self) -> int:
+        return self._cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self._cache.misses
+
+    def _ensure_context(self, context: dict):
+        """
+        Limpa o cache quando o contexto atual difere do contexto das cotações armazenadas.
+
+        O contexto fica nos metadados do cache, e não como uma entrada da tabela de cotações, para não
+        ser despejado pelo limite de tamanho (o que limparia todas as cotações na execução seguinte).
+        """
+        fingerprint = json.dumps(context, sort_keys=True, default=str)
+        if self._cache.get_metadata(CONTEXT_KEY) != fingerprint:
+            self._cache.clear()
+            self._cache.set_metadata(CONTEXT_KEY, fingerprint)
+        self._cache.hits = self._cache.misses = 0
+
+    @staticmethod
+    def make_key(carrier: str, params: dict) -> str:
+        """
+        Gera a chave da cotação a partir da transportadora e dos parâmetros de envio.
+        """
+        payload = json.dumps({"carrier": carrier, **params}, sort_keys=True, default=str)
+        return f"{carrier}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+    def get(self, carrier: str, params: dict):
+        """
+        Retorna a cotação armazenada, se existir e estiver dentro do TTL da transportadora.
+
+        Parâmetros:
+            carrier (str): Transportadora ("correios" ou "jadlog").
+            params (dict): Parâmetros de envio que identificam a cotação.
+
+        Retorna:
+            dict ou None: Cotação armazenada ou None quando ausente/expirada.
+        """
+        ttl_seconds = self.ttl_hours_by_carrier.get(carrier, 0) * 3600
+        value = self._cache.get(self.make_key(carrier, params), ttl_seconds=ttl_seconds)
+        return json.loads(value) if value is not None else None
+
+    def set(self, carrier: str, params: dict, quote: dict):
+        """
+        Armazena uma cotação obtida com sucesso.
+
+        Parâmetros:
+            carrier (str): Transportadora ("correios" ou "jadlog").
+            params (dict): Parâmetros de envio que identificam a cotação.
+            quote (dict): Resultado da cotação (ex: {"prazo": "5", "preco": "R$ 23,90"}).
+        """
+        self._cache.set(self.make_key(carrier, params), json.dumps(quote))
+
+    def close(self):
+        self._cache.close()
+
+
+def create_quote_cache() -> QuoteCache:
+    """
+    Cria o cache de cotações de frete com as configurações de `vars_map`
+    ('DEFAULT_CACHE_PATH', 'QUOTE_CACHE_TTL_HOURS_CORREIOS', 'QUOTE_CACHE_TTL_HOURS_JADLOG'
+    e 'QUOTE_CACHE_MAX_ENTRIES').
+
+    Retorna:
+        QuoteCache: Cache pronto para uso pelas etapas de cotação.
+    """
+    return QuoteCache(
+        db_path=os.path.join(vars_map['DEFAULT_CACHE_PATH'], 'quote_cache.sqlite3'),
+        ttl_hours_by_carrier={
+            "correios": vars_map['QUOTE_CACHE_TTL_HOURS_CORREIOS'],
+            "jadlog": vars_map['QUOTE_CACHE_TTL_HOURS_JADLOG'],
+        },
+        max_entries=vars_map['QUOTE_CACHE_MAX_ENTRIES'],
+        context={
+            "ORIGIN_CEP": vars_map['ORIGIN_CEP'],
+            "PICKUP_VALUE": vars_map['PICKUP_VALUE'],
+        }
+    )
+
+
+def correios_quote_params(consulta: dict) -> dict:
+    """
+    Extrai, dos argumentos de `interact_correios`, os parâmetros que identificam uma cotação dos Correios.
+    """
+    return {
+        "cep_origin": consulta.get("cep_origin", vars_map['ORIGIN_CEP']),
+        "cep_destiny": consulta["cep_destiny"],
+        "service": consulta["service_type"],
+        "weight": consulta["weight"],
+        "dimensions": consulta["dimensions"],
+    }
+
+
+def jadlog_quote_params(row) -> dict:
+    """
+    Extrai, de uma linha do DataFrame da Jadlog, os parâmetros que identificam uma cotação.
+    """
+    return {
+        "cep_origin": vars_map['ORIGIN_CEP'],
+        "cep_destiny": str(row["CEP"]),
+        "service": str(row["TIPO DE SERVIÇO JADLOG"]),
+        "weight": str(row["PESO DO PRODUTO"]),
+        "dimensions": str(row["DIMENSÕES CAIXA (altura x largura x comprimento cm)"]),
+        "declared_value": str(row["VALOR DO PEDIDO"]),
+    }
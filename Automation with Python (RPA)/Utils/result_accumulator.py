@@ -0,0 +1,74 @@
+import threading
+import pandas as pd
+
+
+class ResultAccumulator:
+    """
+    Acumula, por CNPJ, os valores que cada etapa precisa gravar no DataFrame de saída.
+
+    Registrar um resultado custa apenas uma escrita em dicionário (segura entre threads);
+    as atualizações são aplicadas ao DataFrame de uma só vez, de forma vetorizada, com
+    `apply`. Se o mesmo CNPJ/coluna for registrado mais de uma vez, prevalece o último valor,
+    como nas atribuições sucessivas com `df_output.loc[...]`.
+
+    Com `on_update`, cada registro também é repassado (ex: ao checkpoint da execução, ver
+    `CheckpointStore.result_recorder`) no momento em que é feito.
+    """
+
+    def __init__(self, on_update=None):
+        self._updates = {}
+        self._lock = threading.Lock()
+        self._on_update = on_update
+
+    def set(self, cnpj, column: str, value):
+        """
+        Registra o valor de uma coluna para o CNPJ informado.
+
+        Parâmetros:
+            cnpj: CNPJ da linha (mesmo valor/tipo da coluna 'CNPJ' do DataFrame de saída).
+            column (str): Nome da coluna do DataFrame de saída.
+            value: Valor a ser gravado.
+        """
+        with self._lock:
+            self._updates.setdefault(column, {})[cnpj] = value
+        if self._on_update is not None:
+            self._on_update(cnpj, {column: value})
+
+    def update(self, cnpj, values: dict):
+        """
+        Registra vários valores (coluna: valor) para o CNPJ informado.
+        """
+        with self._lock:
+            for column, value in values.items():
+                self._updates.setdefault(column, {})[cnpj] = value
+        if self._on_update is not None:
+            self._on_update(cnpj, values)
+
+    def __len__(self) -> int:
+        return sum(len(values) for values in self._updates.values())
+
+    def apply(self, df_output: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aplica todas as atualizações acumuladas ao DataFrame de saída em uma única passada por coluna.
+
+        Parâmetros:
+            df_output (pd.DataFrame): DataFrame de saída com a coluna 'CNPJ'.
+
+        Retorna:
+            pd.DataFrame: O mesmo DataFrame, atualizado. As atualizações aplicadas são descartadas.
+        """
+        with self._lock:
+            updates, self._updates = self._updates, {}
+
+        for column, values in updates.items():
+            novos_valores = pd.Series(list(values.values()), index=list(values.keys()), dtype=object)
+            mask = df_output["CNPJ"].isin(novos_valores.index)
+            if not mask.any():
+                continue
+            if column not in df_output.columns:
+                df_output[column] = None
+            if df_output[column].dtype != object:
+                df_output[column] = df_output[column].astype(object)
+            df_output.loc[mask, column] = df_output.loc[mask, "CNPJ"].map(novos_valores)
+
+        return df_output
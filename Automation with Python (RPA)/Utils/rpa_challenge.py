@@ -1,5 +1,4 @@
 import os
-import time
 import logging
 import pandas as pd
 from selenium import webdriver
@@ -7,8 +6,43 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait  
 from selenium.webdriver.support import expected_conditions as EC  
 from selenium.webdriver.chrome.service import Service  
-from webdriver_manager.chrome import ChromeDriverManager  
 from config import vars_map
+from Utils.run_profiler import PROFILER, profiled
+
+# Campos do formulário ({ng-reflect-name: coluna do DataFrame}), na ordem de preenchimento
+FORM_FIELDS = {
+    'labelFirstName': 'RAZÃO SOCIAL',
+    'labelLastName': 'SITUAÇÃO CADASTRAL',
+    'labelCompanyName': 'NOME FANTASIA',
+    'labelRole': 'DESCRIÇÃO MATRIZ FILIAL',
+    'labelAddress': 'ENDEREÇO',
+    'labelEmail': 'E-MAIL',
+    'labelPhone': 'TELEFONE + DDD',
+}
+
+# Localiza os campos da renderização atual do formulário (a ordem muda a cada envio), preenche
+# todos de uma vez disparando os eventos 'input' e 'change' (que atualizam o modelo do Angular)
+# e envia o formulário. Retorna os campos não encontrados (lista vazia em caso de sucesso).
+FAST_FILL_SCRIPT = """
+const values = arguments[0];
+const setValue = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+const fields = {};
+const missing = [];
+for (const name of Object.keys(values)) {
+    fields[name] = document.querySelector('input[ng-reflect-name="' + name + '"]');
+    if (!fields[name]) { missing.push(name); }
+}
+const submit = document.querySelector('input[type="submit"][value="Submit"], input[value="Submit"]');
+if (!submit) { missing.push('submit'); }
+if (missing.length) { return missing; }
+for (const name of Object.keys(values)) {
+    setValue.call(fields[name], values[name]);
+    fields[name].dispatchEvent(new Event('input', {bubbles: true}));
+    fields[name].dispatchEvent(new Event('change', {bubbles: true}));
+}
+submit.click();
+return [];
+"""
 
 
 def access_website(driver, url, logger):
@@ -83,34 +117,68 @@ def fill_form_data(driver, data, logger):
     locators = capture_form_xpaths(logger)
     for index, row in data.iterrows():
         try:
-            driver.find_element(By.XPATH, locators['first_name']).send_keys(row['RAZÃO SOCIAL'])
-            driver.find_element(By.XPATH, locators['last_name']).send_keys(row['SITUAÇÃO CADASTRAL'])
-            driver.find_element(By.XPATH, locators['company_name']).send_keys(row['NOME FANTASIA'])
-            driver.find_element(By.XPATH, locators['role_in_company']).send_keys(row['DESCRIÇÃO MATRIZ FILIAL'])
-            driver.find_element(By.XPATH, locators['address']).send_keys(row['ENDEREÇO'])
-            driver.find_element(By.XPATH, locators['email']).send_keys(row['E-MAIL'])
-            driver.find_element(By.XPATH, locators['phone_number']).send_keys(row['TELEFONE + DDD'])
-            driver.find_element(By.XPATH, locators['submit']).click()
-            logger.info(f"Linha {index + 1} inserida com sucesso!")
+            with PROFILER.row("rpa_challenge_linha"):
+                driver.find_element(By.XPATH, locators['first_name']).send_keys(row['RAZÃO SOCIAL'])
+                driver.find_element(By.XPATH, locators['last_name']).send_keys(row['SITUAÇÃO CADASTRAL'])
+                driver.find_element(By.XPATH, locators['company_name']).send_keys(row['NOME FANTASIA'])
+                driver.find_element(By.XPATH, locators['role_in_company']).send_keys(row['DESCRIÇÃO MATRIZ FILIAL'])
+                driver.find_element(By.XPATH, locators['address']).send_keys(row['ENDEREÇO'])
+                driver.find_element(By.XPATH, locators['email']).send_keys(row['E-MAIL'])
+                driver.find_element(By.XPATH, locators['phone_number']).send_keys(row['TELEFONE + DDD'])
+                driver.find_element(By.XPATH, locators['submit']).click()
+                logger.info(f"Linha {index + 1} inserida com sucesso!")
         except Exception as e:
             logger.error(f"Erro ao inserir dados da linha {index + 1}: {e}")
             # Em caso de erro, continua para a próxima linha
             continue
 
 
-def capture_execution_time(driver, logger):
+def fill_form_data_fast(driver, data, logger):
+    """
+    Preenche o formulário com os dados do DataFrame usando uma única chamada de script por linha
+    (ver `FAST_FILL_SCRIPT`), em vez de localizar e digitar em cada campo pelo WebDriver.
+
+    Os campos são localizados pelo 'ng-reflect-name' a cada renderização do formulário, dentro do
+    próprio script. Erros continuam sendo registrados por linha.
+
+    Parâmetros:
+        driver: Instância do WebDriver.
+        data (DataFrame): Dados extraídos do arquivo Excel.
+        logger: Instância do logger para registrar o progresso.
+    """
+    logger.info("Preenchendo formulário com os dados do arquivo Excel (preenchimento por script)")
+    colunas = list(FORM_FIELDS.values())
+    for index, valores in zip(data.index, data[colunas].itertuples(index=False, name=None)):
+        try:
+            with PROFILER.row("rpa_challenge_linha"):
+                campos = {
+                    nome: "" if pd.isna(valor) else str(valor)
+                    for nome, valor in zip(FORM_FIELDS, valores)
+                }
+                ausentes = driver.execute_script(FAST_FILL_SCRIPT, campos)
+                if ausentes:
+                    raise RuntimeError(f"Campos não encontrados no formulário: {ausentes}")
+                logger.info(f"Linha {index + 1} inserida com sucesso!")
+        except Exception as e:
+            logger.error(f"Erro ao inserir dados da linha {index + 1}: {e}")
+            # Em caso de erro, continua para a próxima linha
+            continue
+
+
+def capture_execution_time(driver, logger, timeout=40):
     """
     Captura o tempo de execução exibido no site.
     
     Parâmetros:
         driver: Instância do WebDriver.
         logger: Instância do logger.
+        timeout (int, opcional): Tempo máximo de espera pela mensagem, em segundos. Padrão: 40.
         
     Retorna:
         str: Tempo de execução capturado.
     """
     logger.info("Capturando tempo de execução")
-    message = WebDriverWait(driver, 40).until(
+    message = WebDriverWait(driver, timeout).until(
         EC.visibility_of_element_located((By.CLASS_NAME, 'message2'))
     )
     execution_time = message.text
@@ -132,9 +200,11 @@ def take_success_screenshot(driver, image_path, logger):
     logger.info(f"Screenshot salvo com sucesso em {image_path}")
 
 
+@profiled("chrome_inicializacao")
 def initialize_browser(logger):
     """
-    Inicializa o navegador Chrome utilizando webdriver_manager.
+    Inicializa o navegador Chrome com o ChromeDriver resolvido na configuração ('CHROMEDRIVER_PATH'),
+    em modo headless se 'BROWSER_HEADLESS'.
     
     Parâmetros:
         logger: Instância do logger.
@@ -143,8 +213,11 @@ def initialize_browser(logger):
         WebDriver: Instância configurada do Chrome.
     """
     logger.info("Inicializando navegador Chrome")
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service)
+    service = Service(vars_map['CHROMEDRIVER_PATH'])
+    options = webdriver.ChromeOptions()
+    if vars_map['BROWSER_HEADLESS']:
+        options.add_argument("--headless=new")
+    driver = webdriver.Chrome(service=service, options=options)
     driver.maximize_window()
     logger.info("Navegador Chrome inicializado com sucesso!")
     return driver
@@ -163,16 +236,25 @@ def close_browser(driver, logger):
     logger.info("Navegador Chrome fechado com sucesso!")
 
 
-def rpa_challenge(logger, df):
+@profiled()
+def rpa_challenge(logger, df, browser_pool=None):
     """
     Função principal para orquestrar a execução do script de automação.
     
     Parâmetros:
         logger: Instância do logger para registrar os eventos.
         df (DataFrame): Dados do arquivo Excel a serem usados no formulário.
+        browser_pool (BrowserPool, opcional): Pool de navegadores já iniciados. Se informado, o desafio
+            usa um navegador do pool (devolvido ao final) em vez de iniciar e fechar o Chrome.
+
+    Retorna:
+        bool: True se o desafio foi concluído; False se falhou (o erro já é registrado no log).
         
     Observações:
         - O caminho para salvar o screenshot e a URL do desafio são obtidos de vars_map.
+        - Com 'RPA_CHALLENGE_FAST_FILL', cada linha é preenchida com uma única chamada de script
+          (ver `fill_form_data_fast`). O tempo exibido pelo desafio fica registrado no log e no
+          perfil de desempenho da execução.
         - Ajuste as chamadas comentadas conforme a necessidade.
     """
     # Define o caminho para salvar o screenshot; se 'DEFAULT_IMAGE_PATH' não estiver configurado, utiliza um caminho vazio
@@ -183,24 +265,42 @@ def rpa_challenge(logger, df):
         logger.info("Arquivo carregado com sucesso!")
     except Exception as e:
         logger.error(f"Erro ao carregar o arquivo Excel: {e}")
-        return
+        return False
 
-    driver = initialize_browser(logger)
+    bot_pool = browser_pool.acquire() if browser_pool is not None else None
+    driver = bot_pool.driver if bot_pool is not None else initialize_browser(logger)
+    falhou = False
     try:
         access_website(driver, vars_map.get('DEFAUT_RPACHALLENGE_URL', ''), logger)
         # Caso seja necessário iniciar o desafio, descomente a linha abaixo:
         # start_challenge(driver, logger)
-        fill_form_data(driver, data, logger)
-        # Se necessário, capture o tempo de execução:
-        # execution_time = capture_execution_time(driver, logger)
-        # logger.info(f"Tempo de execução: {execution_time}")
+        fast_fill = vars_map['RPA_CHALLENGE_FAST_FILL']
+        if fast_fill:
+            fill_form_data_fast(driver, data, logger)
+        else:
+            fill_form_data(driver, data, logger)
+
+        # Tempo medido pelo próprio desafio, para comparar os modos de preenchimento
+        try:
+            execution_time = capture_execution_time(driver, logger, timeout=5)
+            PROFILER.attach("rpa_challenge", {
+                "modo": "script" if fast_fill else "webdriver", "tempo_desafio": execution_time
+            })
+        except Exception:
+            # Sem clicar em "Start" (ver `start_challenge`) o site não mede o tempo: não é uma falha
+            logger.info("O site não exibiu o tempo de execução do desafio (desafio não iniciado); tempo não registrado.")
         # Para salvar screenshot, descomente a linha abaixo:
         # take_success_screenshot(driver, image_path, logger)
         logger.info("Execução finalizada com sucesso!")
     except Exception as e:
         logger.error(f"Erro durante o processo rpa_challenge: {e}")
+        falhou = True
     finally:
-        close_browser(driver, logger)
+        if bot_pool is not None:
+            browser_pool.release(bot_pool, discard=falhou)
+        else:
+            close_browser(driver, logger)
+    return not falhou
 
 
 if __name__ == "__main__":
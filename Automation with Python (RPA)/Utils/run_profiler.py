@@ -0,0 +1,216 @@
+import os
+import json
+import math
+import time
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime
+
+# Limites (em segundos) das faixas do histograma de latência por linha
+HISTOGRAM_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def percentile(values: list, q: float) -> float:
+    """
+    Calcula o percentil `q` (0 a 100) por interpolação linear entre as posições vizinhas.
+
+    Parâmetros:
+        values (list[float]): Valores já ordenados.
+        q (float): Percentil desejado (ex: 95).
+
+    Retorna:
+        float: O percentil, ou None se a lista estiver vazia.
+    """
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    lower, upper = math.floor(position), math.ceil(position)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def latency_histogram(values: list) -> dict:
+    """
+    Agrupa as latências nas faixas de `HISTOGRAM_BUCKETS` ({"<=0.1s": quantidade, ..., ">60s": quantidade}).
+    """
+    histogram = {f"<={limit}s": 0 for limit in HISTOGRAM_BUCKETS}
+    histogram[f">{HISTOGRAM_BUCKETS[-1]}s"] = 0
+    for value in values:
+        for limit in HISTOGRAM_BUCKETS:
+            if value <= limit:
+                histogram[f"<={limit}s"] += 1
+                break
+        else:
+            histogram[f">{HISTOGRAM_BUCKETS[-1]}s"] += 1
+    return histogram
+
+
+class RunProfiler:
+    """
+    Mede onde o tempo de uma execução é gasto.
+
+    Registra dois tipos de medição, identificados por nome:
+        - etapas (`stage`): tempo total e quantidade de chamadas (ex: "api_data_lookup", "excel_salvar");
+        - linhas (`row`): latência de cada item processado (ex: uma cotação da Jadlog), resumida em
+          percentis (p50/p95/p99) e em um histograma.
+
+    As medições podem ser feitas por gerenciador de contexto (`with profiler.stage("nome"):`) ou pelo
+    decorador `profiled`. A instância pode ser compartilhada entre threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Descarta as medições anteriores e reinicia o relógio da execução.
+        """
+        with self._lock:
+            self.started_at = time.time()
+            self._started_perf = time.perf_counter()
+            self._stages = {}
+            self._rows = {}
+            self._extra = {}
+
+    def record_stage(self, name: str, seconds: float, failed: bool = False):
+        with self._lock:
+            stage = self._stages.setdefault(name, {"calls": 0, "failures": 0, "total_s": 0.0, "max_s": 0.0})
+            stage["calls"] += 1
+            stage["failures"] += int(failed)
+            stage["total_s"] += seconds
+            stage["max_s"] = max(stage["max_s"], seconds)
+
+    def record_row(self, name: str, seconds: float, failed: bool = False):
+        with self._lock:
+            rows = self._rows.setdefault(name, {"latencies": [], "failures": 0})
+            rows["latencies"].append(seconds)
+            rows["failures"] += int(failed)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Mede o bloco como uma etapa. Exceções são registradas como falha e propagadas.
+        """
+        started_at = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record_stage(name, time.perf_counter() - started_at, failed)
+
+    @contextmanager
+    def row(self, name: str):
+        """
+        Mede o bloco como o processamento de uma linha. Exceções são registradas como falha e propagadas.
+        """
+        started_at = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.record_row(name, time.perf_counter() - started_at, failed)
+
+    def attach(self, key: str, value):
+        """
+        Anexa ao perfil uma informação adicional serializável em JSON (ex: o timeline das etapas).
+        """
+        with self._lock:
+            self._extra[key] = value
+
+    def summary(self) -> dict:
+        """
+        Retorna o perfil da execução: duração, totais por etapa e estatísticas de latência por linha.
+        """
+        with self._lock:
+            stages = {name: dict(values) for name, values in self._stages.items()}
+            rows = {name: (sorted(values["latencies"]), values["failures"]) for name, values in self._rows.items()}
+            extra = dict(self._extra)
+            elapsed = time.perf_counter() - self._started_perf
+
+        for values in stages.values():
+            values["total_s"] = round(values["total_s"], 4)
+            values["max_s"] = round(values["max_s"], 4)
+
+        row_stats = {}
+        for name, (latencies, failures) in rows.items():
+            row_stats[name] = {
+                "count": len(latencies),
+                "failures": failures,
+                "total_s": round(sum(latencies), 4),
+                "mean_s": round(sum(latencies) / len(latencies), 4),
+                "p50_s": round(percentile(latencies, 50), 4),
+                "p95_s": round(percentile(latencies, 95), 4),
+                "p99_s": round(percentile(latencies, 99), 4),
+                "max_s": round(latencies[-1], 4),
+                "histogram": latency_histogram(latencies),
+            }
+
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "elapsed_s": round(elapsed, 4),
+            "stages": dict(sorted(stages.items(), key=lambda item: item[1]["total_s"], reverse=True)),
+            "rows": row_stats,
+            **extra,
+        }
+
+    def summary_text(self, max_stages: int = 5) -> str:
+        """
+        Resumo curto do perfil, em uma linha (usado na mensagem de finalização da tarefa no Maestro).
+        """
+        profile = self.summary()
+        parts = [f"Duração {profile['elapsed_s']:.1f}s"]
+        stages = list(profile["stages"].items())[:max_stages]
+        if stages:
+            parts.append("Etapas: " + ", ".join(f"{name} {values['total_s']:.1f}s" for name, values in stages))
+        for name, values in profile["rows"].items():
+            parts.append(
+                f"{name}: {values['count']} linhas, p50 {values['p50_s']:.2f}s, "
+                f"p95 {values['p95_s']:.2f}s, p99 {values['p99_s']:.2f}s"
+            )
+        return " | ".join(parts)
+
+    def save(self, directory: str) -> str:
+        """
+        Grava o perfil em `directory/run_profile_<data-hora>.json`.
+
+        Retorna:
+            str: Caminho do arquivo gravado.
+        """
+        os.makedirs(directory, exist_ok=True)
+        file_path = os.path.join(
+            directory, f"run_profile_{datetime.fromtimestamp(self.started_at).strftime('%d-%m-%Y_%H-%M-%S')}.json"
+        )
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, ensure_ascii=False, indent=2, default=str)
+        return file_path
+
+
+# Perfil da execução atual, compartilhado pelos módulos do robô (reiniciado no início de `bot.main`)
+PROFILER = RunProfiler()
+
+
+def profiled(name: str = None, row: bool = False):
+    """
+    Decorador que mede cada chamada da função no `PROFILER`, como etapa ou, com `row=True`, como linha.
+
+    Parâmetros:
+        name (str, opcional): Nome da medição. Padrão: nome da função.
+        row (bool, opcional): Registra cada chamada como o processamento de uma linha.
+    """
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            measure = PROFILER.row if row else PROFILER.stage
+            with measure(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteTTLCache:
+    """
+    Cache persistente em disco (SQLite) com tempo de vida (TTL) e despejo por tamanho.
+
+    Cada entrada é armazenada como texto (ex: JSON bruto) associada a uma chave única.
+    Entradas mais antigas que o TTL são ignoradas na leitura e, quando o número de
+    entradas ultrapassa o limite, as menos acessadas recentemente são removidas.
+    Metadados do cache (ex: o contexto em que as entradas foram geradas) ficam em uma tabela
+    separada (ver `get_metadata`), fora do despejo por tamanho e da limpeza com `clear`.
+    A instância pode ser compartilhada entre threads.
+    """
+
+    def __init__(self, db_path: str, table: str, ttl_seconds: float, max_entries: int):
+        self.db_path = db_path
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_metadata ("
+            "cache_table TEXT NOT NULL, name TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (cache_table, name))"
+        )
+        self._conn.commit()
+
+    def get(self, key: str, ttl_seconds: float = None):
+        """
+        Retorna o valor armazenado para a chave, se existir e ainda estiver dentro do TTL.
+
+        Parâmetros:
+            key (str): Chave da entrada.
+            ttl_seconds (float, opcional): TTL específico para esta leitura. Padrão: TTL da instância.
+
+        Retorna:
+            str ou None: Valor armazenado ou None quando ausente/expirado.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > ttl:
+                self.misses += 1
+                return None
+
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """
+        Grava (ou substitui) o valor de uma chave e aplica o limite de tamanho do cache.
+
+        Parâmetros:
+            key (str): Chave da entrada.
+            value (str): Valor a ser armazenado.
+        """
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            # Remove as entradas menos acessadas recentemente que excedem o limite
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def get_metadata(self, name: str):
+        """
+        Retorna o metadado gravado com `set_metadata`, ou None se não existir.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM cache_metadata WHERE cache_table = ? AND name = ?", (self.table, name)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_metadata(self, name: str, value: str):
+        """
+        Grava um metadado do cache. Metadados não contam no limite de entradas e nunca são despejados.
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_metadata (cache_table, name, value) VALUES (?, ?, ?)",
+                (self.table, name, value)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """
+        Remove todas as entradas do cache.
+        """
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def close(self):
+        """
+        Fecha a conexão com o banco SQLite.
+        """
+        with self._lock:
+            self._conn.close()
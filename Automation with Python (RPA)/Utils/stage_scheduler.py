@@ -0,0 +1,197 @@
+import time
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class Stage:
+    """
+    Etapa do processo: uma função que recebe as entradas declaradas (por nome) e retorna as saídas declaradas.
+
+    Parâmetros:
+        name (str): Nome da etapa (usado no timeline).
+        func (callable): Função chamada com as entradas como argumentos nomeados. Deve retornar um
+            dicionário {saída: valor} com todas as saídas declaradas (ou None, se não houver saídas).
+        inputs (tuple[str], opcional): Nomes dos valores de que a etapa depende.
+        outputs (tuple[str], opcional): Nomes dos valores produzidos pela etapa.
+    """
+
+    def __init__(self, name: str, func, inputs: tuple = (), outputs: tuple = ()):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+
+
+class StageScheduler:
+    """
+    Executa etapas respeitando as dependências declaradas: uma etapa começa assim que todas as suas
+    entradas estão disponíveis, e etapas independentes rodam ao mesmo tempo (até `max_workers`).
+
+    As saídas são gravadas no contexto na ordem de declaração das etapas, independentemente da ordem
+    em que terminaram. Cada execução registra um timeline (início, fim e duração de cada etapa).
+    """
+
+    def __init__(self, logger, max_workers: int = 4):
+        self.logger = logger
+        self.max_workers = max(1, max_workers)
+        self.stages = []
+        self.timeline = []
+
+    def add_stage(self, name: str, func, inputs: tuple = (), outputs: tuple = ()) -> Stage:
+        """
+        Declara uma etapa (ver `Stage`).
+
+        Raises:
+            ValueError: Se já existir uma etapa com o mesmo nome ou outra etapa produzir a mesma saída.
+        """
+        for stage in self.stages:
+            if stage.name == name:
+                raise ValueError(f"Etapa '{name}' declarada mais de uma vez.")
+            repeated = set(stage.outputs) & set(outputs)
+            if repeated:
+                raise ValueError(f"Saídas {sorted(repeated)} declaradas pelas etapas '{stage.name}' e '{name}'.")
+
+        stage = Stage(name, func, inputs, outputs)
+        self.stages.append(stage)
+        return stage
+
+    def run(self, context: dict) -> dict:
+        """
+        Executa todas as etapas declaradas.
+
+        Parâmetros:
+            context (dict): Valores iniciais disponíveis para as etapas ({nome: valor}).
+
+        Retorna:
+            dict: Um novo contexto com os valores iniciais e todas as saídas das etapas.
+
+        Raises:
+            ValueError: Se alguma etapa depender de um valor que nenhuma etapa produz.
+            Exception: A exceção da primeira etapa (na ordem de declaração) que falhou. As etapas em
+                andamento terminam normalmente; as que dependem da etapa com falha não são iniciadas.
+        """
+        context = dict(context)
+        available = set(context)
+        for stage in self.stages:
+            available |= set(stage.outputs)
+        for stage in self.stages:
+            missing = [name for name in stage.inputs if name not in available]
+            if missing:
+                raise ValueError(f"Etapa '{stage.name}' depende de valores inexistentes: {missing}")
+
+        self.timeline = []
+        started_at = time.perf_counter()
+        results = {}
+        errors = {}
+        pending = list(self.stages)
+        running = {}
+        ready_values = set(context)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as executor:
+            while pending or running:
+                if not errors:
+                    # Inicia, na ordem de declaração, as etapas cujas entradas já estão disponíveis
+                    for stage in list(pending):
+                        if all(name in ready_values for name in stage.inputs):
+                            pending.remove(stage)
+                            arguments = {name: context[name] for name in stage.inputs}
+                            running[executor.submit(self._run_stage, stage, arguments, started_at)] = stage
+                elif not running:
+                    break
+
+                if not running:
+                    raise ValueError(f"Dependência circular entre as etapas {[stage.name for stage in pending]}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        results[stage.name] = future.result()
+                    except Exception as error:
+                        errors[stage.name] = error
+                        continue
+                    # As saídas ficam disponíveis para as etapas dependentes assim que a etapa termina
+                    for name in stage.outputs:
+                        context[name] = results[stage.name][name]
+                    ready_values |= set(stage.outputs)
+
+        self.timeline.sort(key=lambda entry: entry["start"])
+        self.log_timeline()
+
+        for stage in self.stages:
+            if stage.name in errors:
+                raise errors[stage.name]
+
+        # Grava as saídas no contexto na ordem de declaração (resultado determinístico)
+        for stage in self.stages:
+            for name in stage.outputs:
+                context[name] = results[stage.name][name]
+        return context
+
+    def _run_stage(self, stage: Stage, arguments: dict, started_at: float) -> dict:
+        entry = {"stage": stage.name, "thread": threading.current_thread().name, "status": "ok"}
+        entry["start"] = time.perf_counter() - started_at
+        self.logger.info(f"Etapa '{stage.name}' iniciada.")
+        try:
+            outputs = stage.func(**arguments) or {}
+            missing = [name for name in stage.outputs if name not in outputs]
+            if missing:
+                raise ValueError(f"Etapa '{stage.name}' não retornou as saídas {missing}")
+            return outputs
+        except Exception:
+            entry["status"] = "falha"
+            raise
+        finally:
+            entry["end"] = time.perf_counter() - started_at
+            entry["duration"] = entry["end"] - entry["start"]
+            self.timeline.append(entry)
+
+    def log_timeline(self):
+        """
+        Registra no log o timeline da última execução (início e fim relativos ao começo do agendamento).
+        """
+        if not self.timeline:
+            return
+        total = max(entry["end"] for entry in self.timeline)
+        soma = sum(entry["duration"] for entry in self.timeline)
+        self.logger.info(f"Timeline das etapas: {total:.1f}s no total ({soma:.1f}s se executadas em sequência).")
+        for entry in self.timeline:
+            self.logger.info(
+                f"  {entry['stage']:<20} +{entry['start']:.1f}s -> +{entry['end']:.1f}s "
+                f"({entry['duration']:.1f}s, {entry['status']})"
+            )
+
+
+def merge_stage_frames(base: pd.DataFrame, frames: list) -> pd.DataFrame:
+    """
+    Combina as alterações feitas por etapas que trabalharam em cópias independentes do DataFrame de saída.
+
+    Para cada DataFrame (na ordem da lista), apenas as células diferentes de `base` são copiadas; se duas
+    etapas alterarem a mesma célula, prevalece a última da lista, como na execução em sequência.
+
+    Parâmetros:
+        base (pd.DataFrame): DataFrame de saída entregue às etapas (antes das alterações).
+        frames (list[pd.DataFrame]): DataFrames retornados pelas etapas, com o mesmo índice de `base`.
+
+    Retorna:
+        pd.DataFrame: Uma cópia de `base` com as alterações de todas as etapas.
+    """
+    df_output = base.copy()
+    for frame in frames:
+        for column in frame.columns:
+            novos = frame[column]
+            if column in base.columns:
+                anteriores = base[column].reindex(frame.index)
+                alterados = ~((novos == anteriores) | (novos.isna() & anteriores.isna()))
+            else:
+                alterados = pd.Series(True, index=frame.index)
+
+            if not alterados.any():
+                continue
+            if column not in df_output.columns:
+                df_output[column] = None
+            if df_output[column].dtype != object:
+                df_output[column] = df_output[column].astype(object)
+            df_output.loc[alterados[alterados].index, column] = novos[alterados]
+    return df_output
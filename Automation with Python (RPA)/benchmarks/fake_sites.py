@@ -0,0 +1,245 @@
+"""
+Substitutos locais dos serviços externos usados pelo robô, para medir o desempenho sem acessar a internet.
+
+`FakeSitesServer` atende, em um único servidor HTTP em localhost:
+    - /api/cnpj/v1/<cnpj>  BrasilAPI: JSON sintético e determinístico para cada CNPJ;
+    - /correios/           simulador dos Correios (formulário e página de resultado salvos em `fixtures/`);
+    - /jadlog/simulacao    simulador da Jadlog (a cotação aparece após a latência configurada);
+    - /rpachallenge/       página do RPA Challenge.
+
+`FakeSMTPServer` aceita (e descarta) os e-mails de resultado e de erro.
+
+Cada resposta HTTP é atrasada em `latency_ms`, para aproximar o tempo de resposta dos sites reais.
+"""
+import os
+import json
+import time
+import threading
+import socketserver
+from datetime import date
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as file:
+        return file.read()
+
+
+def fake_company(cnpj: str) -> dict:
+    """
+    Dados sintéticos de uma empresa, no formato da BrasilAPI. O mesmo CNPJ gera sempre os mesmos dados.
+    """
+    seed = int(cnpj)
+    return {
+        "cnpj": cnpj,
+        "razao_social": f"EMPRESA BENCHMARK {seed % 100000:05d} LTDA",
+        "nome_fantasia": f"BENCH {seed % 100000:05d}",
+        "situacao_cadastral": 2,
+        "logradouro": "RUA DOS TESTES",
+        "numero": str(seed % 2000 + 1),
+        "municipio": "SAO PAULO",
+        "cep": f"{1000000 + seed % 8000000:08d}",
+        "descricao_identificador_matriz_filial": "MATRIZ" if seed % 5 else "FILIAL",
+        "ddd_telefone_1": f"11{30000000 + seed % 60000000:08d}",
+        "email": f"contato{seed % 100000:05d}@bench.local",
+    }
+
+
+class _FakeSitesHandler(BaseHTTPRequestHandler):
+    server_version = "FakeSites/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch(parse_qs(urlparse(self.path).query))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self._dispatch(parse_qs(self.rfile.read(length).decode("utf-8")))
+
+    def _dispatch(self, params: dict):
+        time.sleep(self.server.latency_ms / 1000)
+        path = urlparse(self.path).path
+        self.server.count_request(path)
+
+        if path.startswith("/api/cnpj/v1/"):
+            cnpj = path.rsplit("/", 1)[-1]
+            if not cnpj.isdigit() or len(cnpj) != 14:
+                return self._send(400, json.dumps({"message": "CNPJ inválido"}), "application/json")
+            return self._send(200, json.dumps(fake_company(cnpj)), "application/json")
+
+        if path in ("/correios", "/correios/"):
+            return self._send(200, self.server.pages["correios_form"])
+
+        if path == "/correios/resultado":
+            field = lambda name, default="0": (params.get(name) or [default])[0]
+            cep = int(field("cepDestino") or 0)
+            peso = float(field("peso") or 0)
+            valor = 15 + cep % 50 + peso * 2
+            page = (
+                self.server.pages["correios_result"]
+                .replace("__DATA_POSTAGEM__", date.today().strftime("%d/%m/%Y"))
+                .replace("__PRAZO__", str(3 + cep % 7))
+                .replace("__VALOR__", f"{valor:.2f}".replace(".", ","))
+            )
+            return self._send(200, page)
+
+        if path == "/jadlog/simulacao":
+            return self._send(200, self.server.pages["jadlog"])
+
+        if path in ("/rpachallenge", "/rpachallenge/"):
+            return self._send(200, self.server.pages["rpa_challenge"])
+
+        return self._send(404, "Não encontrado", "text/plain")
+
+    def _send(self, status: int, body: str, content_type: str = "text/html"):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FakeSitesServer(ThreadingHTTPServer):
+    """
+    Servidor HTTP local com os substitutos da BrasilAPI, dos Correios, da Jadlog e do RPA Challenge.
+
+    Parâmetros:
+        latency_ms (float, opcional): Atraso aplicado a cada resposta (e ao resultado da Jadlog). Padrão: 0.
+        host (str, opcional): Endereço de escuta. Padrão: "127.0.0.1".
+        port (int, opcional): Porta de escuta. Padrão: 0 (porta livre escolhida pelo sistema).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency_ms: float = 0, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _FakeSitesHandler)
+        self.latency_ms = latency_ms
+        self.pages = {
+            "correios_form": load_fixture("correios_form.html"),
+            "correios_result": load_fixture("correios_result.html"),
+            "jadlog": load_fixture("jadlog_simulacao.html").replace("__LATENCY_MS__", str(int(latency_ms))),
+            "rpa_challenge": load_fixture("rpa_challenge.html"),
+        }
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self) -> dict:
+        """
+        Retorna as variáveis de configuração do robô apontando para este servidor.
+        """
+        return {
+            "DEFAULT_BRASILAPI_URL": f"{self.base_url}/api/cnpj/v1/",
+            "DEFAULT_CORREIOS_URL": f"{self.base_url}/correios/",
+            "DEFAULT_URL_JADLOG": f"{self.base_url}/jadlog/simulacao",
+            "DEFAUT_RPACHALLENGE_URL": f"{self.base_url}/rpachallenge/",
+        }
+
+    def count_request(self, path: str):
+        key = "/".join(path.split("/")[:3]) if path.startswith("/api/") else path.rstrip("/")
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def start(self) -> "FakeSitesServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-sites", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Implementa o mínimo do protocolo SMTP para receber mensagens (sem TLS e sem autenticação).
+    """
+
+    def handle(self):
+        self._reply("220 fake-smtp pronto")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("utf-8", "replace").strip().upper()
+
+            if command.startswith(("EHLO", "HELO")):
+                self._reply("250 fake-smtp")
+            elif command.startswith(("MAIL", "RCPT", "RSET", "NOOP")):
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 Envie a mensagem terminando com <CRLF>.<CRLF>")
+                size = 0
+                for data_line in iter(self.rfile.readline, b""):
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    size += len(data_line)
+                self.server.record_message(size)
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Até logo")
+                return
+            else:
+                self._reply("502 Comando não implementado")
+
+    def _reply(self, text: str):
+        self.wfile.write(f"{text}\r\n".encode("utf-8"))
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Servidor SMTP local que aceita e descarta as mensagens, contando quantas foram recebidas.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        super().__init__((host, port), _FakeSMTPHandler)
+        self.messages = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+
+    def record_message(self, size: int):
+        with self._lock:
+            self.messages += 1
+            self.bytes_received += size
+
+    def settings(self) -> dict:
+        """
+        Retorna as variáveis de configuração do robô apontando para este servidor.
+        """
+        host, port = self.server_address[:2]
+        return {"SMTP_HOST": host, "SMTP_PORT": str(port), "SMTP_USE_SSL": "False"}
+
+    def start(self) -> "FakeSMTPServer":
+        threading.Thread(target=self.serve_forever, name="fake-smtp", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
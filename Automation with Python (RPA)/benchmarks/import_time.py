@@ -0,0 +1,194 @@
+"""
+Mede o custo de importação de cada módulo do robô com `python -X importtime`.
+
+Cada módulo é importado em um processo novo (várias vezes, mantendo o menor tempo). O resultado é
+exibido em tabela e acrescentado a `benchmarks/results/import_time.jsonl`, sendo comparado com a
+execução anterior para destacar regressões.
+
+Uso (a partir da pasta do projeto):
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --repeat 5 --fail-on-regression
+    python benchmarks/import_time.py Utils.api_brasil Utils.money
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+from datetime import datetime
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FILE = os.path.join(PROJECT_DIR, "benchmarks", "results", "import_time.jsonl")
+
+DEFAULT_MODULES = [
+    "config",
+    "Utils",
+    "Utils.api_brasil",
+    "Utils.money",
+    "Utils.result_accumulator",
+    "Utils.run_profiler",
+    "Utils.browser_pool",
+    "Utils.incremental_store",
+    "Utils.helper_functions",
+    "Utils.integrated_logger",
+    "Utils.maestro_log_shipper",
+    "Utils.error_notifier",
+    "Utils.mail_dispatcher",
+    "Utils.functions_email",
+    "Utils.functions_excel",
+    "Utils.quote_cache",
+    "Utils.correios_http",
+    "Utils.interact_correios",
+    "Utils.interact_dataframe_correios",
+    "Utils.correios_worker_pool",
+    "Utils.interact_jadlog",
+    "Utils.rpa_challenge",
+]
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Interpreta a saída de `-X importtime`.
+
+    Parâmetros:
+        stderr (str): Saída de erro do processo executado com `-X importtime`.
+
+    Retorna:
+        list: Tuplas (módulo, profundidade, tempo próprio em µs, tempo acumulado em µs), na ordem da saída
+            (os módulos importados por um módulo aparecem antes dele, com profundidade maior).
+    """
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = len(name) - len(name.lstrip())
+        timings.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return timings
+
+
+def module_subtree(timings: list, module: str) -> list:
+    """
+    Retorna as medições do módulo e de tudo o que foi importado por ele (ignora a inicialização do interpretador).
+    """
+    for position, (name, depth, _, _) in enumerate(timings):
+        if name == module and depth == min(item[1] for item in timings):
+            start = position
+            while start > 0 and timings[start - 1][1] > depth:
+                start -= 1
+            return timings[start:position + 1]
+    return []
+
+
+def measure_module(module: str, repeat: int = 3) -> dict:
+    """
+    Importa o módulo em processos novos e retorna a medição mais rápida.
+
+    Parâmetros:
+        module (str): Nome do módulo (ex: "Utils.api_brasil").
+        repeat (int, opcional): Quantidade de processos executados. Padrão: 3.
+
+    Retorna:
+        dict: "cumulative_ms" (tempo total de importação do módulo), "modules" (quantidade de
+            módulos carregados por ele) e "heaviest" (os módulos com maior tempo próprio), ou "error"
+            se a importação falhar.
+    """
+    best = None
+    for _ in range(max(1, repeat)):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=PROJECT_DIR, capture_output=True, text=True
+        )
+        if process.returncode != 0:
+            last_line = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else ""
+            return {"error": last_line}
+
+        subtree = module_subtree(parse_importtime(process.stderr), module)
+        if not subtree:
+            return {"error": "módulo não encontrado na saída do importtime"}
+        if best is None or subtree[-1][3] < best[-1][3]:
+            best = subtree
+
+    heaviest = sorted(best, key=lambda item: item[2], reverse=True)[:5]
+    return {
+        "cumulative_ms": round(best[-1][3] / 1000, 2),
+        "modules": len(best),
+        "heaviest": {name: round(self_us / 1000, 2) for name, _, self_us, _ in heaviest},
+    }
+
+
+def load_previous_run(results_file: str = RESULTS_FILE):
+    """
+    Retorna a última execução registrada no arquivo de resultados (ou None).
+    """
+    if not os.path.exists(results_file):
+        return None
+    with open(results_file, encoding="utf-8") as file:
+        lines = [line for line in file.read().splitlines() if line.strip()]
+    return json.loads(lines[-1]) if lines else None
+
+
+def find_regressions(current: dict, previous: dict, threshold: float, min_delta_ms: float) -> list:
+    """
+    Compara duas execuções e lista os módulos cujo tempo de importação aumentou além do limite.
+
+    Parâmetros:
+        current (dict): Resultados da execução atual ({módulo: medição}).
+        previous (dict): Resultados da execução anterior.
+        threshold (float): Aumento relativo tolerado (ex: 0.2 para 20%).
+        min_delta_ms (float): Aumento absoluto mínimo, em ms, para ser considerado regressão.
+
+    Retorna:
+        list: Tuplas (módulo, tempo anterior, tempo atual).
+    """
+    regressions = []
+    for module, result in current.items():
+        before = previous.get(module, {}).get("cumulative_ms")
+        after = result.get("cumulative_ms")
+        if before is None or after is None:
+            continue
+        if after - before >= min_delta_ms and after > before * (1 + threshold):
+            regressions.append((module, before, after))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mede o tempo de importação dos módulos do robô.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Módulos a medir.")
+    parser.add_argument("--repeat", type=int, default=3, help="Processos por módulo (mantém o menor tempo).")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Aumento relativo considerado regressão.")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="Aumento mínimo, em ms, considerado regressão.")
+    parser.add_argument("--no-save", action="store_true", help="Não grava o resultado no arquivo JSONL.")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Retorna código 1 se houver regressão.")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print(f"{'Módulo':<36} {'Tempo (ms)':>10} {'Módulos':>8}  Mais pesados (tempo próprio)")
+    for module in args.modules:
+        result = results[module] = measure_module(module, args.repeat)
+        if "error" in result:
+            print(f"{module:<36} {'erro':>10} {'':>8}  {result['error']}")
+            continue
+        heaviest = ", ".join(f"{name} {ms}" for name, ms in list(result["heaviest"].items())[:3])
+        print(f"{module:<36} {result['cumulative_ms']:>10} {result['modules']:>8}  {heaviest}")
+
+    previous = load_previous_run()
+    regressions = find_regressions(results, previous["results"], args.threshold, args.min_delta_ms) if previous else []
+    for module, before, after in regressions:
+        print(f"REGRESSÃO: {module} passou de {before} ms para {after} ms")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, "a", encoding="utf-8") as file:
+            file.write(json.dumps({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": sys.version.split()[0],
+                "repeat": args.repeat,
+                "results": results,
+            }, ensure_ascii=False) + "\n")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""
+Mede a vazão do robô completo (`bot.main`) sem acessar a internet.
+
+Sobe os substitutos locais da BrasilAPI, dos Correios, da Jadlog, do RPA Challenge e do servidor SMTP
+(ver `fake_sites.py`), gera planilhas de entrada sintéticas com a quantidade de linhas pedida e executa
+o robô em um processo novo para cada tamanho. Para cada execução são registrados linhas por segundo,
+pico de memória residente (RSS) do processo do robô e o tempo por etapa (ver `RunProfiler`).
+
+O resultado é exibido em tabela e acrescentado a `benchmarks/results/offline_bench.jsonl`, sendo
+comparado com a execução anterior de mesmo tamanho para destacar regressões. O Chrome e o ChromeDriver
+continuam necessários (o navegador roda em modo headless); o RSS medido não inclui os processos do Chrome.
+
+Uso (a partir da pasta do projeto):
+    python benchmarks/offline_bench.py
+    python benchmarks/offline_bench.py --rows 10 100 1000 10000 --latency-ms 50
+    python benchmarks/offline_bench.py --rows 100 --set CORREIOS_WORKERS=4 --set CORREIOS_HTTP_ENABLED=True
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FILE = os.path.join(PROJECT_DIR, "benchmarks", "results", "offline_bench.jsonl")
+
+DEFAULT_ROWS = [10, 100, 1000]
+
+INPUT_FILE_NAME = "Planilha de Entrada Grupos.xlsx"
+INPUT_SHEET_NAME = "Grupo 1 "
+INPUT_COLUMNS = [
+    "CNPJ", "VALOR DO PEDIDO", "DIMENSÕES CAIXA (altura x largura x comprimento cm)",
+    "PESO DO PRODUTO", "TIPO DE SERVIÇO JADLOG", "TIPO DE SERVIÇO CORREIOS",
+]
+
+# Valores usados, em rodízio, nas linhas sintéticas
+SERVICOS_CORREIOS = ["PAC", "SEDEX"]
+SERVICOS_JADLOG = ["JADLOG Expresso", "JADLOG Econômico", "JADLOG Package"]
+DIMENSOES = ["10 x 15 x 20", "5 x 11 x 16", "20 x 20 x 30", "8 x 12 x 18"]
+PESOS = ["0.3", "0.5", "1", "2", "5"]
+
+
+def build_input_workbook(file_path: str, rows: int) -> None:
+    """
+    Gera a planilha de entrada sintética, no mesmo formato da planilha real (aba "Grupo 1 ").
+
+    Parâmetros:
+        file_path (str): Caminho do arquivo .xlsx a gerar.
+        rows (int): Quantidade de linhas (CNPJs distintos).
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(INPUT_SHEET_NAME)
+    sheet.append(INPUT_COLUMNS)
+    for index in range(rows):
+        sheet.append([
+            f"{10000000000000 + index * 7919:014d}",
+            f"{50 + index % 950}.00",
+            DIMENSOES[index % len(DIMENSOES)],
+            PESOS[index % len(PESOS)],
+            SERVICOS_JADLOG[index % len(SERVICOS_JADLOG)],
+            SERVICOS_CORREIOS[index % len(SERVICOS_CORREIOS)],
+        ])
+    workbook.save(file_path)
+
+
+def build_emails_workbook(file_path: str) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["resultado@bench.local"])
+    workbook.save(file_path)
+
+
+def peak_rss_mb():
+    """
+    Retorna o pico de memória residente do processo atual, em MB (ou None se não for possível medir).
+    """
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss é informado em KB no Linux e em bytes no macOS
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        pass
+
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return round(counters.PeakWorkingSetSize / (1024 * 1024), 1)
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+def bench_environment(workdir: str, service_settings: dict, overrides: dict) -> dict:
+    """
+    Monta as variáveis de ambiente do robô para uma execução do benchmark (pastas em `workdir`,
+    serviços locais, Maestro desconectado, navegador headless e checkpoint desativado).
+    """
+    environment = dict(os.environ)
+    environment.update({
+        "IS_MAESTRO_CONNECTED": "False",
+        "ACTIVITY_LABEL": "",
+        "BASE_LOG_PATH": os.path.join(workdir, "Logs"),
+        "DEFAULT_PROCESSAR_PATH": os.path.join(workdir, "Processar"),
+        "DEFAULT_PROCESSADOS_PATH": os.path.join(workdir, "Processados"),
+        "DEFAULT_CACHE_PATH": os.path.join(workdir, "Cache"),
+        "DEFAULT_EMAILS_FILE": os.path.join(workdir, "Emails", "emails.xlsx"),
+        "EMAIL_USERNAME": "robo@bench.local",
+        "EMAIL_PASSWORD": "",
+        "ORIGIN_CEP": "38182428",
+        "PICKUP_VALUE": "50",
+        "BROWSER_HEADLESS": "True",
+        "CHECKPOINT_ENABLED": "False",
+        "ERROR_DIGEST_ENABLED": "False",
+        "RUN_PROFILE_ENABLED": "True",
+    })
+    environment.update(service_settings)
+    environment.update(overrides)
+    return environment
+
+
+def run_child(result_file: str) -> int:
+    """
+    Executa `bot.main` no processo atual (chamado com `--child`) e grava as medições em `result_file`.
+    """
+    # As variáveis já vêm do processo pai: o `.env` do desenvolvedor não pode sobrescrevê-las
+    import dotenv
+    dotenv.load_dotenv = lambda *args, **kwargs: False
+
+    sys.path.insert(0, PROJECT_DIR)
+    import pandas as pd
+    import bot
+    from Utils import PROFILER, calc_finish_task
+
+    started_at = time.perf_counter()
+    bot.main()
+    elapsed = time.perf_counter() - started_at
+
+    output_dir = os.environ["DEFAULT_PROCESSADOS_PATH"]
+    outputs = sorted(
+        (os.path.join(output_dir, name) for name in os.listdir(output_dir) if name.endswith(".xlsx")),
+        key=os.path.getmtime
+    ) if os.path.isdir(output_dir) else []
+
+    result = {"elapsed_s": round(elapsed, 3), "peak_rss_mb": peak_rss_mb(), "profile": PROFILER.summary()}
+    if outputs:
+        total, success, failed = calc_finish_task(pd.read_excel(outputs[-1], dtype=object))
+        result.update({"output_file": outputs[-1], "total": total, "success": success, "failed": failed})
+
+    with open(result_file, "w", encoding="utf-8") as file:
+        json.dump(result, file, ensure_ascii=False, default=str)
+    return 0 if outputs else 1
+
+
+def run_size(rows: int, service_settings: dict, overrides: dict, keep_workdir: bool = False) -> dict:
+    """
+    Gera a planilha com `rows` linhas e executa o robô em um processo novo.
+
+    Retorna:
+        dict: "rows", "elapsed_s", "rows_per_s", "peak_rss_mb", "stages" ({etapa: segundos}),
+            "row_latency" ({medição: p50/p95/p99}) e as contagens de sucesso e falha, ou "error".
+    """
+    workdir = tempfile.mkdtemp(prefix=f"offline_bench_{rows}_")
+    try:
+        for folder in ("Processar", "Processados", "Logs", "Cache", "Emails"):
+            os.makedirs(os.path.join(workdir, folder))
+        build_input_workbook(os.path.join(workdir, "Processar", INPUT_FILE_NAME), rows)
+        build_emails_workbook(os.path.join(workdir, "Emails", "emails.xlsx"))
+
+        result_file = os.path.join(workdir, "result.json")
+        process = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", result_file],
+            cwd=PROJECT_DIR, env=bench_environment(workdir, service_settings, overrides),
+            capture_output=True, text=True
+        )
+        if not os.path.exists(result_file):
+            last_line = process.stderr.strip().splitlines()[-1] if process.stderr.strip() else ""
+            return {"rows": rows, "error": last_line or f"código de saída {process.returncode}"}
+
+        with open(result_file, encoding="utf-8") as file:
+            child = json.load(file)
+        if "output_file" not in child:
+            return {"rows": rows, "error": "a planilha de resultado não foi gerada (ver os logs do robô)"}
+
+        profile = child["profile"]
+        return {
+            "rows": rows,
+            "elapsed_s": child["elapsed_s"],
+            "rows_per_s": round(rows / child["elapsed_s"], 2) if child["elapsed_s"] else None,
+            "peak_rss_mb": child["peak_rss_mb"],
+            "success": child["success"],
+            "failed": child["failed"],
+            "stages": {name: values["total_s"] for name, values in profile["stages"].items()},
+            "row_latency": {
+                name: {key: values[key] for key in ("count", "p50_s", "p95_s", "p99_s")}
+                for name, values in profile["rows"].items()
+            },
+        }
+    finally:
+        if keep_workdir:
+            print(f"Arquivos da execução com {rows} linhas mantidos em: {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def load_previous_results(latency_ms: float, overrides: dict, results_file: str = RESULTS_FILE) -> dict:
+    """
+    Retorna, para cada quantidade de linhas, o resultado mais recente registrado com a mesma latência e
+    as mesmas configurações extras ({linhas: resultado}).
+    """
+    previous = {}
+    if not os.path.exists(results_file):
+        return previous
+    with open(results_file, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            run = json.loads(line)
+            if run.get("latency_ms") == latency_ms and run.get("overrides") == overrides:
+                for result in run["results"]:
+                    if "rows_per_s" in result:
+                        previous[result["rows"]] = result
+    return previous
+
+
+def find_regressions(current: list, previous: dict, threshold: float) -> list:
+    """
+    Lista as execuções cuja vazão caiu além do limite em relação à execução anterior de mesmo tamanho.
+
+    Retorna:
+        list: Tuplas (linhas, linhas/s anterior, linhas/s atual).
+    """
+    regressions = []
+    for result in current:
+        before = previous.get(result["rows"], {}).get("rows_per_s")
+        after = result.get("rows_per_s")
+        if before and after is not None and after < before * (1 - threshold):
+            regressions.append((result["rows"], before, after))
+    return regressions
+
+
+def parse_overrides(values: list) -> dict:
+    overrides = {}
+    for value in values:
+        key, separator, setting = value.partition("=")
+        if not separator:
+            raise argparse.ArgumentTypeError(f"Use CHAVE=VALOR em --set (recebido: {value})")
+        overrides[key.strip()] = setting.strip()
+    return overrides
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mede a vazão do robô com serviços locais, sem internet.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Tamanhos da planilha de entrada.")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Atraso de cada resposta dos serviços locais.")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="Configuração extra do robô (ex: CORREIOS_WORKERS=4). Pode ser repetido.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Queda relativa de vazão considerada regressão.")
+    parser.add_argument("--keep-workdir", action="store_true", help="Mantém as pastas temporárias (logs e planilhas).")
+    parser.add_argument("--no-save", action="store_true", help="Não grava o resultado no arquivo JSONL.")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Retorna código 1 se houver regressão.")
+    parser.add_argument("--child", metavar="RESULT_FILE", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        return run_child(args.child)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from fake_sites import FakeSitesServer, FakeSMTPServer
+
+    overrides = parse_overrides(args.overrides)
+    results = []
+    with FakeSitesServer(latency_ms=args.latency_ms) as sites, FakeSMTPServer() as smtp:
+        service_settings = {**sites.urls(), **smtp.settings()}
+        print(f"{'Linhas':>8} {'Tempo (s)':>10} {'Linhas/s':>9} {'RSS (MB)':>9}  Etapas mais lentas")
+        for rows in args.rows:
+            result = run_size(rows, service_settings, overrides, args.keep_workdir)
+            results.append(result)
+            if "error" in result:
+                print(f"{rows:>8} {'erro':>10} {'':>9} {'':>9}  {result['error']}")
+                continue
+            slowest = ", ".join(f"{name} {seconds:.1f}s" for name, seconds in list(result["stages"].items())[:3])
+            print(f"{rows:>8} {result['elapsed_s']:>10.1f} {result['rows_per_s']:>9.2f} "
+                  f"{str(result['peak_rss_mb']):>9}  {slowest}")
+        requests_by_service = dict(sites.requests)
+
+    previous = load_previous_results(args.latency_ms, overrides)
+    regressions = find_regressions(results, previous, args.threshold)
+    for rows, before, after in regressions:
+        print(f"REGRESSÃO: {rows} linhas passou de {before} para {after} linhas/s")
+
+    if not args.no_save:
+        os.makedirs(os.path.dirname(RESULTS_FILE), exist_ok=True)
+        with open(RESULTS_FILE, "a", encoding="utf-8") as file:
+            file.write(json.dumps({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "python": sys.version.split()[0],
+                "latency_ms": args.latency_ms,
+                "overrides": overrides,
+                "requests": requests_by_service,
+                "results": results,
+            }, ensure_ascii=False) + "\n")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
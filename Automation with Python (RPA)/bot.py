@@ -1,12 +1,17 @@
 import os
 from dotenv import load_dotenv
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
 
 from botcity.maestro import *
-from botcity.web import WebBot, Browser, By
 from config import vars_map
-from Utils import *
+from Utils import (
+    IntegratedLogger, create_maestro_log_shipper, create_error_notifier,
+    load_input_snapshot, create_output_dataframe, api_data_lookup, make_column_endereco,
+    make_jadlog_correios_dataframes, rpa_challenge, buscar_cotacoes_correios, obter_cotacoes_jadlog,
+    compare_carrier_quotes, save_df_output_to_excel, calc_finish_task,
+    executar_envio_email, executar_envio_email_erro, ler_emails_da_planilha, open_checkpoint,
+    StageScheduler, merge_stage_frames, PROFILER, create_browser_pool,
+    open_incremental_store, row_hashes, hashes_by_cnpj, merge_with_previous
+)
 
 # Carrega variáveis de ambiente
 load_dotenv(override=True)
@@ -17,57 +22,177 @@ ACTIVITY_LABEL = vars_map['ACTIVITY_LABEL']
 BotMaestroSDK.RAISE_NOT_CONNECTED = not IS_MAESTRO_CONNECTED
 
 
+def salvar_perfil_execucao(logger):
+    """
+    Grava o perfil de desempenho da execução (ver `RunProfiler`) junto aos logs, se 'RUN_PROFILE_ENABLED'.
+
+    Retorna:
+        str ou None: Caminho do arquivo JSON gravado.
+    """
+    if not vars_map['RUN_PROFILE_ENABLED']:
+        return None
+    try:
+        profile_file = PROFILER.save(logger.filepath)
+        logger.info(f"Perfil de desempenho: {PROFILER.summary_text()}")
+        logger.info(f"Perfil de desempenho salvo em: {profile_file}")
+        return profile_file
+    except Exception as erro:
+        logger.warning(f"Não foi possível salvar o perfil de desempenho: {erro}")
+        return None
+
+
 def main():
+    # Reinicia as medições de desempenho desta execução
+    PROFILER.reset()
+
     # Inicializa objetos padrão
     maestro = vars_map['DEFAULT_MAESTRO']
     execution = vars_map['DEFAULT_EXECUTION']
     bot = vars_map['DEFAULT_BOT']
     
+    log_shipper = None
+    if maestro and vars_map['MAESTRO_LOG_BATCHING']:
+        log_shipper = create_maestro_log_shipper(maestro, ACTIVITY_LABEL)
+
+    error_notifier = None
+    if vars_map['ERROR_DIGEST_ENABLED']:
+        error_notifier = create_error_notifier("RPA VALOR COTAÇÃO")
+
     logger = IntegratedLogger(
         maestro=maestro,
         filepath=vars_map['BASE_LOG_PATH'],
-        activity_label=ACTIVITY_LABEL
+        activity_label=ACTIVITY_LABEL,
+        async_mode=vars_map['LOG_ASYNC'],
+        queue_size=vars_map['LOG_QUEUE_SIZE'],
+        overflow_policy=vars_map['LOG_OVERFLOW_POLICY'],
+        log_shipper=log_shipper,
+        error_notifier=error_notifier
     )
+    checkpoint = None
+    browser_pool = None
+    incremental = None
 
     try:
         logger.info("=" * 50)
         logger.info("🏁 Início do Processo: RPA VALOR COTAÇÃO")
         logger.info("=" * 50)
-        
+
         # 1. Leitura de entrada
         input_path = os.path.join(vars_map['DEFAULT_PROCESSAR_PATH'], 'Planilha de Entrada Grupos.xlsx')
-        df = open_excel_file_to_dataframe(input_path, logger)
-        df_output = create_output_dataframe(df, logger)
+        checkpoint = open_checkpoint(input_path, logger)
+        etapa_api = checkpoint.load_stage_frames("api") if checkpoint else None
+
+        # Modo incremental: apenas as linhas novas ou alteradas desde a última execução seguem para a
+        # API e os sites; as demais reaproveitam o resultado anterior no relatório final
+        incremental = open_incremental_store(input_path)
+        df = df_anterior = None
+        if incremental:
+            df = load_input_snapshot(input_path, logger)
+            ordem_cnpjs = df["CNPJ"].tolist()
+            hashes = row_hashes(df)
+            hashes_entrada = hashes_by_cnpj(df, hashes)
+            df, df_anterior = incremental.split_changed(df, hashes, vars_map['INCREMENTAL_MAX_AGE_HOURS'] * 3600)
+            logger.info(
+                f"Modo incremental: {len(df)} de {len(ordem_cnpjs)} linhas novas ou alteradas; "
+                f"{len(df_anterior)} resultados reaproveitados da execução anterior."
+            )
+
+        if df is not None and df.empty:
+            logger.info("Nenhuma linha nova ou alterada: consultas à API e aos sites ignoradas.")
+            df_output = df_anterior
+        else:
+            # Navegadores iniciados em segundo plano (enquanto a BrasilAPI é consultada), prontos
+            # quando as etapas web começarem
+            browser_pool = create_browser_pool(logger)
+
+            if etapa_api is not None:
+                # 2. Processamento via API (restaurado do checkpoint da mesma planilha)
+                logger.info("Consulta à BrasilAPI restaurada do checkpoint.")
+                df_output, api_data = etapa_api["df_output"], etapa_api["api_data"]
+                df_correios, df_jadlog = etapa_api["df_correios"], etapa_api["df_jadlog"]
+            else:
+                if df is None:
+                    df = load_input_snapshot(input_path, logger)
+                df_output = create_output_dataframe(df, logger)
 
-        # 2. Processamento via API
-        api_data, df_output = api_data_lookup(df_output, logger)
-        api_data = make_column_endereco(api_data, logger)
-        df_output, df_correios, df_jadlog = make_jadlog_correios_dataframes(df_output, api_data, logger)
+                # 2. Processamento via API
+                api_data, df_output = api_data_lookup(df_output, logger, df_input=df)
+                api_data = make_column_endereco(api_data, logger)
+                df_output, df_correios, df_jadlog = make_jadlog_correios_dataframes(df_output, api_data, logger)
+                if checkpoint:
+                    checkpoint.mark_stage_done("api", {
+                        "df_output": df_output, "api_data": api_data, "df_correios": df_correios, "df_jadlog": df_jadlog
+                    })
 
-        # 3. Interações Web
-        rpa_challenge(df=api_data, logger=logger)
-        df_output = buscar_cotacoes_correios(df_filtered=df_correios, df_output=df_output, bot=bot, logger=logger)
-        df_output = obter_cotacoes_jadlog(bot=bot, maestro=maestro, df_filtered=df_jadlog, df_output=df_output, logger=logger)
+            # 3. Interações Web: RPA Challenge, Correios e Jadlog não dependem entre si e, com
+            # 'STAGES_CONCURRENT', rodam ao mesmo tempo, cada uma com o seu navegador (emprestado do pool,
+            # se ativo). Correios e Jadlog trabalham em cópias do DataFrame de saída, combinadas ao final
+            # na ordem declarada.
+            # Os resultados por CNPJ são gravados no checkpoint à medida que são obtidos.
+            concorrente = vars_map['STAGES_CONCURRENT']
 
-        # 4. Salvamento e Comparações
+            def etapa_rpa_challenge(api_data):
+                if checkpoint and checkpoint.is_stage_done("rpa_challenge"):
+                    logger.info("RPA Challenge já concluído nesta planilha: etapa ignorada.")
+                    return
+                concluido = rpa_challenge(df=api_data, logger=logger, browser_pool=browser_pool)
+                # Com falha, a etapa fica pendente e é refeita na próxima execução da mesma planilha
+                if checkpoint and concluido:
+                    checkpoint.mark_stage_done("rpa_challenge")
+
+            def etapa_correios(df_output, df_correios):
+                return {"df_output_correios": buscar_cotacoes_correios(
+                    df_filtered=df_correios, df_output=df_output.copy(), bot=bot, logger=logger, checkpoint=checkpoint,
+                    browser_pool=browser_pool
+                )}
+
+            def etapa_jadlog(df_output, df_jadlog):
+                bot_jadlog = vars_map.create_webbot() if concorrente and browser_pool is None else bot
+                return {"df_output_jadlog": obter_cotacoes_jadlog(
+                    bot=bot_jadlog, maestro=maestro, df_filtered=df_jadlog, df_output=df_output.copy(),
+                    logger=logger, checkpoint=checkpoint, browser_pool=browser_pool
+                )}
+
+            scheduler = StageScheduler(logger, max_workers=3 if concorrente else 1)
+            scheduler.add_stage("rpa_challenge", etapa_rpa_challenge, inputs=("api_data",))
+            scheduler.add_stage("correios", etapa_correios, inputs=("df_output", "df_correios"), outputs=("df_output_correios",))
+            scheduler.add_stage("jadlog", etapa_jadlog, inputs=("df_output", "df_jadlog"), outputs=("df_output_jadlog",))
+            try:
+                etapas = scheduler.run({"api_data": api_data, "df_output": df_output, "df_correios": df_correios, "df_jadlog": df_jadlog})
+            finally:
+                PROFILER.attach("timeline", scheduler.timeline)
+            df_output = merge_stage_frames(df_output, [etapas["df_output_correios"], etapas["df_output_jadlog"]])
+            if df_anterior is not None:
+                df_output = merge_with_previous(df_output, df_anterior, ordem_cnpjs)
+
+        # 4. Salvamento e Comparações (a menor cotação é destacada durante a escrita)
+        df_output = compare_carrier_quotes(df_output, logger)
         output_file = save_df_output_to_excel(vars_map['DEFAULT_PROCESSADOS_PATH'], df_output, logger)
-        compare_quotation(df_output, output_file, logger)
 
         # 5. Envio de resultado por e-mail
-        executar_envio_email(
-            caminho_arquivo_anexo=output_file,
-            nome_processo="RPA VALOR COTAÇÃO",
-            logger=logger
-        )
+        with PROFILER.stage("envio_email"):
+            executar_envio_email(
+                caminho_arquivo_anexo=output_file,
+                nome_processo="RPA VALOR COTAÇÃO",
+                logger=logger
+            )
 
     except Exception as erro:
-        logger.error(f"Erro durante a execução do processo principal: {erro}", exc_info=True)
+        logger.error(f"Erro durante a execução do processo principal: {erro}")
+        profile_file = salvar_perfil_execucao(logger)
 
         if IS_MAESTRO_CONNECTED:
+            if profile_file:
+                maestro.post_artifact(
+                    task_id=execution.task_id,
+                    artifact_name=os.path.basename(profile_file),
+                    filepath=profile_file
+                )
+
             maestro.finish_task(
                 task_id=execution.task_id,
                 status=AutomationTaskFinishStatus.FAILED,
-                message="Task finalizada com falhas.",
+                message=f"Task finalizada com falhas. {PROFILER.summary_text()}",
                 total_items=0,
                 processed_items=0,
                 failed_items=0
@@ -85,7 +210,9 @@ def main():
         )
 
     else:
+        # As contagens usam o DataFrame final, que inclui os resultados restaurados do checkpoint
         total_tasks, total_success, total_failed = calc_finish_task(df_output)
+        profile_file = salvar_perfil_execucao(logger)
 
         if IS_MAESTRO_CONNECTED:
             maestro.post_artifact(
@@ -94,15 +221,41 @@ def main():
                 filepath=output_file
             )
 
+            # Perfil de desempenho da execução (tempo por etapa e latência por linha)
+            if profile_file:
+                maestro.post_artifact(
+                    task_id=execution.task_id,
+                    artifact_name=os.path.basename(profile_file),
+                    filepath=profile_file
+                )
+
             maestro.finish_task(
                 task_id=execution.task_id,
                 status=AutomationTaskFinishStatus.SUCCESS,
-                message="Task finalizada com sucesso.",
+                message=f"Task finalizada com sucesso. {PROFILER.summary_text()}",
                 total_items=total_tasks,
                 processed_items=total_success,
                 failed_items=total_failed
             )
 
+        # Execução concluída: o progresso desta planilha não precisa mais ser retomado
+        if checkpoint:
+            checkpoint.clear()
+
+        # Hashes e resultados desta execução, comparados na próxima (modo incremental)
+        if incremental:
+            incremental.save(df_output, hashes_entrada)
+
+    finally:
+        if browser_pool:
+            browser_pool.close()
+        if checkpoint:
+            checkpoint.close()
+        if incremental:
+            incremental.close()
+        # Garante a gravação dos logs pendentes na fila (modo assíncrono)
+        logger.close()
+
 
 def not_found(label):
     print(f"Element not found: {label}")
@@ -1,64 +1,269 @@
 import os
-from botcity.web import WebBot, Browser, By
-from botcity.maestro import *
+import json
+import time
+import threading
+from collections.abc import Mapping
 from dotenv import load_dotenv
-from webdriver_manager.chrome import ChromeDriverManager
 
 load_dotenv(override=True)
 
-bot = WebBot()
-bot.headless = False
-bot.browser = Browser.CHROME
-bot.driver_path = ChromeDriverManager().install()
-
-IS_MAESTRO_CONNECTED = eval(os.getenv('IS_MAESTRO_CONNECTED'))
-if IS_MAESTRO_CONNECTED:
-    maestro = BotMaestroSDK.from_sys_args()
-    execution = maestro.get_execution()
-    BASE_LOG_PATH = execution.parameters.get('BASE_LOG_PATH')
-    DEFAULT_PROCESSAR_PATH = execution.parameters.get('DEFAULT_PROCESSAR_PATH')
-    DEFAULT_PROCESSADOS_PATH = execution.parameters.get('DEFAULT_PROCESSADOS_PATH')
-    DEFAULT_CORREIOS_URL = execution.parameters.get('DEFAULT_CORREIOS_URL')
-    DEFAULT_BRASILAPI_URL = execution.parameters.get('DEFAULT_BRASILAPI_URL')
-    DEFAUT_RPACHALLENGE_URL = execution.parameters.get('DEFAUT_RPACHALLENGE_URL')
-    ORIGIN_CEP = execution.parameters.get('ORIGIN_CEP')
-    DEFAULT_URL_JADLOG = execution.parameters.get('DEFAULT_URL_JADLOG')
-    PICKUP_VALUE = execution.parameters.get('PICKUP_VALUE')
-    DEFAULT_EMAILS_FILE = execution.parameters.get('DEFAULT_EMAILS_FILE')
-    EMAIL_PASSWORD = maestro.get_credential(label='VALOR_COTACAO_CREDENTIALS',key='EMAIL_PASSWORD')
-    EMAIL_USERNAME = maestro.get_credential(label='VALOR_COTACAO_CREDENTIALS',key='EMAIL_USERNAME')
-else:
-    maestro = None
-    execution = None
-    BASE_LOG_PATH = os.getenv('BASE_LOG_PATH')
-    DEFAULT_PROCESSAR_PATH = os.getenv('DEFAULT_PROCESSAR_PATH')
-    DEFAULT_PROCESSADOS_PATH = os.getenv('DEFAULT_PROCESSADOS_PATH')
-    DEFAULT_CORREIOS_URL = os.getenv('DEFAULT_CORREIOS_URL')
-    DEFAULT_BRASILAPI_URL = os.getenv('DEFAULT_BRASILAPI_URL')
-    DEFAUT_RPACHALLENGE_URL = os.getenv('DEFAUT_RPACHALLENGE_URL')
-    ORIGIN_CEP = os.getenv('ORIGIN_CEP')
-    DEFAULT_URL_JADLOG = os.getenv('DEFAULT_URL_JADLOG')
-    PICKUP_VALUE = os.getenv('PICKUP_VALUE')
-    DEFAULT_EMAILS_FILE = os.getenv('DEFAULT_EMAILS_FILE')
-    EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD')
-    EMAIL_USERNAME = os.getenv('EMAIL_USERNAME')
-
-vars_map = {
-    'IS_MAESTRO_CONNECTED':IS_MAESTRO_CONNECTED,
-    'ACTIVITY_LABEL':os.getenv('ACTIVITY_LABEL'),
-    'BASE_LOG_PATH':BASE_LOG_PATH,
-    'DEFAULT_PROCESSAR_PATH':DEFAULT_PROCESSAR_PATH,
-    'DEFAULT_PROCESSADOS_PATH':DEFAULT_PROCESSADOS_PATH,
-    'DEFAULT_CORREIOS_URL':DEFAULT_CORREIOS_URL,
-    'DEFAULT_BRASILAPI_URL':DEFAULT_BRASILAPI_URL,
-    'DEFAUT_RPACHALLENGE_URL':DEFAUT_RPACHALLENGE_URL,
-    'DEFAULT_MAESTRO':maestro,
-    'DEFAULT_BOT':bot,
-    'DEFAULT_EMAILS_FILE':DEFAULT_EMAILS_FILE,
-    'DEFAULT_EXECUTION':execution,
-    'ORIGIN_CEP':ORIGIN_CEP,
-    'PICKUP_VALUE':PICKUP_VALUE,
-    'DEFAULT_URL_JADLOG':DEFAULT_URL_JADLOG,
-    'EMAIL_PASSWORD':EMAIL_PASSWORD,
-    'EMAIL_USERNAME':EMAIL_USERNAME
-}
\ No newline at end of file
+TRUE_VALUES = ('true', '1', 'sim', 's', 'yes')
+FALSE_VALUES = ('false', '0', 'não', 'nao', 'n', 'no')
+
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """
+    Lê uma variável de ambiente booleana ("True"/"False", "1"/"0", "sim"/"não").
+    """
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() in TRUE_VALUES
+
+
+def parse_bool(value) -> bool:
+    """
+    Converte um valor booleano em texto ("True"/"False", "1"/"0", "sim"/"não"), sem usar `eval`.
+
+    Raises:
+        ValueError: Se o texto não representar um valor booleano.
+    """
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"valor booleano inválido: '{value}'")
+
+
+def _lower(value) -> str:
+    return str(value).strip().lower()
+
+
+# Configurações simples: {nome: (conversor, valor padrão)}. Valores vazios usam o padrão.
+SETTINGS_SPEC = {
+    'IS_MAESTRO_CONNECTED': (parse_bool, False),
+    'ACTIVITY_LABEL': (str, None),
+    'BASE_LOG_PATH': (str, None),
+    'DEFAULT_PROCESSAR_PATH': (str, None),
+    'DEFAULT_PROCESSADOS_PATH': (str, None),
+    'DEFAULT_CORREIOS_URL': (str, None),
+    'DEFAULT_BRASILAPI_URL': (str, None),
+    'DEFAUT_RPACHALLENGE_URL': (str, None),
+    'DEFAULT_EMAILS_FILE': (str, None),
+    'ORIGIN_CEP': (str, None),
+    'PICKUP_VALUE': (str, None),
+    'DEFAULT_URL_JADLOG': (str, None),
+    'EMAIL_PASSWORD': (str, None),
+    'EMAIL_USERNAME': (str, None),
+    'DEFAULT_CACHE_PATH': (str, 'Cache'),
+    'CHROMEDRIVER_CACHE_TTL_HOURS': (float, 24),
+    'BROWSER_HEADLESS': (parse_bool, False),
+    'BRASILAPI_MAX_WORKERS': (int, 8),
+    'BRASILAPI_CACHE_TTL_HOURS': (float, 24),
+    'BRASILAPI_CACHE_MAX_ENTRIES': (int, 10000),
+    'BRASILAPI_CACHE_REFRESH': (parse_bool, False),
+    'CORREIOS_WORKERS': (int, 1),
+    'CORREIOS_KEEP_BROWSER_OPEN': (parse_bool, True),
+    'CORREIOS_TIMEOUT_MS': (int, 20000),
+    'CORREIOS_HTTP_ENABLED': (parse_bool, False),
+    'JADLOG_TIMEOUT_MS': (int, 15000),
+    'QUOTE_CACHE_TTL_HOURS_CORREIOS': (float, 12),
+    'QUOTE_CACHE_TTL_HOURS_JADLOG': (float, 12),
+    'QUOTE_CACHE_MAX_ENTRIES': (int, 50000),
+    'LOG_ASYNC': (parse_bool, True),
+    'LOG_QUEUE_SIZE': (int, 10000),
+    'LOG_OVERFLOW_POLICY': (_lower, 'block'),
+    'MAESTRO_LOG_BATCHING': (parse_bool, True),
+    'MAESTRO_LOG_BATCH_SIZE': (int, 50),
+    'MAESTRO_LOG_FLUSH_SECONDS': (float, 2),
+    'MAESTRO_LOG_MAX_RPS': (float, 2),
+    'ERROR_DIGEST_ENABLED': (parse_bool, True),
+    'ERROR_DIGEST_WINDOW_SECONDS': (float, 300),
+    'ERROR_SCREENSHOTS_PER_WINDOW': (int, 5),
+    'SMTP_HOST': (str, 'smtp.gmail.com'),
+    'SMTP_PORT': (int, 465),
+    'SMTP_USE_SSL': (parse_bool, True),
+    'SMTP_BATCH_SIZE': (int, 50),
+    'SMTP_MAX_RETRIES': (int, 3),
+    'SMTP_TIMEOUT': (float, 30),
+    'CHECKPOINT_ENABLED': (parse_bool, True),
+    'CHECKPOINT_RESUME': (parse_bool, True),
+    'CHECKPOINT_MAX_AGE_HOURS': (float, 72),
+    'STAGES_CONCURRENT': (parse_bool, True),
+    'RPA_CHALLENGE_FAST_FILL': (parse_bool, True),
+    'RUN_PROFILE_ENABLED': (parse_bool, True),
+    'BROWSER_POOL_ENABLED': (parse_bool, True),
+    'BROWSER_POOL_SIZE': (int, 3),
+    'BROWSER_POOL_MAX_USES': (int, 200),
+    'BROWSER_POOL_MAX_HEAP_MB': (float, 512),
+    'INCREMENTAL_ENABLED': (parse_bool, False),
+    'INCREMENTAL_MAX_AGE_HOURS': (float, 168),
+}
+
+# Com o Maestro conectado, estes valores vêm dos parâmetros da execução
+MAESTRO_PARAMETERS = (
+    'BASE_LOG_PATH', 'DEFAULT_PROCESSAR_PATH', 'DEFAULT_PROCESSADOS_PATH', 'DEFAULT_CORREIOS_URL',
+    'DEFAULT_BRASILAPI_URL', 'DEFAUT_RPACHALLENGE_URL', 'ORIGIN_CEP', 'DEFAULT_URL_JADLOG',
+    'PICKUP_VALUE', 'DEFAULT_EMAILS_FILE',
+)
+
+# Com o Maestro conectado, estes valores vêm das credenciais do Maestro
+MAESTRO_CREDENTIALS_LABEL = 'VALOR_COTACAO_CREDENTIALS'
+MAESTRO_CREDENTIALS = ('EMAIL_PASSWORD', 'EMAIL_USERNAME')
+
+# Objetos caros, criados apenas no primeiro acesso: {nome: método que cria o objeto}
+LAZY_OBJECTS = {
+    'DEFAULT_MAESTRO': '_build_maestro',
+    'DEFAULT_EXECUTION': '_build_execution',
+    'DEFAULT_BOT': '_build_bot',
+    'CHROMEDRIVER_PATH': '_resolve_driver_path',
+}
+
+
+class Settings(Mapping):
+    """
+    Configurações do robô, lidas do `.env` (ou do Maestro) sob demanda.
+
+    Cada valor é convertido e validado uma única vez, no primeiro acesso, e fica em cache. Os objetos
+    caros (WebBot, caminho do ChromeDriver, Maestro, execução e credenciais) também só são criados
+    quando usados pela primeira vez, de modo que importar `config` não resolve o driver nem conecta ao
+    Maestro. O acesso continua igual ao antigo dicionário: `vars_map['CHAVE']` e `vars_map.get('CHAVE')`.
+    """
+
+    def __init__(self, environ: Mapping = None):
+        self._environ = os.environ if environ is None else environ
+        self._values = {}
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key: str):
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if key not in self._values:
+                if key in LAZY_OBJECTS:
+                    self._values[key] = getattr(self, LAZY_OBJECTS[key])()
+                elif key in SETTINGS_SPEC:
+                    self._values[key] = self._load(key)
+                else:
+                    raise KeyError(key)
+            return self._values[key]
+
+    def __iter__(self):
+        yield from SETTINGS_SPEC
+        yield from LAZY_OBJECTS
+
+    def __len__(self) -> int:
+        return len(SETTINGS_SPEC) + len(LAZY_OBJECTS)
+
+    def _load(self, key: str):
+        """
+        Lê o valor bruto (Maestro ou variável de ambiente) e o converte para o tipo declarado.
+
+        Raises:
+            ValueError: Se o valor não puder ser convertido para o tipo da configuração.
+        """
+        converter, default = SETTINGS_SPEC[key]
+
+        if key in MAESTRO_PARAMETERS and self.is_maestro_connected:
+            value = self['DEFAULT_EXECUTION'].parameters.get(key)
+        elif key in MAESTRO_CREDENTIALS and self.is_maestro_connected:
+            value = self['DEFAULT_MAESTRO'].get_credential(label=MAESTRO_CREDENTIALS_LABEL, key=key)
+        else:
+            value = self._environ.get(key)
+
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return default
+        try:
+            return converter(value)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Configuração inválida '{key}': {value!r} ({e})") from None
+
+    @property
+    def is_maestro_connected(self) -> bool:
+        return self['IS_MAESTRO_CONNECTED']
+
+    @property
+    def maestro(self):
+        return self['DEFAULT_MAESTRO']
+
+    @property
+    def execution(self):
+        return self['DEFAULT_EXECUTION']
+
+    @property
+    def bot(self):
+        return self['DEFAULT_BOT']
+
+    @property
+    def driver_path(self) -> str:
+        return self['CHROMEDRIVER_PATH']
+
+    def _build_maestro(self):
+        if not self.is_maestro_connected:
+            return None
+        from botcity.maestro import BotMaestroSDK
+        return BotMaestroSDK.from_sys_args()
+
+    def _build_execution(self):
+        maestro = self['DEFAULT_MAESTRO']
+        return maestro.get_execution() if maestro else None
+
+    def _build_bot(self):
+        return self.create_webbot()
+
+    def create_webbot(self, headless: bool = None):
+        """
+        Cria uma nova instância do WebBot (Chrome) com o driver resolvido na configuração. Usado para
+        o navegador padrão ('DEFAULT_BOT') e pelas etapas que precisam de um navegador próprio.
+        Sem `headless`, segue 'BROWSER_HEADLESS'.
+        """
+        from botcity.web import WebBot, Browser
+
+        bot = WebBot()
+        bot.headless = self['BROWSER_HEADLESS'] if headless is None else headless
+        bot.browser = Browser.CHROME
+        bot.driver_path = self['CHROMEDRIVER_PATH']
+        return bot
+
+    def _resolve_driver_path(self) -> str:
+        """
+        Retorna o caminho do ChromeDriver. O caminho resolvido pelo `webdriver_manager` fica gravado em
+        `DEFAULT_CACHE_PATH/chromedriver_path.json` e é reaproveitado nas execuções seguintes enquanto
+        o arquivo existir e estiver dentro de 'CHROMEDRIVER_CACHE_TTL_HOURS'.
+        """
+        explicit_path = self._environ.get('CHROMEDRIVER_PATH')
+        if explicit_path and explicit_path.strip():
+            return explicit_path.strip()
+
+        cache_file = os.path.join(self['DEFAULT_CACHE_PATH'], 'chromedriver_path.json')
+        max_age = self['CHROMEDRIVER_CACHE_TTL_HOURS'] * 3600
+        try:
+            with open(cache_file, encoding='utf-8') as file:
+                cached = json.load(file)
+            if os.path.exists(cached['path']) and time.time() - cached['resolved_at'] < max_age:
+                return cached['path']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+
+        try:
+            os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as file:
+                json.dump({'path': path, 'resolved_at': time.time()}, file)
+        except OSError:
+            pass
+        return path
+
+
+settings = Settings()
+
+# Mantido para compatibilidade: o restante do projeto acessa as configurações por `vars_map`
+vars_map = settings